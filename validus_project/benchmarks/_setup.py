@@ -0,0 +1,66 @@
+"""
+Shared bootstrap for the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database whose tables are created
+straight from the models, so they need neither migrations nor a dev database.
+Run them from the validus_project directory, e.g.:
+
+    python -m benchmarks.bench_transition_validation
+"""
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+
+def setup_django(db_name=":memory:", db_options=None):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "validus_project.settings")
+    from django.conf import settings
+    import django
+
+    settings.DATABASES["default"]["NAME"] = db_name
+    if db_options is not None:
+        settings.DATABASES["default"]["OPTIONS"] = dict(db_options)
+    settings.ALLOWED_HOSTS = ["*"]
+    django.setup()
+    create_tables()
+
+
+def create_tables(alias="default"):
+    from django.apps import apps
+    from django.db import connections
+
+    with connections[alias].schema_editor() as editor:
+        for model in apps.get_app_config("trades_approval").get_models():
+            editor.create_model(model)
+
+
+def temp_db_path(prefix="bench"):
+    fd, path = tempfile.mkstemp(prefix=f"{prefix}-", suffix=".sqlite3")
+    os.close(fd)
+    os.unlink(path)
+    return path
+
+
+def trade_details(**overrides):
+    details = {
+        "tradingEntity": "Validus Capital Ltd",
+        "counterparty": "Bank of England",
+        "direction": "BUY",
+        "style": "FORWARD",
+        "notionalCurrency": "USD",
+        "notionalAmount": Decimal("5000000.00"),
+        "underlying": ["USD", "EUR"],
+        "tradeDate": date(2025, 11, 1),
+        "valueDate": date(2025, 11, 5),
+        "deliveryDate": date(2025, 11, 10),
+    }
+    details.update(overrides)
+    return details
+
+
+def seed_pending_trades(n, requester="user_001"):
+    from trades_approval.services.use_cases import bulk_create_and_submit
+
+    outcomes = bulk_create_and_submit([trade_details() for _ in range(n)], actor_id=requester)
+    return [o.trade_id for o in outcomes]
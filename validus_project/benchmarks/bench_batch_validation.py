@@ -0,0 +1,112 @@
+"""
+Validating a large upload: per-DTO scalar validators vs the columnar batch engine.
+
+    python -m benchmarks.bench_batch_validation [N]
+
+Rows are generated in memory (about 2% invalid); no database is touched.
+"list columns" feeds Python lists, as built from TradeDTOs or a JSON upload.
+"array columns" feeds NumPy arrays, as read from a columnar (Parquet/Arrow)
+upload; building those arrays from Python objects is timed separately, because
+it costs more than the validation itself. The numpy rows are skipped when
+NumPy is not installed. Every path must report the same messages as the
+scalar loop.
+"""
+import random
+import sys
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from benchmarks._setup import setup_django
+
+
+def _rows(n):
+    from trades_approval.dto import TradeDTO
+
+    rng = random.Random(7)
+    pairs = [["USD", "EUR"], ["GBP", "USD"], ["EUR", "JPY"], ["USD", "JPY"]]
+    base = date(2025, 1, 1)
+    rows = []
+    for i in range(n):
+        trade_date = base + timedelta(days=rng.randrange(300))
+        value_date = trade_date + timedelta(days=rng.randrange(-1, 5) if rng.random() < 0.03 else rng.randrange(5))
+        underlying = rng.choice(pairs)
+        currency = underlying[0] if rng.random() > 0.02 else "CHF"
+        rows.append(TradeDTO(
+            id=i, trading_entity="E", counterparty="C", direction="BUY", style="FORWARD",
+            notional_currency=currency, notional_amount=Decimal("1000000.00"), underlying=underlying,
+            trade_date=trade_date, value_date=value_date, delivery_date=value_date + timedelta(days=2),
+            strike=None, requester_id="u1", approver_id=None, state="PendingApproval", version=1,
+        ))
+    return rows
+
+
+def _scalar(dtos):
+    from trades_approval.validators import (
+        ValidationError, _assert_dates, _assert_underlying_contains_notional, _assert_no_strike_until_executed,
+    )
+
+    messages = []
+    for dto in dtos:
+        try:
+            _assert_dates(dto)
+            _assert_underlying_contains_notional(dto)
+            _assert_no_strike_until_executed(dto)
+            messages.append(None)
+        except ValidationError as e:
+            messages.append(str(e))
+    return messages
+
+
+def main(n=50000):
+    setup_django()
+    from trades_approval.batch_validators import HAS_NUMPY, columns_from_dtos, validate_columns
+
+    dtos = _rows(n)
+    cols = columns_from_dtos(dtos)
+
+    t0 = time.perf_counter()
+    expected = _scalar(dtos)
+    scalar_s = time.perf_counter() - t0
+
+    print(f"{n} trades, {sum(m is not None for m in expected)} invalid\n")
+    print(f"{'validator':<24}{'ms':>9}{'us/row':>9}{'speedup':>9}")
+    _report("scalar loop", scalar_s, n, scalar_s)
+    t0 = time.perf_counter()
+    result = validate_columns(**cols, use_numpy=False)
+    _report("batch, list columns", time.perf_counter() - t0, n, scalar_s)
+    assert result.messages == expected
+
+    if not HAS_NUMPY:
+        print(f"{'batch, numpy':<24}(NumPy not installed)")
+        return
+    t0 = time.perf_counter()
+    arrays = _as_arrays(cols)
+    convert_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    result = validate_columns(**arrays)
+    _report("batch, array columns", time.perf_counter() - t0, n, scalar_s)
+    assert result.messages == expected
+    print(f"\n(building the arrays from Python objects took {convert_s * 1e3:.1f} ms)")
+
+
+def _as_arrays(cols):
+    import numpy as np
+
+    return {
+        "trade_dates": np.array(cols["trade_dates"], dtype="datetime64[D]"),
+        "value_dates": np.array(cols["value_dates"], dtype="datetime64[D]"),
+        "delivery_dates": np.array(cols["delivery_dates"], dtype="datetime64[D]"),
+        "currencies": np.array(cols["currencies"], dtype="U3"),
+        "underlyings": np.array(cols["underlyings"], dtype="U3"),
+        "strikes": np.array([np.nan if x is None else float(x) for x in cols["strikes"]]),
+        "states": np.array(cols["states"]),
+    }
+
+
+def _report(label, wall, n, scalar_s):
+    print(f"{label:<24}{wall * 1e3:>9.1f}{wall / n * 1e6:>9.2f}{scalar_s / wall:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
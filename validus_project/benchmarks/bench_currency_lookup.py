@@ -0,0 +1,91 @@
+"""
+"Open trades involving EUR": Python filtering over Trade.underlying vs the TradeUnderlying index.
+
+    python -m benchmarks.bench_currency_lookup [N]
+
+Seeds N submitted trades over a mix of currency pairs (about 1 in 8 involves
+CHF), approves a quarter of them, then times:
+
+- python scan:   load (id, underlying, state) for every trade and filter in Python,
+                 the only option before the side table
+- index, page:   trades_by_currency(...) first page of 50, as /by-currency/ serves it
+- index, count:  trades_by_currency(...).count()
+
+Each row is the best of 5 runs against a file-backed SQLite database.
+"""
+import os
+import sys
+import time
+
+from benchmarks._setup import setup_django, temp_db_path, trade_details
+
+PAIRS = [["USD", "EUR"], ["EUR", "USD"], ["USD", "JPY"], ["GBP", "USD"],
+         ["USD", "CAD"], ["USD", "CHF"], ["EUR", "USD", "GBP"], ["USD", "AUD"]]
+
+
+def _seed(n):
+    from trades_approval.models import Trade
+    from trades_approval.services.use_cases import bulk_create_and_submit
+
+    details = [trade_details(underlying=PAIRS[i % len(PAIRS)]) for i in range(n)]
+    bulk_create_and_submit(details, actor_id="user_001", chunk_size=5000)
+    ids = list(Trade.objects.order_by("id").values_list("id", flat=True)[::4])
+    Trade.objects.filter(id__in=ids).update(state="Approved", approver_id="user_002")
+
+
+def _best(fn, runs=5):
+    best = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        wall = time.perf_counter() - t0
+        best = wall if best is None or wall < best else best
+    return best, result
+
+
+def main(n=200000):
+    db_path = temp_db_path("bench-currency")
+    setup_django(db_path)
+    try:
+        _compare(n)
+    finally:
+        from django.db import connections
+
+        connections["default"].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+
+def _compare(n):
+    from trades_approval.models import Trade
+    from trades_approval.services.queries import trades_by_currency
+
+    _seed(n)
+    open_states = ["PendingApproval", "Approved"]
+
+    def python_scan():
+        return [
+            trade_id for trade_id, underlying, state in Trade.objects.values_list("id", "underlying", "state")
+            if "CHF" in underlying and state in open_states
+        ]
+
+    def index_page():
+        return list(trades_by_currency("CHF", open_states).order_by("-underlying_trade_id").values_list("id", flat=True)[:50])
+
+    def index_count():
+        return trades_by_currency("CHF", open_states).count()
+
+    print(f"{n} trades, currency CHF, states {','.join(open_states)}\n")
+    print(f"{'lookup':<16}{'ms':>10}{'rows':>9}")
+    scan_s, scanned = _best(python_scan, runs=3)
+    print(f"{'python scan':<16}{scan_s * 1e3:>10.1f}{len(scanned):>9}")
+    page_s, page = _best(index_page)
+    print(f"{'index, page':<16}{page_s * 1e3:>10.2f}{len(page):>9}")
+    count_s, count = _best(index_count)
+    print(f"{'index, count':<16}{count_s * 1e3:>10.1f}{count:>9}")
+    assert count == len(scanned) and page == sorted(scanned, reverse=True)[:50]
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
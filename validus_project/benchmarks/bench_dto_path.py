@@ -0,0 +1,129 @@
+"""
+Per-transition time and allocations of the DTO path, before and after slotting.
+
+    python -m benchmarks.bench_dto_path [N]
+
+"before" is the previous implementation, reproduced below: an unslotted
+frozen dataclass, dto_from_model copying `underlying`, dataclasses.replace()
+per transition and update() reading all 11 tradeUpdateDetails keys with .get.
+"after" is the current TradeDTO / evolve() / trade_workflow code. Each row
+maps a Trade to a DTO and runs one transition; no database is touched.
+
+- us/op:     wall time per mapped transition (tracemalloc off)
+- peak B/op: bytes allocated at the high-water mark of one transition
+- DTO B:     retained size of one resulting DTO (object plus its __dict__)
+"""
+import sys
+import time
+import tracemalloc
+from dataclasses import fields, make_dataclass, replace
+from datetime import date
+from decimal import Decimal
+
+from benchmarks._setup import setup_django
+
+UPDATE = {"notionalAmount": Decimal("2000000.00"), "counterparty": "Bank of France"}
+
+
+def _legacy():
+    from trades_approval.dto import TradeDTO
+
+    LegacyDTO = make_dataclass("LegacyDTO", [(f.name, f.type) for f in fields(TradeDTO)], frozen=True)
+
+    def from_model(m):
+        return LegacyDTO(
+            id=m.id, trading_entity=m.trading_entity, counterparty=m.counterparty, direction=m.direction,
+            style=m.style, notional_currency=m.notional_currency, notional_amount=m.notional_amount,
+            underlying=list(m.underlying or []), trade_date=m.trade_date, value_date=m.value_date,
+            delivery_date=m.delivery_date, strike=m.strike, requester_id=m.requester_id,
+            approver_id=m.approver_id, state=m.state, version=m.version,
+        )
+
+    def approve(dto, actor_id):
+        if dto.state not in {"PendingApproval", "NeedsReapproval"}:
+            raise ValueError
+        if actor_id == dto.requester_id:
+            raise ValueError
+        return replace(dto, approver_id=actor_id, state="Approved", version=dto.version + 1)
+
+    def update(dto, actor_id, d):
+        if dto.state not in {"PendingApproval", "NeedsReapproval"}:
+            raise ValueError
+        working = replace(dto, approver_id=actor_id) if dto.approver_id is None else dto
+        return replace(working,
+                       trading_entity=d.get("tradingEntity", dto.trading_entity),
+                       counterparty=d.get("counterparty", dto.counterparty),
+                       direction=d.get("direction", dto.direction),
+                       style=d.get("style", dto.style),
+                       notional_currency=d.get("notionalCurrency", dto.notional_currency),
+                       notional_amount=d.get("notionalAmount", dto.notional_amount),
+                       underlying=d.get("underlying", dto.underlying),
+                       trade_date=d.get("tradeDate", dto.trade_date),
+                       value_date=d.get("valueDate", dto.value_date),
+                       delivery_date=d.get("deliveryDate", dto.delivery_date),
+                       strike=d.get("strike", dto.strike),
+                       state="NeedsReapproval",
+                       version=dto.version + 1)
+
+    return from_model, approve, update
+
+
+def _current():
+    from trades_approval.mappers import dto_from_model
+    from trades_approval.services.trade_workflow import approve, update
+    return dto_from_model, approve, update
+
+
+def _retained_size(obj):
+    return sys.getsizeof(obj) + (sys.getsizeof(obj.__dict__) if hasattr(obj, "__dict__") else 0)
+
+
+def _measure(op, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        op()
+    per_op_us = (time.perf_counter() - t0) / n * 1e6
+
+    samples = min(n, 2000)
+    tracemalloc.start()
+    total = 0
+    for _ in range(samples):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        op()
+        total += tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return per_op_us, total / samples, _retained_size(op())
+
+
+def main(n=50000):
+    setup_django()
+    from trades_approval.models import Trade
+
+    trade = Trade(
+        id=1, trading_entity="Validus Capital Ltd", counterparty="Bank of England", direction="BUY",
+        style="FORWARD", notional_currency="USD", notional_amount=Decimal("5000000.00"), underlying=["USD", "EUR"],
+        trade_date=date(2025, 11, 1), value_date=date(2025, 11, 5), delivery_date=date(2025, 11, 10),
+        requester_id="user_001", state="PendingApproval", version=2,
+    )
+
+    print(f"{'path':<8}{'transition':<12}{'us/op':>9}{'peak B/op':>12}{'DTO B':>8}")
+    results = {}
+    for label, (from_model, approve, update) in (("before", _legacy()), ("after", _current())):
+        ops = {
+            "approve": lambda: approve(from_model(trade), "user_002"),
+            "update": lambda: update(from_model(trade), "user_002", UPDATE),
+        }
+        for name, op in ops.items():
+            us, peak, size = _measure(op, n)
+            results[label, name] = us
+            print(f"{label:<8}{name:<12}{us:>9.2f}{peak:>12.0f}{size:>8}")
+
+    for name in ("approve", "update"):
+        saving = 1 - results["after", name] / results["before", name]
+        print(f"\n{name}: {saving:.0%} less time per transition", end="")
+    print()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,65 @@
+"""
+Parsing write payloads: DRF serializer per request vs the precompiled schemas.
+
+    python -m benchmarks.bench_request_parsing [N]
+
+Each row validates the same already-decoded JSON body N times, the way the
+submit / update / book views do. "serializer" builds the serializer class per
+call (field deep-copy, bind, run_validation); "schema" is schemas.py. Invalid
+payloads go through DRF on both sides, so the last row is expected to be
+roughly even. No database is touched.
+"""
+import sys
+import time
+
+from benchmarks._setup import setup_django
+
+DETAILS = {
+    "tradingEntity": "Validus Capital Ltd", "counterparty": "Bank of England", "direction": "BUY",
+    "style": "FORWARD", "notionalCurrency": "USD", "notionalAmount": "5000000.00",
+    "underlying": ["USD", "EUR"], "tradeDate": "2025-11-01", "valueDate": "2025-11-05",
+    "deliveryDate": "2025-11-10",
+}
+UPDATE = {"notionalAmount": "2000000.00", "counterparty": "Bank of France"}
+BOOK = {"userId": "user_002", "strike": "1.234500", "expectedVersion": 3}
+INVALID = dict(DETAILS, tradeDate="2025-13-01")
+
+
+def _time(fn, payload, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(payload)
+    return time.perf_counter() - t0
+
+
+def main(n=20000):
+    setup_django()
+    from trades_approval.schemas import BOOK_SCHEMA, TRADE_DETAILS_SCHEMA, TRADE_UPDATE_SCHEMA
+    from trades_approval.serializers import BookSerializer, TradeDetailsSerializer, TradeUpdateSerializer
+
+    def drf(serializer_class):
+        def run(data):
+            s = serializer_class(data=data)
+            s.is_valid()
+            return s
+        return run
+
+    cases = [
+        ("submit details", TradeDetailsSerializer, TRADE_DETAILS_SCHEMA, DETAILS),
+        ("update details", TradeUpdateSerializer, TRADE_UPDATE_SCHEMA, UPDATE),
+        ("book", BookSerializer, BOOK_SCHEMA, BOOK),
+        ("submit, invalid", TradeDetailsSerializer, TRADE_DETAILS_SCHEMA, INVALID),
+    ]
+    print(f"{n} payloads per row\n")
+    print(f"{'payload':<18}{'serializer us':>15}{'schema us':>11}{'speedup':>9}")
+    for label, serializer_class, schema, payload in cases:
+        s, c = drf(serializer_class)(payload), schema(payload)
+        assert s.is_valid() == c.is_valid()
+        assert (dict(s.validated_data) if c.is_valid() else s.errors) == (c.validated_data if c.is_valid() else c.errors)
+        slow = _time(drf(serializer_class), payload, n)
+        fast = _time(schema, payload, n)
+        print(f"{label:<18}{slow / n * 1e6:>15.1f}{fast / n * 1e6:>11.1f}{slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
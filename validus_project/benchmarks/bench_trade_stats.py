@@ -0,0 +1,95 @@
+"""
+Dashboard stats: GROUP BY over the trade table vs the TradeSummary rows.
+
+    python -m benchmarks.bench_trade_stats [N]
+
+Seeds N submitted trades across 23 counterparties, 4 currencies and both
+directions with TRADE_STATS_SUMMARY on, then times trade_stats() from each
+source for a few groupings (best of 5, file-backed SQLite). The last rows show
+what keeping the summary costs a single approve. Both sources must return the
+same groups.
+"""
+import os
+import sys
+import time
+from decimal import Decimal
+
+from benchmarks._setup import setup_django, temp_db_path, trade_details
+
+GROUPINGS = [["state"], ["state", "currency"], ["counterparty", "currency", "direction"]]
+CURRENCIES = [["USD", "EUR"], ["EUR", "USD"], ["GBP", "USD"], ["JPY", "USD"]]
+
+
+def _seed(n):
+    from trades_approval.services.use_cases import bulk_create_and_submit
+
+    details = [
+        trade_details(
+            counterparty=f"Bank {i % 23}", direction=("BUY", "SELL")[i % 2],
+            notionalCurrency=CURRENCIES[i % 4][0], underlying=CURRENCIES[i % 4],
+            notionalAmount=Decimal(1000 + i % 997),
+        )
+        for i in range(n)
+    ]
+    bulk_create_and_submit(details, actor_id="user_001", chunk_size=5000)
+
+
+def _best(fn, runs=5):
+    best = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        wall = time.perf_counter() - t0
+        best = wall if best is None or wall < best else best
+    return best, result
+
+
+def _approve_ms(ids):
+    from trades_approval.models import Trade
+    from trades_approval.services.use_cases import approve_trade
+
+    t0 = time.perf_counter()
+    for trade_id in ids:
+        approve_trade(Trade.objects.get(id=trade_id), "user_002")
+    return (time.perf_counter() - t0) / len(ids) * 1e3
+
+
+def main(n=100000):
+    db_path = temp_db_path("bench-stats")
+    setup_django(db_path)
+    try:
+        _compare(n)
+    finally:
+        from django.db import connections
+
+        connections["default"].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+
+def _compare(n):
+    from django.conf import settings
+    from trades_approval.models import Trade
+    from trades_approval.services.stats import trade_stats
+
+    settings.TRADE_STATS_SUMMARY = True
+    _seed(n)
+
+    print(f"{n} trades\n")
+    print(f"{'groupBy':<32}{'groups':>7}{'live ms':>10}{'summary ms':>12}")
+    for dims in GROUPINGS:
+        live_s, live = _best(lambda: trade_stats(dims, source="live"))
+        summary_s, summary = _best(lambda: trade_stats(dims, source="summary"))
+        assert live["groups"] == summary["groups"]
+        print(f"{','.join(dims):<32}{len(live['groups']):>7}{live_s * 1e3:>10.1f}{summary_s * 1e3:>12.2f}")
+
+    ids = list(Trade.objects.order_by("id").values_list("id", flat=True)[:400])
+    on = _approve_ms(ids[:200])
+    settings.TRADE_STATS_SUMMARY = False
+    off = _approve_ms(ids[200:])
+    print(f"\napprove, ms each: {off:.2f} without the summary, {on:.2f} maintaining it")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
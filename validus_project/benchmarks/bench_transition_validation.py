@@ -0,0 +1,40 @@
+"""
+Per-transition cost of full_clean() vs changed-field validation.
+
+    python -m benchmarks.bench_transition_validation [N]
+"""
+import sys
+import time
+
+from benchmarks._setup import setup_django, seed_pending_trades
+
+
+def main(n=2000):
+    setup_django()
+    from trades_approval.models import Trade
+    from trades_approval.services.trade_workflow import approve
+    from trades_approval.services.use_cases import _run_transition
+
+    print(f"{'mode':<10}{'transitions':>12}{'wall us/op':>12}{'cpu us/op':>12}")
+    results = {}
+    for mode in ("full", "changed"):
+        trades = list(Trade.objects.filter(id__in=seed_pending_trades(n)))
+        w0, c0 = time.perf_counter(), time.process_time()
+        for trade in trades:
+            _run_transition(
+                trade=trade,
+                actor_id="user_002",
+                wf_fn=approve,
+                action_name="Approve",
+                validation=mode,
+            )
+        wall, cpu = time.perf_counter() - w0, time.process_time() - c0
+        results[mode] = cpu / n
+        print(f"{mode:<10}{n:>12}{wall / n * 1e6:>12.1f}{cpu / n * 1e6:>12.1f}")
+
+    saving = 1 - results["changed"] / results["full"]
+    print(f"\nchanged-field validation saves {saving:.0%} CPU per transition")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,92 @@
+"""
+"Pending for me" badge: COUNT over trades vs the WorkQueueCounter rows.
+
+    python -m benchmarks.bench_work_queue_counts [N] [USERS]
+
+Seeds N submitted trades spread over USERS requesters, approves or updates
+some of them so the counted states and approvers vary, then times one badge
+refresh per user (best of 3 passes, file-backed SQLite):
+
+- count query: COUNT(*) per counted state where the user is requester or
+               approver, the query the badge needed before the counters
+- counters:    services.counters.user_counts(), one indexed read per user
+
+Both must agree for every user.
+"""
+import os
+import sys
+import time
+
+from benchmarks._setup import setup_django, temp_db_path, trade_details
+
+
+def _seed(n, users):
+    from trades_approval.models import Trade
+    from trades_approval.services.use_cases import approve_trade, bulk_create_and_submit, update_trade
+
+    per_user = n // users
+    for u in range(users):
+        bulk_create_and_submit([trade_details() for _ in range(per_user)], actor_id=f"user_{u}", chunk_size=5000)
+    for i, trade in enumerate(Trade.objects.order_by("id")[:2000]):
+        approver = f"user_{(i + 1) % users}"
+        if approver == trade.requester_id:
+            continue
+        if i % 2:
+            approve_trade(trade, approver)
+        else:
+            update_trade(trade, approver, {"counterparty": "Bank of France"})
+
+
+def _count_query(user_id):
+    from django.db.models import Count, Q
+    from trades_approval.models import Trade
+    from trades_approval.services.counters import COUNTED_STATES
+
+    rows = (Trade.objects.filter(Q(requester_id=user_id) | Q(approver_id=user_id), state__in=COUNTED_STATES)
+            .values("state").annotate(n=Count("id")).order_by())
+    found = {row["state"]: row["n"] for row in rows}
+    return {state: found.get(state, 0) for state in COUNTED_STATES}
+
+
+def _time(fn, user_ids, passes=3):
+    best = None
+    for _ in range(passes):
+        t0 = time.perf_counter()
+        results = [fn(u) for u in user_ids]
+        wall = time.perf_counter() - t0
+        best = wall if best is None or wall < best else best
+    return best, results
+
+
+def main(n=100000, users=200):
+    db_path = temp_db_path("bench-badges")
+    setup_django(db_path)
+    try:
+        _seed(n, users)
+        _compare(users)
+    finally:
+        from django.db import connections
+
+        connections["default"].close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+
+
+def _compare(users):
+    from trades_approval.services.counters import user_counts
+
+    user_ids = [f"user_{u}" for u in range(users)]
+    count_s, counted = _time(_count_query, user_ids)
+    counter_s, read = _time(user_counts, user_ids)
+    assert counted == read
+
+    print(f"{users} badge refreshes\n")
+    print(f"{'source':<14}{'us/badge':>10}")
+    print(f"{'count query':<14}{count_s / users * 1e6:>10.0f}")
+    print(f"{'counters':<14}{counter_s / users * 1e6:>10.0f}")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    main(*args)
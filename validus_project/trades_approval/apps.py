@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TradesApprovalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'trades_approval'
+
+    def ready(self):
+        from .indexes import create_postgres_indexes
+
+        post_migrate.connect(create_postgres_indexes, sender=self)
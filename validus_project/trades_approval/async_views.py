@@ -0,0 +1,128 @@
+"""
+ASGI-native variant of the transition endpoints: /api/async/trades/<id>/<action>/.
+
+Request and response bodies match the TradeViewSet actions. The blocking part
+(trade lookup, request validation, _run_transition) runs in a bounded thread
+pool instead of Django's single thread-sensitive executor, so one ASGI worker can
+keep TRADE_ASYNC_WORKERS transitions in flight while the event loop keeps
+accepting requests.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .models import Trade
+from .schemas import TRADE_UPDATE_SCHEMA, BOOK_SCHEMA
+from .services.use_cases import (
+    approve_trade, cancel_trade, update_trade, send_to_execute_trade, book_trade,
+    ConcurrentUpdate, TradeLocked,
+)
+from .services.trade_workflow import InvalidTransition, PermissionDenied
+from .views import _PreconditionFailed, _parse_expected_version
+
+# action -> HTTP method, matching the sync TradeViewSet routes.
+ASYNC_ACTIONS = {
+    "approve": "POST",
+    "cancel": "POST",
+    "update": "PATCH",
+    "send-to-execute": "POST",
+    "book": "POST",
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=int(getattr(settings, "TRADE_ASYNC_WORKERS", 8)),
+            thread_name_prefix="trade-async",
+        )
+    return _executor
+
+
+def _load_trade(pk: int) -> Trade:
+    return Trade.objects.get(pk=pk)
+
+
+def _perform(pk: int, action: str, body: Dict[str, Any], if_match: Optional[str]) -> Tuple[Dict[str, Any], int]:
+    # Pool threads outlive requests, so manage their connections like Django's request cycle does.
+    close_old_connections()
+    try:
+        return _transition(pk, action, body, if_match)
+    finally:
+        close_old_connections()
+
+
+def _transition(pk: int, action: str, body: Dict[str, Any], if_match: Optional[str]) -> Tuple[Dict[str, Any], int]:
+    try:
+        trade = _load_trade(pk)
+    except Trade.DoesNotExist:
+        return {"detail": "No Trade matches the given query."}, 404
+
+    if action == "book":
+        s = BOOK_SCHEMA(body)
+        if not s.is_valid():
+            return s.errors, 400
+        actor_id = s.validated_data["userId"]
+    else:
+        actor_id = body.get("userId")
+        if not actor_id:
+            return {"error": "userId is required."}, 400
+    try:
+        expected_version = _parse_expected_version(if_match, body.get("expectedVersion"), trade.id)
+    except _PreconditionFailed as e:
+        return {"detail": str(e)}, 412
+    except ValueError:
+        return {"error": "expectedVersion must be an integer."}, 400
+
+    try:
+        if action == "approve":
+            approve_trade(trade, actor_id=actor_id, expected_version=expected_version)
+        elif action == "cancel":
+            cancel_trade(trade, actor_id=actor_id, expected_version=expected_version)
+        elif action == "update":
+            s = TRADE_UPDATE_SCHEMA(body.get("tradeUpdateDetails") or {}, context={"trade": trade})
+            if not s.is_valid():
+                return s.errors, 400
+            update_trade(trade, actor_id=actor_id, trade_detail=s.validated_data, expected_version=expected_version)
+        elif action == "send-to-execute":
+            send_to_execute_trade(trade, actor_id=actor_id, expected_version=expected_version)
+        else:
+            book_trade(trade, actor_id=actor_id, strike=s.validated_data["strike"], expected_version=expected_version)
+            return {"id": trade.id, "state": trade.state, "strike": str(trade.strike)}, 200
+        return {"id": trade.id, "state": trade.state}, 200
+    except (InvalidTransition, PermissionDenied) as e:
+        return {"detail": str(e)}, 400
+    except ConcurrentUpdate as e:
+        return {"detail": str(e)}, 409
+    except TradeLocked as e:
+        return {"detail": str(e)}, 423
+    except Exception as e:
+        return {"detail": f"Internal error: {str(e)}"}, 500
+
+
+@csrf_exempt
+async def transition(request, pk: int, action: str):
+    method = ASYNC_ACTIONS.get(action)
+    if method is None:
+        return JsonResponse({"detail": "Not found."}, status=404)
+    if request.method != method:
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    try:
+        body = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"detail": "Malformed JSON body."}, status=400)
+    if not isinstance(body, dict):
+        return JsonResponse({"detail": "Request body must be a JSON object."}, status=400)
+
+    run = sync_to_async(_perform, thread_sensitive=False, executor=_pool())
+    payload, status = await run(pk, action, body, request.headers.get("If-Match"))
+    return JsonResponse(payload, status=status)
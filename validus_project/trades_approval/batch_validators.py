@@ -0,0 +1,166 @@
+"""
+Columnar counterpart of validators.py for validating many trades at once.
+
+Inputs are parallel columns (one entry per trade) rather than TradeDTOs.
+Columns that arrive as NumPy arrays (a columnar upload, a DataFrame) are
+checked with a handful of vectorised array operations. Python lists go through
+one fused loop instead: turning lists of date and str objects into arrays costs
+more than the checks themselves, so NumPy only pays off for array input.
+Either way the result holds a per-row invalid mask and, per row, the message
+the scalar validators would raise first (dates, then underlying, then strike).
+"""
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from .dto import TradeDTO
+from .validators import DATE_ORDER_MESSAGE, UNDERLYING_MESSAGE, STRIKE_MESSAGE
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is absent
+    np = None
+
+HAS_NUMPY = np is not None
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@dataclass(frozen=True)
+class BatchResult:
+    # numpy bool array when NumPy is available, else a list of bools.
+    invalid: Sequence[bool]
+    messages: List[Optional[str]]
+
+    @property
+    def error_count(self) -> int:
+        return int(sum(self.invalid))
+
+    def errors(self) -> List[Tuple[int, str]]:
+        """(row index, message) for each invalid row, in row order."""
+        return [(i, m) for i, m in enumerate(self.messages) if m is not None]
+
+
+def validate_columns(
+    trade_dates: Sequence[Any],
+    value_dates: Sequence[Any],
+    delivery_dates: Sequence[Any],
+    currencies: Sequence[str],
+    underlyings: Sequence[Sequence[str]],
+    strikes: Optional[Sequence[Any]] = None,
+    states: Optional[Sequence[str]] = None,
+    *,
+    use_numpy: Optional[bool] = None,
+) -> BatchResult:
+    """
+    Validate trades given column-wise.
+
+    Dates may be date objects or anything numpy.datetime64 accepts. underlyings
+    holds one currency list per row (a 2-D array of pairs is used as is). A
+    float strikes array marks "no strike" with NaN. The strike rule runs only
+    when both strikes and states are given.
+
+    use_numpy defaults to the NumPy path when NumPy is installed and the date
+    columns are arrays; pass True or False to force either path.
+    """
+    n = len(trade_dates)
+    if not all(len(col) == n for col in (value_dates, delivery_dates, currencies, underlyings)):
+        raise ValueError("All columns must have the same length.")
+    check_strike = strikes is not None and states is not None
+    if check_strike and not (len(strikes) == len(states) == n):
+        raise ValueError("All columns must have the same length.")
+
+    if use_numpy is None:
+        use_numpy = HAS_NUMPY and isinstance(trade_dates, np.ndarray)
+    if use_numpy and not HAS_NUMPY:
+        raise ImportError("NumPy is not installed.")
+    validate = _validate_numpy if use_numpy else _validate_python
+    return validate(trade_dates, value_dates, delivery_dates, currencies, underlyings,
+                    strikes if check_strike else None, states if check_strike else None)
+
+
+def columns_from_dtos(dtos: Iterable[TradeDTO]) -> dict:
+    cols = {k: [] for k in ("trade_dates", "value_dates", "delivery_dates", "currencies", "underlyings",
+                            "strikes", "states")}
+    for d in dtos:
+        cols["trade_dates"].append(d.trade_date)
+        cols["value_dates"].append(d.value_date)
+        cols["delivery_dates"].append(d.delivery_date)
+        cols["currencies"].append(d.notional_currency)
+        cols["underlyings"].append(d.underlying)
+        cols["strikes"].append(d.strike)
+        cols["states"].append(d.state)
+    return cols
+
+
+def validate_dtos(dtos: Iterable[TradeDTO], *, use_numpy: Optional[bool] = None) -> BatchResult:
+    return validate_columns(**columns_from_dtos(dtos), use_numpy=use_numpy)
+
+
+def _validate_python(trade_dates, value_dates, delivery_dates, currencies, underlyings, strikes, states):
+    messages: List[Optional[str]] = []
+    for i, (td, vd, dd, ccy, und) in enumerate(zip(trade_dates, value_dates, delivery_dates, currencies, underlyings)):
+        if not (td <= vd <= dd):
+            messages.append(DATE_ORDER_MESSAGE)
+        elif ccy not in und:
+            messages.append(UNDERLYING_MESSAGE)
+        elif strikes is not None and states[i] != "Executed" and strikes[i] is not None:
+            messages.append(STRIKE_MESSAGE)
+        else:
+            messages.append(None)
+    return BatchResult(invalid=[m is not None for m in messages], messages=messages)
+
+
+def _days(column):
+    """Days since the epoch as int64. numpy converts date objects slowly, so lists go through toordinal()."""
+    if not isinstance(column, np.ndarray) and len(column) and isinstance(column[0], date):
+        return np.fromiter(map(date.toordinal, column), dtype=np.int64, count=len(column)) - _EPOCH_ORDINAL
+    return np.asarray(column, dtype="datetime64[D]").astype(np.int64)
+
+
+def _contains_currency(ccy, underlyings):
+    """Per row, whether ccy appears in that row's underlying, compared one underlying column at a time."""
+    present = None
+    if isinstance(underlyings, np.ndarray) and underlyings.ndim == 2:
+        grid = underlyings
+    else:
+        lengths = np.fromiter(map(len, underlyings), dtype=np.intp, count=len(underlyings))
+        width = int(lengths.max()) if len(lengths) else 0
+        if width and (lengths == width).all():
+            grid = np.array(underlyings, dtype=str).reshape(len(underlyings), width)
+        else:
+            # Ragged rows are padded; `present` masks the padding out.
+            grid = np.full((len(underlyings), width), "", dtype=object)
+            for row, u in enumerate(underlyings):
+                grid[row, :len(u)] = list(u)
+            grid = grid.astype(str)
+            present = np.arange(width) < lengths[:, None]
+    found = np.zeros(len(ccy), dtype=bool)
+    for k in range(grid.shape[1]):
+        hit = grid[:, k] == ccy
+        found |= hit if present is None else hit & present[:, k]
+    return found
+
+
+def _validate_numpy(trade_dates, value_dates, delivery_dates, currencies, underlyings, strikes, states):
+    n = len(trade_dates)
+    td, vd, dd = _days(trade_dates), _days(value_dates), _days(delivery_dates)
+    bad_dates = ~((td <= vd) & (vd <= dd))
+
+    ccy = currencies if isinstance(currencies, np.ndarray) else np.array(currencies, dtype=str)
+    bad_underlying = ~_contains_currency(ccy, underlyings)
+
+    invalid = bad_dates | bad_underlying
+    messages = np.full(n, None, dtype=object)
+    if strikes is not None:
+        if isinstance(strikes, np.ndarray) and strikes.dtype.kind == "f":
+            has_strike = ~np.isnan(strikes)
+        else:
+            has_strike = np.fromiter((s is not None for s in strikes), dtype=bool, count=n)
+        bad_strike = has_strike & (np.asarray(states) != "Executed")
+        invalid |= bad_strike
+        messages[bad_strike] = STRIKE_MESSAGE
+    # Assigned in reverse rule order so each row keeps the first failure, as the scalar validators raise it.
+    messages[bad_underlying] = UNDERLYING_MESSAGE
+    messages[bad_dates] = DATE_ORDER_MESSAGE
+    return BatchResult(invalid=invalid, messages=messages.tolist())
@@ -1,15 +1,16 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
 from datetime import date
 from decimal import Decimal
+from operator import attrgetter
 from typing import List, Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TradeDTO:
     id: int
     trading_entity: str
     counterparty: str
-    direction: str  
+    direction: str
     style: str
     notional_currency: str
     notional_amount: Decimal
@@ -21,4 +22,20 @@ class TradeDTO:
     requester_id: str
     approver_id: Optional[str]
     state: str
-    version: int
\ No newline at end of file
+    version: int
+
+
+_FIELD_INDEX = {f.name: i for i, f in enumerate(fields(TradeDTO))}
+_all_values = attrgetter(*_FIELD_INDEX)
+
+
+def evolve(dto: TradeDTO, **changes) -> TradeDTO:
+    """
+    dataclasses.replace() for TradeDTO without its per-field bookkeeping:
+    reads every slot in one attrgetter call, patches the changed positions
+    and builds the new DTO positionally.
+    """
+    values = list(_all_values(dto))
+    for name, value in changes.items():
+        values[_FIELD_INDEX[name]] = value
+    return TradeDTO(*values)
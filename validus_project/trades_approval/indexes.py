@@ -0,0 +1,33 @@
+"""
+Indexes that only exist on PostgreSQL.
+
+Django cannot declare a per-backend index in Meta.indexes, and a GIN index
+has no SQLite equivalent, so these are created after `migrate` when the
+target database is PostgreSQL. JSONField columns (Trade.underlying,
+TradeVersion.snapshot) are already jsonb there.
+
+UNDERLYING_GIN_INDEX uses jsonb_path_ops, which serves containment lookups
+such as Trade.objects.filter(underlying__contains=["EUR"]).
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+
+UNDERLYING_GIN_INDEX = "trade_underlying_gin_idx"
+
+
+def postgres_index_sql(quote_name) -> list:
+    from .models import Trade
+
+    return [
+        f"CREATE INDEX IF NOT EXISTS {quote_name(UNDERLYING_GIN_INDEX)} "
+        f"ON {quote_name(Trade._meta.db_table)} USING gin ({quote_name('underlying')} jsonb_path_ops)",
+    ]
+
+
+def create_postgres_indexes(sender=None, using=DEFAULT_DB_ALIAS, **kwargs) -> None:
+    """post_migrate receiver; a no-op on other backends."""
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for sql in postgres_index_sql(connection.ops.quote_name):
+            cursor.execute(sql)
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from trades_approval.models import Trade
+from trades_approval.services.versioning import reencode_trade_versions
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode stored TradeVersion rows as periodic keyframes plus field-level deltas "
+        "(or back to full snapshots with --expand)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=getattr(settings, "TRADE_VERSION_KEYFRAME_INTERVAL", 10),
+            help="Store a full keyframe every N versions (default: TRADE_VERSION_KEYFRAME_INTERVAL).",
+        )
+        parser.add_argument("--expand", action="store_true", help="Rewrite every version as a full snapshot.")
+        parser.add_argument("--trade", type=int, action="append", dest="trade_ids", help="Limit to these trade ids.")
+
+    def handle(self, *args, interval, expand, trade_ids, **options):
+        if interval < 1:
+            raise CommandError("--interval must be at least 1.")
+
+        ids = Trade.objects.order_by("id").values_list("id", flat=True)
+        if trade_ids:
+            ids = ids.filter(id__in=trade_ids)
+
+        trades = rows = 0
+        for trade_id in ids.iterator(chunk_size=2000):
+            rows += reencode_trade_versions(trade_id, interval=interval, expand=expand)
+            trades += 1
+
+        mode = "expanded" if expand else f"compacted (keyframe interval {interval})"
+        self.stdout.write(self.style.SUCCESS(f"{trades} trades {mode}; {rows} version rows rewritten."))
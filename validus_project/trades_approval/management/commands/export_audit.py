@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from trades_approval.services.export import (
+    EXPORT_CHUNK_SIZE, EXPORT_KINDS, EXPORT_OUTPUTS, iter_export_rows, parse_instant, render_export
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Export ActionLog or TradeVersion rows created in [--from, --to) across all trades, "
+        "as NDJSON, CSV or columnar row groups."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--kind", choices=sorted(EXPORT_KINDS), default="actions")
+        parser.add_argument("--from", dest="start", required=True, help="Inclusive ISO date or datetime.")
+        parser.add_argument("--to", dest="end", required=True, help="Exclusive ISO date or datetime.")
+        parser.add_argument("--output", choices=sorted(EXPORT_OUTPUTS), default="ndjson")
+        parser.add_argument("--file", help="Write to this path instead of stdout.")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows per keyset page.")
+
+    def handle(self, *args, kind, start, end, output, file, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+        try:
+            start = parse_instant("--from", start)
+            end = parse_instant("--to", end)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = render_export(kind, output, iter_export_rows(kind, start, end, chunk_size=chunk_size))
+        if not file:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(file, "w", newline="") as out:
+            out.writelines(chunks)
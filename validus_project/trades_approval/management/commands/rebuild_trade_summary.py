@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trades_approval.services.stats import rebuild_summary, summary_enabled
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the TradeSummary rows behind /api/trades/stats/ from the trade table, "
+        "e.g. right after enabling TRADE_STATS_SUMMARY."
+    )
+
+    def handle(self, *args, **options):
+        # One transaction, so the stats endpoint never reads a half-rebuilt table.
+        with transaction.atomic():
+            groups = rebuild_summary()
+        self.stdout.write(self.style.SUCCESS(f"{groups} summary groups rebuilt."))
+        if not summary_enabled():
+            self.stdout.write(self.style.WARNING(
+                "TRADE_STATS_SUMMARY is off: transitions will not keep these rows current."
+            ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from trades_approval.models import Trade
+from trades_approval.services.underlying import sync_underlying
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the TradeUnderlying currency rows from Trade.underlying, e.g. after "
+        "adding the table to a database that already holds trades."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=2000, help="Trades rewritten per transaction.")
+
+    def handle(self, *args, chunk_size, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        trades = Trade.objects.order_by("id").only("id", "underlying").iterator(chunk_size=chunk_size)
+        total = 0
+        batch = []
+        for trade in trades:
+            batch.append(trade)
+            if len(batch) == chunk_size:
+                total += self._rebuild(batch)
+                batch = []
+        if batch:
+            total += self._rebuild(batch)
+        self.stdout.write(self.style.SUCCESS(f"{total} trades reindexed."))
+
+    def _rebuild(self, batch):
+        with transaction.atomic():
+            sync_underlying(batch)
+        return len(batch)
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trades_approval.services.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-user work-queue counters behind /api/trades/work-queue/counts/ "
+        "from the trade table."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rows = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"{rows} work-queue counters rebuilt."))
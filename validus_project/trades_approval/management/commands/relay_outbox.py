@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from trades_approval.services.outbox import RELAY_BATCH_SIZE, get_sink, relay_pending
+
+
+class Command(BaseCommand):
+    help = "Publish unpublished OutboxEvent rows to the TRADE_OUTBOX_SINK in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=RELAY_BATCH_SIZE)
+        parser.add_argument("--follow", action="store_true", help="Keep polling for new events until interrupted.")
+        parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls with --follow.")
+
+    def handle(self, *args, batch_size, follow, interval, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        sink = get_sink()
+        total = relay_pending(sink, batch_size)
+        try:
+            while follow:
+                time.sleep(interval)
+                total += relay_pending(sink, batch_size)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{total} events published."))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from trades_approval.batch_validators import validate_columns
+from trades_approval.models import Trade
+
+_COLUMNS = ("id", "trade_date", "value_date", "delivery_date", "notional_currency", "underlying", "strike", "state")
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-validate stored trades against the trade detail rules in column batches "
+        "and list the trades that fail."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=10000, help="Trades validated per batch.")
+        parser.add_argument("--state", action="append", dest="states", help="Only trades in this state.")
+
+    def handle(self, *args, chunk_size, states, **options):
+        if chunk_size < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        qs = Trade.objects.order_by("id")
+        if states:
+            qs = qs.filter(state__in=states)
+        rows = qs.values_list(*_COLUMNS).iterator(chunk_size=chunk_size)
+
+        checked = failed = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunk_size:
+                failed += self._validate(batch)
+                checked += len(batch)
+                batch = []
+        if batch:
+            failed += self._validate(batch)
+            checked += len(batch)
+
+        summary = f"{checked} trades checked; {failed} invalid."
+        self.stdout.write(self.style.WARNING(summary) if failed else self.style.SUCCESS(summary))
+
+    def _validate(self, batch):
+        ids, trade_dates, value_dates, delivery_dates, currencies, underlyings, strikes, states = zip(*batch)
+        result = validate_columns(
+            trade_dates, value_dates, delivery_dates, currencies,
+            [u or [] for u in underlyings], strikes, states,
+        )
+        for idx, message in result.errors():
+            self.stdout.write(f"trade {ids[idx]}: {message}")
+        return result.error_count
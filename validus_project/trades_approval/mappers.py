@@ -1,6 +1,7 @@
+from functools import lru_cache
 from .dto import TradeDTO
 from .models import Trade
-from typing import Dict, Any
+from typing import Dict, Any, FrozenSet, Set
 
 def dto_from_model(m: Trade) -> TradeDTO:
     return TradeDTO(
@@ -11,7 +12,8 @@ def dto_from_model(m: Trade) -> TradeDTO:
         style=m.style,
         notional_currency=m.notional_currency,
         notional_amount=m.notional_amount,
-        underlying=list(m.underlying or []),
+        # Shared, not copied: the DTO is frozen and the workflow replaces the list rather than mutating it.
+        underlying=m.underlying if m.underlying is not None else [],
         trade_date=m.trade_date,
         value_date=m.value_date,
         delivery_date=m.delivery_date,
@@ -22,13 +24,15 @@ def dto_from_model(m: Trade) -> TradeDTO:
         version=m.version,
     )
 
-def dto_to_model(dto: TradeDTO, trade: Trade) -> Trade:
-    model_field_names = {f.name for f in trade._meta.fields}
+@lru_cache(maxsize=None)
+def _mapped_field_names(model_cls) -> FrozenSet[str]:
     skip = {"id", "created_at", "updated_at"}
+    return frozenset(f.name for f in model_cls._meta.fields if f.name not in skip)
 
-    for name in model_field_names:
-        if name in skip:
-            continue
+def dto_to_model(dto: TradeDTO, trade: Trade) -> Set[str]:
+    """Copy differing DTO values onto the model; returns the names of the fields that changed."""
+    changed = set()
+    for name in _mapped_field_names(type(trade)):
         if not hasattr(dto, name):
             continue
 
@@ -40,8 +44,9 @@ def dto_to_model(dto: TradeDTO, trade: Trade) -> Trade:
 
         if dto_val != model_val:
             setattr(trade, name, dto_val)
+            changed.add(name)
 
-    return trade
+    return changed
 
 def snapshot_model_dict(trade: Trade) -> Dict[str, Any]:
     return {
@@ -29,6 +29,13 @@ class Trade(models.Model):
                 name="strike_only_when_executed"
             ),
         ]
+        indexes = [
+            models.Index(fields=["state", "id"], name="trade_state_id_idx"),
+            models.Index(fields=["approver_id", "state", "id"], name="trade_approver_state_idx"),
+            models.Index(fields=["requester_id", "state", "id"], name="trade_requester_state_idx"),
+            models.Index(fields=["counterparty", "trade_date"], name="trade_cpty_date_idx"),
+            models.Index(fields=["trade_date"], name="trade_date_idx"),
+        ]
 
 class ActionLog(models.Model):
     trade = models.ForeignKey(Trade, on_delete=models.CASCADE, related_name="action_logs")
@@ -39,11 +46,90 @@ class ActionLog(models.Model):
     note = models.TextField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["trade", "created_at", "id"], name="actionlog_trade_created_idx"),
+            models.Index(fields=["created_at", "id"], name="actionlog_created_idx"),
+        ]
+
 class TradeVersion(models.Model):
     trade = models.ForeignKey(Trade, on_delete=models.CASCADE, related_name="versions")
     version_number = models.PositiveIntegerField()
     state = models.CharField(max_length=32, choices=TradeState.choices)
     snapshot = models.JSONField()
+    # False when snapshot only holds the fields changed since the previous version.
+    is_keyframe = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     actor_user_id = models.CharField(max_length=64)
-    action = models.CharField(max_length=32, choices=Action.choices)
\ No newline at end of file
+    action = models.CharField(max_length=32, choices=Action.choices)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["trade", "version_number"], name="tradeversion_trade_version_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="tradeversion_created_idx"),
+        ]
+
+# Trade state changes, written in the transition's transaction and relayed to downstream sinks.
+class OutboxEvent(models.Model):
+    trade = models.ForeignKey(Trade, on_delete=models.CASCADE, related_name="outbox_events")
+    action = models.CharField(max_length=32, choices=Action.choices)
+    actor_user_id = models.CharField(max_length=64)
+    from_state = models.CharField(max_length=32, choices=TradeState.choices)
+    to_state = models.CharField(max_length=32, choices=TradeState.choices)
+    version = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(null=True, blank=True)
+    # Publication order, assigned by the relay; /api/events/ subscribers page by it.
+    sequence = models.PositiveBigIntegerField(null=True, blank=True, unique=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["id"], condition=models.Q(published_at__isnull=True), name="outbox_unpublished_idx"),
+        ]
+
+# Last OutboxEvent.sequence the relay assigned. Its single row is locked by every relay batch,
+# so sequences become visible in the order they were assigned.
+class OutboxSequence(models.Model):
+    last = models.PositiveBigIntegerField(default=0)
+
+# One row per currency in Trade.underlying, so currency lookups use an index instead of scanning the JSON.
+class TradeUnderlying(models.Model):
+    trade = models.ForeignKey(Trade, on_delete=models.CASCADE, related_name="underlying_currencies")
+    currency = models.CharField(max_length=3)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["trade", "currency"], name="tradeunderlying_trade_ccy_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["currency", "trade"], name="tradeunderlying_ccy_trade_idx"),
+        ]
+
+# Running count and notional per (state, counterparty, currency, direction); see services/stats.py.
+class TradeSummary(models.Model):
+    state = models.CharField(max_length=32, choices=TradeState.choices)
+    counterparty = models.CharField(max_length=120)
+    notional_currency = models.CharField(max_length=3)
+    direction = models.CharField(max_length=4, choices=Direction.choices)
+    trade_count = models.IntegerField(default=0)
+    notional_total = models.DecimalField(max_digits=28, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["state", "counterparty", "notional_currency", "direction"], name="tradesummary_group_uniq",
+            ),
+        ]
+
+# Per-user count of open trades they are requester or approver on; see services/counters.py.
+class WorkQueueCounter(models.Model):
+    user_id = models.CharField(max_length=64)
+    state = models.CharField(max_length=32, choices=TradeState.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user_id", "state"], name="workqueuecounter_user_state_uniq"),
+        ]
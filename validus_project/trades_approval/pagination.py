@@ -0,0 +1,32 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TradeCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the immutable id; newest first.
+
+    DRF builds the cursor from the first ordering field only, and updated_at
+    moves on every transition, so paging by it skipped or repeated trades
+    that changed while a client paged. Ids never change, and the
+    (..., id) filter indexes serve each page in order.
+    """
+    ordering = ("-id",)
+    page_size = 50
+    page_size_query_param = "pageSize"
+    max_page_size = 500
+
+
+class CurrencyCursorPagination(CursorPagination):
+    """Keyset pagination for trades_by_currency() over the (currency, trade) index; newest first."""
+    ordering = ("-underlying_trade_id",)
+    page_size = 50
+    page_size_query_param = "pageSize"
+    max_page_size = 500
+
+
+class ActionLogCursorPagination(CursorPagination):
+    """Keyset pagination over the (trade, created_at, id) index; oldest first."""
+    ordering = ("created_at", "id")
+    page_size = 100
+    page_size_query_param = "pageSize"
+    max_page_size = 1000
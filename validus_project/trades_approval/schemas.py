@@ -0,0 +1,246 @@
+"""
+Precompiled request validators for the hot write endpoints.
+
+A CompiledSchema is built once per serializer class at import. It keeps the
+bound field instances and a per-field converter table, so a request does not
+construct a serializer or deep-copy its fields. Keys are checked in a single
+pass over the payload.
+
+The fast path only accepts input it can prove DRF would accept: exact str / int
+/ float / list types, ASCII-safe text, ISO dates, finite decimals within
+precision. Anything else, and every invalid payload, is handed to the real
+serializer. Error payloads are therefore DRF's own, byte for byte, and the
+fast path never has to reproduce a message.
+"""
+import re
+from datetime import date
+from decimal import Decimal, DecimalException
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from django.core.validators import MaxLengthValidator, MinLengthValidator, ProhibitNullCharactersValidator
+from rest_framework import serializers
+from rest_framework.fields import ISO_8601, ProhibitSurrogateCharactersValidator, SkipField, empty
+from rest_framework.settings import api_settings
+
+from .serializers import TradeDetailsSerializer, TradeUpdateSerializer, BookSerializer
+
+
+class _Slow(Exception):
+    """Raised by a converter when DRF itself must decide on the value."""
+
+
+_SURROGATES = re.compile("[\ud800-\udfff]")
+_CHAR_VALIDATORS = (MaxLengthValidator, MinLengthValidator, ProhibitNullCharactersValidator,
+                    ProhibitSurrogateCharactersValidator)
+
+
+def _char(field: serializers.CharField) -> Callable[[Any], str]:
+    max_length, min_length = field.max_length, field.min_length
+    trim = field.trim_whitespace
+
+    def convert(v):
+        if type(v) is not str:
+            raise _Slow
+        s = v.strip() if trim else v
+        if not s or (max_length is not None and len(s) > max_length) or (min_length is not None and len(s) < min_length):
+            raise _Slow
+        if not s.isascii() and _SURROGATES.search(s):
+            raise _Slow
+        if "\x00" in s:
+            raise _Slow
+        return s
+    return convert
+
+
+def _choice(field: serializers.ChoiceField) -> Callable[[Any], Any]:
+    choices = {k: v for k, v in field.choice_strings_to_values.items() if k != ""}
+
+    def convert(v):
+        if type(v) is not str or v not in choices:
+            raise _Slow
+        return choices[v]
+    return convert
+
+
+def _decimal(field: serializers.DecimalField) -> Callable[[Any], Decimal]:
+    max_digits, places, whole = field.max_digits, field.decimal_places, field.max_whole_digits
+    if field.localize:
+        return None
+
+    def convert(v):
+        if type(v) not in (str, int, float):
+            raise _Slow
+        raw = str(v).strip()
+        if len(raw) > field.MAX_STRING_LENGTH:
+            raise _Slow
+        try:
+            value = Decimal(raw)
+        except DecimalException:
+            raise _Slow
+        if not value.is_finite():
+            raise _Slow
+        # Same digit accounting as DecimalField.validate_precision.
+        _, digits, exponent = value.as_tuple()
+        if exponent >= 0:
+            total, whole_digits, decimal_places = len(digits) + exponent, len(digits) + exponent, 0
+        elif len(digits) > -exponent:
+            total, whole_digits, decimal_places = len(digits), len(digits) + exponent, -exponent
+        else:
+            total, whole_digits, decimal_places = -exponent, 0, -exponent
+        if ((max_digits is not None and total > max_digits)
+                or (places is not None and decimal_places > places)
+                or (whole is not None and whole_digits > whole)):
+            raise _Slow
+        return field.quantize(value)
+    return convert
+
+
+def _integer(field: serializers.IntegerField) -> Callable[[Any], int]:
+    def convert(v):
+        if type(v) is not int:
+            raise _Slow
+        return v
+    return convert
+
+
+def _date(field: serializers.DateField) -> Callable[[Any], date]:
+    if list(getattr(field, "input_formats", api_settings.DATE_INPUT_FORMATS)) != [ISO_8601]:
+        return None
+
+    def convert(v):
+        # django's parse_date (used by DRF for ISO input) tries date.fromisoformat first.
+        if type(v) is not str or len(v) != 10:
+            raise _Slow
+        try:
+            return date.fromisoformat(v)
+        except ValueError:
+            raise _Slow
+    return convert
+
+
+def _list(field: serializers.ListField) -> Callable[[Any], List[Any]]:
+    child = _converter(field.child)
+    if child is None or field.max_length is not None or field.min_length is not None:
+        return None
+    allow_empty = field.allow_empty
+
+    def convert(v):
+        if type(v) is not list or (not v and not allow_empty):
+            raise _Slow
+        return [child(item) for item in v]
+    return convert
+
+
+_CONVERTERS = {
+    serializers.CharField: _char,
+    serializers.ChoiceField: _choice,
+    serializers.DecimalField: _decimal,
+    serializers.IntegerField: _integer,
+    serializers.DateField: _date,
+    serializers.ListField: _list,
+}
+
+
+def _converter(field) -> Optional[Callable[[Any], Any]]:
+    """Fast converter for an exact DRF field type, or None to always use field.run_validation()."""
+    factory = _CONVERTERS.get(type(field))
+    if factory is None:
+        return None
+    extra = field.validators
+    if type(field) is serializers.CharField:
+        # Length, NUL and surrogate checks are already part of the char converter.
+        extra = [v for v in extra if not isinstance(v, _CHAR_VALIDATORS)]
+    convert = factory(field)
+    if convert is None or not extra:
+        return convert
+
+    def validated(v):
+        value = convert(v)
+        try:
+            field.run_validators(value)
+        except serializers.ValidationError:
+            raise _Slow
+        return value
+    return validated
+
+
+class SchemaResult:
+    """The slice of the Serializer API the views use: is_valid(), errors, validated_data."""
+
+    __slots__ = ("validated_data", "errors")
+
+    def __init__(self, validated_data, errors):
+        self.validated_data = validated_data
+        self.errors = errors
+
+    def is_valid(self, raise_exception: bool = False) -> bool:
+        if self.errors and raise_exception:
+            raise serializers.ValidationError(self.errors)
+        return not self.errors
+
+
+class CompiledSchema:
+    """
+    Drop-in for `SerializerClass(data=...)` on write endpoints.
+
+    reject_unknown / require_any encode the serializer's own validate():
+    payloads with unknown keys, or with no recognised key when require_any is
+    set, take the slow path so the serializer raises its usual errors.
+    """
+
+    def __init__(self, serializer_class: Type[serializers.Serializer], *, reject_unknown: bool = True,
+                 require_any: bool = False):
+        self.serializer_class = serializer_class
+        self.reject_unknown = reject_unknown
+        self.require_any = require_any
+        proto = serializer_class()
+        self._fields: List[Tuple[str, Any, Optional[Callable], Optional[Callable]]] = [
+            (name, field, _converter(field), getattr(proto, f"validate_{name}", None))
+            for name, field in proto.fields.items() if not field.read_only
+        ]
+        self._names = frozenset(name for name, *_ in self._fields)
+        # Renamed sources and field defaults change how DRF assembles validated_data; leave those to DRF.
+        self._compiled = all(f.source == name and f.default is empty for name, f, *_ in self._fields)
+
+    def __call__(self, data, context: Optional[Dict[str, Any]] = None) -> SchemaResult:
+        validated = self._fast(data)
+        if validated is not None:
+            return SchemaResult(validated, {})
+        s = self.serializer_class(data=data, context=context or {})
+        if s.is_valid():
+            return SchemaResult(s.validated_data, {})
+        return SchemaResult({}, s.errors)
+
+    def _fast(self, data) -> Optional[Dict[str, Any]]:
+        if not self._compiled or type(data) is not dict:
+            return None
+        if self.reject_unknown:
+            names = self._names
+            for key in data:
+                if key not in names:
+                    return None
+        ret = {}
+        for name, field, convert, validate_method in self._fields:
+            value = data.get(name, empty)
+            if value is empty:
+                if field.required:
+                    return None
+                continue
+            try:
+                if convert is None:
+                    value = field.run_validation(value)
+                else:
+                    value = convert(value)
+                if validate_method is not None:
+                    value = validate_method(value)
+            except (_Slow, serializers.ValidationError, SkipField):
+                return None
+            ret[name] = value
+        if self.require_any and not ret:
+            return None
+        return ret
+
+
+TRADE_DETAILS_SCHEMA = CompiledSchema(TradeDetailsSerializer)
+TRADE_UPDATE_SCHEMA = CompiledSchema(TradeUpdateSerializer, require_any=True)
+BOOK_SCHEMA = CompiledSchema(BookSerializer)
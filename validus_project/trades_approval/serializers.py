@@ -56,6 +56,7 @@ class TradeUpdateSerializer(serializers.Serializer):
 class BookSerializer(serializers.Serializer):
     userId = serializers.CharField(max_length=64)
     strike = serializers.DecimalField(max_digits=20, decimal_places=6)
+    expectedVersion = serializers.IntegerField(required=False, min_value=1)
 
     def validate(self, data):
         unknown = set(self.initial_data.keys()) - set(self.fields.keys())
@@ -66,4 +67,27 @@ class BookSerializer(serializers.Serializer):
     def validate_strike(self, value):
         if value <= 0:
             raise serializers.ValidationError("strike must be greater than 0.")
-        return value
\ No newline at end of file
+        return value
+
+class TradeSerializer(serializers.Serializer):
+    id                = serializers.IntegerField(read_only=True)
+    tradingEntity     = serializers.CharField(source="trading_entity", read_only=True)
+    counterparty      = serializers.CharField(read_only=True)
+    direction         = serializers.CharField(read_only=True)
+    style             = serializers.CharField(read_only=True)
+
+    notionalCurrency  = serializers.CharField(source="notional_currency", read_only=True)
+    notionalAmount    = serializers.DecimalField(source="notional_amount", max_digits=20, decimal_places=2, read_only=True)
+
+    underlying        = serializers.ListField(child=serializers.CharField(), read_only=True)
+
+    tradeDate         = serializers.DateField(source="trade_date", read_only=True)
+    valueDate         = serializers.DateField(source="value_date", read_only=True)
+    deliveryDate      = serializers.DateField(source="delivery_date", read_only=True)
+    strike            = serializers.DecimalField(max_digits=20, decimal_places=6, read_only=True)
+
+    requesterId       = serializers.CharField(source="requester_id", read_only=True)
+    approverId        = serializers.CharField(source="approver_id", read_only=True)
+    state             = serializers.CharField(read_only=True)
+    version           = serializers.IntegerField(read_only=True)
+    updatedAt         = serializers.DateTimeField(source="updated_at", read_only=True)
@@ -1,5 +1,9 @@
+from typing import Any, Dict, Iterator
 from ..models import Trade, ActionLog
 
+HISTORY_CHUNK_SIZE = 500
+HISTORY_FIELDS = ("id", "created_at", "action", "actor_user_id", "before_state", "after_state", "note")
+
 def log_action(*, trade, action, actor_user_id, before_state, after_state, note=""):
     return ActionLog.objects.create(
         trade=trade,
@@ -10,6 +14,17 @@ def log_action(*, trade, action, actor_user_id, before_state, after_state, note=
         note=note,
     )
 
+def build_action_log(*, trade, action, actor_user_id, before_state, after_state, note="") -> ActionLog:
+    """Unsaved ActionLog for log_action's bulk callers."""
+    return ActionLog(
+        trade=trade,
+        action=action,
+        actor_user_id=actor_user_id,
+        before_state=before_state,
+        after_state=after_state,
+        note=note,
+    )
+
 def get_trade_action_logs(trade: Trade) -> list[dict]:
     logs = trade.action_logs.order_by("created_at")
     data = [
@@ -23,4 +38,23 @@ def get_trade_action_logs(trade: Trade) -> list[dict]:
         }
         for log in logs
     ]
-    return data
\ No newline at end of file
+    return data
+
+def history_queryset(trade: Trade):
+    """Action logs as plain value dicts, ordered by the (trade, created_at, id) index."""
+    return trade.action_logs.order_by("created_at", "id").values(*HISTORY_FIELDS)
+
+def history_row(values: Dict[str, Any]) -> dict:
+    return {
+        "timestamp": values["created_at"].isoformat(),
+        "action": values["action"],
+        "actorUserId": values["actor_user_id"],
+        "fromState": values["before_state"],
+        "toState": values["after_state"],
+        "note": values["note"],
+    }
+
+def iter_trade_action_logs(trade: Trade, chunk_size: int = HISTORY_CHUNK_SIZE) -> Iterator[dict]:
+    """Stream history rows without materialising the whole trail."""
+    for values in history_queryset(trade).iterator(chunk_size=chunk_size):
+        yield history_row(values)
@@ -0,0 +1,271 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from ..models import Trade, TradeVersion
+from .versioning import load_versions, load_version_range
+
+_MISSING = object()
+_PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+@dataclass(frozen=True)
+class VersionRecord:
+    """Cached, read-only copy of a TradeVersion with its full snapshot."""
+    version_number: int
+    state: str
+    snapshot: Dict[str, Any]
+    created_at: datetime
+    actor_user_id: str
+    action: str
+
+    @classmethod
+    def from_row(cls, tv: TradeVersion) -> "VersionRecord":
+        return cls(tv.version_number, tv.state, tv.snapshot, tv.created_at, tv.actor_user_id, tv.action)
+
+
+def _enabled() -> bool:
+    return bool(getattr(settings, "TRADE_CACHE_ENABLED", True))
+
+
+def _shared():
+    return caches[getattr(settings, "TRADE_CACHE_ALIAS", "default")]
+
+
+def _caches_state() -> bool:
+    """
+    Current state is only cached in a backend every worker shares.
+
+    A per-process backend (LocMemCache) would keep serving the pre-commit state
+    and ETag in every other worker until TRADE_CACHE_STATE_TTL. Immutable
+    version snapshots are safe in any backend.
+    """
+    return _enabled() and not isinstance(_shared(), _PROCESS_LOCAL_BACKENDS)
+
+
+def _state_ttl() -> int:
+    return int(getattr(settings, "TRADE_CACHE_STATE_TTL", 300))
+
+
+class _LocalLRU:
+    """Per-process LRU tier; only ever holds immutable values."""
+
+    def __init__(self):
+        self._data: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is not _MISSING:
+                self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        max_size = int(getattr(settings, "TRADE_CACHE_LOCAL_SIZE", 1024))
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Stats:
+    FIELDS = ("local_hits", "shared_hits", "misses", "refreshes")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[name] += n
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = {f: 0 for f in self.FIELDS}
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counts)
+
+
+_local = _LocalLRU()
+_stats = _Stats()
+
+
+def stats() -> Dict[str, Any]:
+    """Hit/miss counters for this process since start (or the last reset)."""
+    counts = _stats.snapshot()
+    lookups = counts["local_hits"] + counts["shared_hits"] + counts["misses"]
+    hits = lookups - counts["misses"]
+    return {
+        **counts,
+        "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        "local_entries": len(_local),
+        "enabled": _enabled(),
+        "state_cached": _caches_state(),
+    }
+
+
+def reset() -> None:
+    _stats.reset()
+    _local.clear()
+
+
+def _generation_key(trade_id: Any) -> str:
+    return f"trade:{trade_id}:gen"
+
+
+def _trade_key(trade_id: Any, generation: int) -> str:
+    return f"trade:{trade_id}:state:g{generation}"
+
+
+def _new_generation() -> int:
+    # A lost pointer restarts at a fresh, time-based generation so it can never
+    # point back at a state entry cached before it was lost.
+    return time.time_ns()
+
+
+def _generation(trade_id: Any) -> int:
+    """The trade's current cache generation, creating the pointer if missing."""
+    key = _generation_key(trade_id)
+    generation = _shared().get(key)
+    if generation is None:
+        _shared().add(key, _new_generation(), _state_ttl())
+        generation = _shared().get(key)
+    return generation
+
+
+def _version_key(trade_id: Any, version_number: int) -> str:
+    return f"trade:{trade_id}:v{version_number}"
+
+
+def _trade_values(trade: Trade) -> Dict[str, Any]:
+    return {f.attname: getattr(trade, f.attname) for f in Trade._meta.concrete_fields}
+
+
+def get_trade(pk: Any) -> Trade:
+    """
+    Current trade state, read through the shared tier. Raises Trade.DoesNotExist.
+
+    Current state is mutable, so it skips the per-process tier and is cached
+    under the trade's generation: trade:<id>:gen is a pointer that every
+    commit increments, and the state lives at trade:<id>:state:g<gen>. A
+    reader that loaded the row before a commit can only cache it under the
+    generation it started with, which no later reader looks up, so a stale
+    row is never served after the commit's callback ran. With a per-process
+    TRADE_CACHE_ALIAS state is not cached at all.
+    """
+    if not _caches_state():
+        return Trade.objects.get(pk=pk)
+    key = _trade_key(pk, _generation(pk))
+    values = _shared().get(key)
+    if values is not None:
+        _stats.incr("shared_hits")
+        return Trade.from_db(Trade.objects.db, list(values), list(values.values()))
+    _stats.incr("misses")
+    trade = Trade.objects.get(pk=pk)
+    _shared().add(key, _trade_values(trade), _state_ttl())
+    return trade
+
+
+def refresh_trade_on_commit(trade: Trade) -> None:
+    """
+    Move the trade to a new cache generation once the transition commits.
+
+    incr() is atomic and order-independent: commits whose callbacks run out of
+    order each move the pointer forward, and entries cached under an older
+    generation (including one added by a reader that loaded the pre-commit
+    row) are never read again and expire after TRADE_CACHE_STATE_TTL.
+    """
+    if not _caches_state():
+        return
+    key = _generation_key(trade.id)
+
+    def _bump():
+        try:
+            _shared().incr(key)
+        except ValueError:
+            # Pointer expired or evicted: any fresh generation invalidates the old entries.
+            if not _shared().add(key, _new_generation(), _state_ttl()):
+                _shared().incr(key)
+        _stats.incr("refreshes")
+
+    transaction.on_commit(_bump)
+
+
+def _remember_versions(trade_id: Any, versions: Dict[int, TradeVersion]) -> Dict[int, VersionRecord]:
+    records = {n: VersionRecord.from_row(tv) for n, tv in versions.items()}
+    if not records:
+        return records
+    entries = {_version_key(trade_id, n): record for n, record in records.items()}
+    _shared().set_many(entries, timeout=None)
+    for key, record in entries.items():
+        _local.set(key, record)
+    return records
+
+
+def _read_through(
+    trade: Trade,
+    wanted: Iterable[int],
+    load: Callable[[List[int]], Dict[int, TradeVersion]],
+) -> Dict[int, VersionRecord]:
+    found: Dict[int, VersionRecord] = {}
+    remote = {}
+    for n in wanted:
+        key = _version_key(trade.id, n)
+        record = _local.get(key)
+        if record is _MISSING:
+            remote[key] = n
+        else:
+            found[n] = record
+    _stats.incr("local_hits", len(found))
+
+    missing = []
+    if remote:
+        hits = _shared().get_many(list(remote))
+        _stats.incr("shared_hits", len(hits))
+        for key, n in remote.items():
+            if key in hits:
+                found[n] = hits[key]
+                _local.set(key, hits[key])
+            else:
+                missing.append(n)
+    if missing:
+        _stats.incr("misses", len(missing))
+        found.update(_remember_versions(trade.id, load(missing)))
+    return found
+
+
+def get_versions(trade: Trade, version_numbers: Iterable[int]) -> Dict[int, Any]:
+    """load_versions through both tiers; TradeVersion rows never change once written."""
+    wanted = sorted({int(v) for v in version_numbers})
+    if not _enabled():
+        return load_versions(trade, wanted)
+    return _read_through(trade, wanted, lambda missing: load_versions(trade, missing))
+
+
+def get_version_range(trade: Trade, from_version: int, to_version: int) -> Dict[int, Any]:
+    """load_version_range through both tiers; one range query covers all misses."""
+    if not _enabled():
+        return load_version_range(trade, from_version, to_version)
+    return _read_through(
+        trade,
+        range(from_version, to_version + 1),
+        lambda missing: load_version_range(trade, min(missing), max(missing)),
+    )
@@ -0,0 +1,97 @@
+"""
+Per-user "pending for me" badge counts.
+
+A trade in a COUNTED_STATES state counts once for its requester and once for
+its approver (when set and different), under that state. WorkQueueCounter
+keeps those counts per (user_id, state), written in the same transaction as
+the trade, so a badge refresh reads a user's rows through the unique
+(user_id, state) index instead of counting trades. Rows that drop to zero
+are deleted; user_counts() reports a missing row as 0.
+
+`manage.py rebuild_work_queue_counters` recomputes the table from trades.
+"""
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, Tuple
+
+from django.db.models import Count, F
+
+from ..enums import TradeState
+from ..models import Trade, WorkQueueCounter
+from .upsert import delete_empty_rows, increment_rows
+
+COUNTED_STATES: Tuple[str, ...] = (TradeState.PENDING_APPROVAL, TradeState.NEEDS_REAPPROVAL)
+
+CounterKey = Tuple[str, str]
+
+
+def counter_keys(row: Any) -> FrozenSet[CounterKey]:
+    """(user_id, state) pairs a Trade or TradeDTO contributes to."""
+    if row.state not in COUNTED_STATES:
+        return frozenset()
+    return frozenset((user, row.state) for user in (row.requester_id, row.approver_id) if user)
+
+
+class CounterDeltas:
+    """Net count changes per (user_id, state), applied with one upsert over the touched keys."""
+
+    def __init__(self):
+        self._deltas: Counter = Counter()
+
+    def add(self, row: Any, sign: int = 1) -> None:
+        for key in counter_keys(row):
+            self._deltas[key] += sign
+
+    def move(self, before: Any, after: Any) -> None:
+        old, new = counter_keys(before), counter_keys(after)
+        for key in old - new:
+            self._deltas[key] -= 1
+        for key in new - old:
+            self._deltas[key] += 1
+
+    def apply(self) -> None:
+        increment_rows(
+            WorkQueueCounter, ("user_id", "state"), ("count",),
+            {key: (delta,) for key, delta in self._deltas.items() if delta},
+        )
+        delete_empty_rows(
+            WorkQueueCounter, ("user_id", "state"), [key for key, delta in self._deltas.items() if delta < 0], "count",
+        )
+        self._deltas.clear()
+
+
+def add_to_counters(trades: Iterable[Trade]) -> None:
+    deltas = CounterDeltas()
+    for trade in trades:
+        deltas.add(trade)
+    deltas.apply()
+
+
+def update_counters(before: Any, after: Trade) -> None:
+    """Apply one transition's change to the counters; cheap when the (user, state) pairs are unchanged."""
+    deltas = CounterDeltas()
+    deltas.move(before, after)
+    deltas.apply()
+
+
+def user_counts(user_id: str) -> Dict[str, int]:
+    """{state: count} for every counted state, zero when the user has no row."""
+    stored = dict(WorkQueueCounter.objects.filter(user_id=user_id).values_list("state", "count"))
+    return {state: stored.get(state, 0) for state in COUNTED_STATES}
+
+
+def rebuild_counters() -> int:
+    """Replace WorkQueueCounter from the trade table; returns the number of rows written."""
+    counts: Counter = Counter()
+    open_trades = Trade.objects.filter(state__in=COUNTED_STATES)
+    per_requester = open_trades.exclude(requester_id="").values("requester_id", "state")
+    # A requester who is also the approver counts once.
+    per_approver = (open_trades.exclude(approver_id__isnull=True).exclude(approver_id="")
+                    .exclude(approver_id=F("requester_id")).values("approver_id", "state"))
+    for field, rows in (("requester_id", per_requester), ("approver_id", per_approver)):
+        for row in rows.annotate(n=Count("id")).order_by():
+            counts[(row[field], row["state"])] += row["n"]
+    WorkQueueCounter.objects.all().delete()
+    WorkQueueCounter.objects.bulk_create([
+        WorkQueueCounter(user_id=user_id, state=state, count=n) for (user_id, state), n in counts.items()
+    ])
+    return len(counts)
@@ -0,0 +1,194 @@
+import base64
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from ..models import ActionLog, TradeVersion
+from .versioning import resolve_delta_snapshots
+
+EXPORT_CHUNK_SIZE = 2000
+COLUMNAR_ROW_GROUP = 10000
+
+EXPORT_KINDS = {
+    "actions": (
+        ActionLog,
+        ("id", "trade_id", "action", "actor_user_id", "before_state", "after_state", "note", "created_at"),
+    ),
+    "versions": (
+        TradeVersion,
+        ("id", "trade_id", "version_number", "state", "action", "actor_user_id", "is_keyframe", "snapshot", "created_at"),
+    ),
+}
+
+EXPORT_OUTPUTS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "columnar": "application/x-ndjson",
+}
+
+Cursor = Tuple[datetime, int]
+
+
+def _full_snapshots(page: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Under delta storage a row holds only the fields that changed; fold each onto its
+    # keyframe so every exported snapshot is complete. None if the chain is broken.
+    deltas: Dict[int, List[int]] = defaultdict(list)
+    for row in page:
+        if not row["is_keyframe"]:
+            deltas[row["trade_id"]].append(row["version_number"])
+    full = {
+        (trade_id, v): snap
+        for trade_id, numbers in deltas.items()
+        for v, snap in resolve_delta_snapshots(trade_id, numbers).items()
+    }
+    for row in page:
+        if not row["is_keyframe"]:
+            row["snapshot"] = full.get((row["trade_id"], row["version_number"]))
+    return page
+
+
+# Applied to each keyset page before it is yielded.
+EXPORT_PAGE_TRANSFORMS = {"versions": _full_snapshots}
+
+
+def parse_instant(param: str, raw: str) -> datetime:
+    """ISO datetime, or a YYYY-MM-DD date meaning midnight; naive values are taken as UTC."""
+    value = parse_datetime(raw)
+    if value is None:
+        day = parse_date(raw)
+        if day is None:
+            raise ValueError(f"{param} must be an ISO date or datetime.")
+        value = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value, dt_timezone.utc)
+    return value
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    created_at, row_id = cursor
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{row_id}".encode()).decode()
+
+
+def decode_cursor(token: str) -> Cursor:
+    try:
+        created_at, row_id = base64.urlsafe_b64decode(token.encode()).decode().split("|")
+        return parse_instant("after", created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("after is not a valid export cursor.")
+
+
+def iter_export_rows(
+    kind: str,
+    start: datetime,
+    end: datetime,
+    *,
+    after: Optional[Cursor] = None,
+    limit: Optional[int] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of `kind` created in [start, end), across all trades, ordered by (created_at, id).
+
+    Reads keyset pages of chunk_size rows, each resuming strictly after the
+    last row seen, so memory stays flat and the export can be resumed from a
+    cursor. Pages are read through .iterator() (a server-side cursor where
+    the backend supports one). Version rows always carry full snapshots:
+    delta rows are resolved against their keyframe one page at a time, with
+    one query per trade in the page; is_keyframe still reports how the row is stored.
+    """
+    model, fields = EXPORT_KINDS[kind]
+    base = (
+        model.objects
+        .filter(created_at__gte=start, created_at__lt=end)
+        .order_by("created_at", "id")
+        .values(*fields)
+    )
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_size = chunk_size if remaining is None else min(chunk_size, remaining)
+        qs = base
+        if after is not None:
+            created_at, row_id = after
+            qs = qs.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=row_id))
+        page = list(qs[:page_size].iterator(chunk_size=page_size))
+        if kind in EXPORT_PAGE_TRANSFORMS:
+            page = EXPORT_PAGE_TRANSFORMS[kind](page)
+        yield from page
+        seen = len(page)
+        if page:
+            after = (page[-1]["created_at"], page[-1]["id"])
+        if remaining is not None:
+            remaining -= seen
+        if seen < page_size:
+            return
+
+
+class _ExportEncoder(DjangoJSONEncoder):
+    # DjangoJSONEncoder truncates datetimes to milliseconds; exports keep full precision.
+    def default(self, o):
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=_ExportEncoder)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row, cls=_ExportEncoder) + "\n"
+
+
+class _Echo:
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv(rows: Iterable[Dict[str, Any]], fields: Tuple[str, ...]) -> Iterator[str]:
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([_cell(row[f]) for f in fields])
+
+
+def _columnar(rows: Iterable[Dict[str, Any]], fields: Tuple[str, ...], row_group: int) -> Iterator[str]:
+    # Parquet-style layout without the dependency: one JSON object per row group, one array per column.
+    columns: Dict[str, List[Any]] = {f: [] for f in fields}
+    group = count = 0
+    for row in rows:
+        for f in fields:
+            columns[f].append(row[f])
+        count += 1
+        if count == row_group:
+            yield json.dumps({"rowGroup": group, "numRows": count, "columns": columns}, cls=_ExportEncoder) + "\n"
+            columns = {f: [] for f in fields}
+            group += 1
+            count = 0
+    if count:
+        yield json.dumps({"rowGroup": group, "numRows": count, "columns": columns}, cls=_ExportEncoder) + "\n"
+
+
+def render_export(
+    kind: str,
+    output: str,
+    rows: Iterable[Dict[str, Any]],
+    *,
+    row_group: int = COLUMNAR_ROW_GROUP,
+) -> Iterator[str]:
+    """Encode export rows as text chunks, lazily, in the requested output format."""
+    fields = EXPORT_KINDS[kind][1]
+    if output == "csv":
+        return _csv(rows, fields)
+    if output == "columnar":
+        return _columnar(rows, fields, row_group)
+    return _ndjson(rows)
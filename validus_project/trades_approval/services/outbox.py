@@ -0,0 +1,177 @@
+import json
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from ..models import OutboxEvent, OutboxSequence, Trade
+
+RELAY_BATCH_SIZE = 500
+
+
+def record_event(*, trade: Trade, action: str, actor_user_id: str, before_state: str) -> OutboxEvent:
+    return OutboxEvent.objects.create(
+        trade=trade,
+        action=action,
+        actor_user_id=actor_user_id,
+        from_state=before_state,
+        to_state=trade.state,
+        version=trade.version,
+    )
+
+
+def build_event(*, trade: Trade, action: str, actor_user_id: str, before_state: str) -> OutboxEvent:
+    """Unsaved OutboxEvent for record_event's bulk callers."""
+    return OutboxEvent(
+        trade=trade,
+        action=action,
+        actor_user_id=actor_user_id,
+        from_state=before_state,
+        to_state=trade.state,
+        version=trade.version,
+    )
+
+
+def event_payload(event: OutboxEvent) -> Dict[str, Any]:
+    return {
+        "id": event.id,
+        "tradeId": event.trade_id,
+        "action": event.action,
+        "actorUserId": event.actor_user_id,
+        "fromState": event.from_state,
+        "toState": event.to_state,
+        "version": event.version,
+        "createdAt": event.created_at.isoformat(),
+        "sequence": event.sequence,
+    }
+
+
+def events_after(after_sequence: int, *, to_states: Optional[List[str]] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """
+    Published events with sequence > after_sequence, in publication order.
+
+    Subscribers do not page by id: ids are assigned at INSERT, so on a backend
+    with concurrent writers event 41 can commit after event 42 is visible and
+    a subscriber past 42 would never see it. The relay assigns sequences while
+    holding the OutboxSequence row lock, so a sequence is only ever visible
+    after every lower one.
+    """
+    qs = OutboxEvent.objects.filter(sequence__gt=after_sequence).order_by("sequence")
+    if to_states:
+        qs = qs.filter(to_state__in=to_states)
+    return [event_payload(e) for e in qs[:limit]]
+
+
+def _poll_interval() -> float:
+    return float(getattr(settings, "TRADE_EVENTS_POLL_INTERVAL", 0.5))
+
+
+def wait_for_events(after_id: int, *, to_states: Optional[List[str]] = None, timeout: float = 25.0) -> List[Dict[str, Any]]:
+    """Long-poll helper: return as soon as events after the sequence after_id exist, or [] after timeout seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        events = events_after(after_id, to_states=to_states)
+        if events or time.monotonic() >= deadline:
+            return events
+        time.sleep(min(_poll_interval(), max(0.0, deadline - time.monotonic())))
+
+
+class _SubscriberSlots:
+    """
+    Per-process cap on concurrent /api/events/ subscribers.
+
+    A long-poll or SSE subscriber holds a sync worker for as long as it waits,
+    so without a cap a few subscribers can occupy every worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.active >= max_subscribers():
+                return False
+            self.active += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+
+def max_subscribers() -> int:
+    return int(getattr(settings, "TRADE_EVENTS_MAX_SUBSCRIBERS", 8))
+
+
+subscribers = _SubscriberSlots()
+
+
+class FileSink:
+    """Appends each event as one JSON line to `path`."""
+
+    def __init__(self, path: str = "outbox-events.ndjson"):
+        self.path = path
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a") as f:
+            f.writelines(json.dumps(e) + "\n" for e in events)
+
+
+class QueueSink:
+    """In-process stand-in for a message broker; all instances share one queue."""
+
+    queue: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        for e in events:
+            self.queue.put(e)
+
+
+def get_sink():
+    path = getattr(settings, "TRADE_OUTBOX_SINK", "trades_approval.services.outbox.FileSink")
+    return import_string(path)(**getattr(settings, "TRADE_OUTBOX_SINK_OPTIONS", {}))
+
+
+def _lock_sequence() -> OutboxSequence:
+    """The OutboxSequence row, locked for the rest of the transaction; created on first use."""
+    OutboxSequence.objects.bulk_create([OutboxSequence(pk=1)], ignore_conflicts=True)
+    return OutboxSequence.objects.select_for_update().get(pk=1)
+
+
+def relay_batch(sink, batch_size: int = RELAY_BATCH_SIZE) -> int:
+    """
+    Publish up to batch_size unpublished events, oldest first. Returns the count.
+
+    Each event gets the next OutboxSequence number and is marked published in
+    the same transaction that read it, after the sink accepted it: a sink
+    failure rolls back and the batch is retried (at-least-once delivery).
+    Relays serialise on the OutboxSequence row lock, so several can run, and
+    sequences commit in the order they are assigned.
+    """
+    with transaction.atomic():
+        counter = _lock_sequence()
+        events = list(OutboxEvent.objects.filter(published_at__isnull=True).order_by("id")[:batch_size])
+        if not events:
+            return 0
+        now = timezone.now()
+        for sequence, event in enumerate(events, start=counter.last + 1):
+            event.sequence, event.published_at = sequence, now
+        sink.publish([event_payload(e) for e in events])
+        OutboxEvent.objects.bulk_update(events, ["sequence", "published_at"])
+        counter.last = events[-1].sequence
+        counter.save(update_fields=["last"])
+    return len(events)
+
+
+def relay_pending(sink, batch_size: int = RELAY_BATCH_SIZE) -> int:
+    """Relay batches until the outbox is drained. Returns the number of events published."""
+    total = 0
+    while True:
+        n = relay_batch(sink, batch_size)
+        total += n
+        if n < batch_size:
+            return total
@@ -0,0 +1,143 @@
+from datetime import date
+from functools import reduce
+from operator import or_
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from django.db.models import BooleanField, Case, F, Q, QuerySet, Value, When
+from ..models import Trade
+from ..enums import Action, TradeState
+from .trade_workflow import TRANSITIONS
+
+_EXACT_FILTERS = {
+    "requesterId": "requester_id",
+    "approverId": "approver_id",
+    "counterparty": "counterparty",
+}
+
+_DATE_RANGE_FILTERS = {
+    "tradeDate": "trade_date",
+    "valueDate": "value_date",
+    "deliveryDate": "delivery_date",
+}
+
+
+def _parse_date(param: str, raw: str) -> date:
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"{param} must be a YYYY-MM-DD date.")
+
+
+def filter_trades(params: Mapping[str, str]) -> QuerySet:
+    """
+    Translate list query params into an index-friendly Trade queryset.
+
+    state accepts a comma separated list; *From/*To date bounds are inclusive.
+    Raises ValueError on malformed values.
+    """
+    qs = Trade.objects.all()
+
+    states = params.get("state")
+    if states:
+        wanted = [s for s in states.split(",") if s]
+        invalid = sorted(set(wanted) - set(TradeState.values))
+        if invalid:
+            raise ValueError(f"Unknown state: {', '.join(invalid)}.")
+        qs = qs.filter(state__in=wanted) if len(wanted) > 1 else qs.filter(state=wanted[0])
+
+    for param, field in _EXACT_FILTERS.items():
+        value = params.get(param)
+        if value:
+            qs = qs.filter(**{field: value})
+
+    for param, field in _DATE_RANGE_FILTERS.items():
+        lower = params.get(f"{param}From")
+        upper = params.get(f"{param}To")
+        if lower:
+            qs = qs.filter(**{f"{field}__gte": _parse_date(f"{param}From", lower)})
+        if upper:
+            qs = qs.filter(**{f"{field}__lte": _parse_date(f"{param}To", upper)})
+
+    return qs
+
+
+# SQL form of each guarded TRANSITIONS entry: user_id -> Q over requester_id / approver_id.
+# Mirrors the Python guards in trade_workflow; Submit has no actor and is not queued.
+_ACTOR_PREDICATES: Dict[Tuple[str, str], Callable[[str], Q]] = {
+    (TradeState.PENDING_APPROVAL, Action.APPROVE): lambda u: ~Q(requester_id=u),
+    (TradeState.NEEDS_REAPPROVAL, Action.APPROVE): lambda u: Q(requester_id=u),
+    (TradeState.APPROVED, Action.SEND_TO_EXECUTE): lambda u: Q(approver_id__isnull=True) | Q(approver_id=u),
+    (TradeState.SENT_TO_COUNTERPARTY, Action.BOOK): lambda u: Q(requester_id=u) | Q(approver_id=u),
+    **{
+        (state, Action.UPDATE): lambda u: (Q(approver_id__isnull=True) & ~Q(requester_id=u)) | Q(approver_id=u)
+        for state in (TradeState.PENDING_APPROVAL, TradeState.NEEDS_REAPPROVAL)
+    },
+    **{
+        (state, Action.CANCEL): lambda u: Q(requester_id=u) | Q(approver_id=u)
+        for state, action in TRANSITIONS if action == Action.CANCEL
+    },
+}
+
+WORK_QUEUE_ACTIONS: List[str] = [a for a in Action.values if a != Action.SUBMIT]
+
+
+def _can_alias(action: str) -> str:
+    return "can_" + "".join(f"_{c.lower()}" if c.isupper() else c for c in action).lstrip("_")
+
+
+def action_predicate(user_id: str, action: str) -> Q:
+    """Rows from which user_id may take action: OR over its legal states, each AND its guard."""
+    return reduce(or_, (
+        Q(state=state) & guard_q(user_id)
+        for (state, rule_action), guard_q in _ACTOR_PREDICATES.items() if rule_action == action
+    ))
+
+
+def work_queue(user_id: str, actions: Optional[Iterable[str]] = None) -> QuerySet:
+    """
+    Trades user_id can act on now, annotated with one can_<action> boolean per action.
+
+    Legality and permissions are evaluated by the database from state,
+    requester_id and approver_id (served by the (requester_id, state, id),
+    (approver_id, state, id) and (state, id) indexes), so no trade is loaded
+    into Python to run the workflow. Use allowed_actions_from_row()
+    to turn the annotations into a list.
+    """
+    wanted = list(actions) if actions else WORK_QUEUE_ACTIONS
+    invalid = sorted(set(wanted) - set(WORK_QUEUE_ACTIONS))
+    if invalid:
+        raise ValueError(f"Unknown action: {', '.join(invalid)}.")
+
+    predicates = {action: action_predicate(user_id, action) for action in wanted}
+    return Trade.objects.filter(reduce(or_, predicates.values())).annotate(**{
+        _can_alias(action): Case(When(q, then=Value(True)), default=Value(False), output_field=BooleanField())
+        for action, q in predicates.items()
+    })
+
+
+def allowed_actions_from_row(trade: Trade) -> List[str]:
+    return [a for a in WORK_QUEUE_ACTIONS if getattr(trade, _can_alias(a), False)]
+
+
+def trades_by_currency(currency: str, states: Optional[Iterable[str]] = None) -> QuerySet:
+    """
+    Trades whose underlying includes currency, optionally limited to states.
+
+    Matches through the TradeUnderlying side table and its (currency, trade)
+    index rather than the JSON column, so the lookup does not scan every trade.
+    Rows are annotated with underlying_trade_id (equal to id, but read from the
+    side table): ordering on it lets the index return trades in order, where
+    ordering on Trade.id would sort every match first.
+    Raises ValueError on a malformed currency or an unknown state.
+    """
+    if len(currency) != 3 or not currency.isalpha():
+        raise ValueError("currency must be a 3-letter code.")
+    qs = Trade.objects.filter(underlying_currencies__currency=currency.upper()).annotate(
+        underlying_trade_id=F("underlying_currencies__trade_id"),
+    )
+    wanted = list(states or [])
+    if wanted:
+        invalid = sorted(set(wanted) - set(TradeState.values))
+        if invalid:
+            raise ValueError(f"Unknown state: {', '.join(invalid)}.")
+        qs = qs.filter(state__in=wanted) if len(wanted) > 1 else qs.filter(state=wanted[0])
+    return qs
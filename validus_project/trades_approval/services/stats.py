@@ -0,0 +1,173 @@
+"""
+Notional totals and trade counts grouped by state, counterparty, currency and direction.
+
+Two sources answer the same question:
+
+- "live" aggregates the trade table with GROUP BY (one query, O(trades)).
+- "summary" reads TradeSummary, one row per (state, counterparty, currency,
+  direction) group, kept current by the write paths in the same transaction
+  as the trade (O(groups)); groups left with no trades are deleted. Enabled
+  by TRADE_STATS_SUMMARY; after enabling it on a database that already holds
+  trades, run `manage.py rebuild_trade_summary`.
+
+Notional sums are only meaningful per currency; group by currency to compare them.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Sum
+
+from ..enums import TradeState
+from ..models import Trade, TradeSummary
+from .upsert import delete_empty_rows, increment_rows
+
+# Query param name -> column, shared by Trade and TradeSummary.
+STATS_DIMENSIONS: Dict[str, str] = {
+    "state": "state",
+    "counterparty": "counterparty",
+    "currency": "notional_currency",
+    "direction": "direction",
+}
+STATS_SOURCES = ("live", "summary")
+
+_GROUP_FIELDS = tuple(STATS_DIMENSIONS.values())
+_CENTS = Decimal("0.01")
+
+GroupKey = Tuple[str, str, str, str]
+
+
+def summary_enabled() -> bool:
+    return getattr(settings, "TRADE_STATS_SUMMARY", False)
+
+
+def group_key(row: Any) -> GroupKey:
+    """The TradeSummary group of a Trade or TradeDTO."""
+    return (row.state, row.counterparty, row.notional_currency, row.direction)
+
+
+class SummaryDeltas:
+    """
+    Net (count, notional) changes per group, applied with one upsert over the touched groups.
+
+    A no-op unless TRADE_STATS_SUMMARY is on. Call apply() inside the
+    transaction that wrote the trades.
+    """
+
+    def __init__(self):
+        self.enabled = summary_enabled()
+        self._deltas: Dict[GroupKey, List[Any]] = defaultdict(lambda: [0, Decimal("0")])
+
+    def add(self, row: Any, sign: int = 1) -> None:
+        if self.enabled:
+            delta = self._deltas[group_key(row)]
+            delta[0] += sign
+            delta[1] += sign * row.notional_amount
+
+    def move(self, before: Any, after: Any) -> None:
+        """Account for one trade going from the group/notional of before to that of after."""
+        if self.enabled and (group_key(before) != group_key(after) or before.notional_amount != after.notional_amount):
+            self.add(before, -1)
+            self.add(after, 1)
+
+    def apply(self) -> None:
+        increment_rows(
+            TradeSummary, _GROUP_FIELDS, ("trade_count", "notional_total"),
+            {key: tuple(delta) for key, delta in self._deltas.items() if delta[0] or delta[1]},
+        )
+        # A group whose last trade moved away would otherwise stay behind as a zero row.
+        delete_empty_rows(
+            TradeSummary, _GROUP_FIELDS, [key for key, delta in self._deltas.items() if delta[0] < 0], "trade_count",
+        )
+        self._deltas.clear()
+
+
+def add_to_summary(trades: Iterable[Trade]) -> None:
+    """Count newly inserted trades into their summary groups."""
+    deltas = SummaryDeltas()
+    for trade in trades:
+        deltas.add(trade)
+    deltas.apply()
+
+
+def update_summary(before: Any, after: Trade) -> None:
+    """Move one trade between summary groups after a single transition."""
+    deltas = SummaryDeltas()
+    deltas.move(before, after)
+    deltas.apply()
+
+
+def _money(value: Any) -> str:
+    # SQLite returns sums without the column's scale; render every total with two places.
+    return str(Decimal(value).quantize(_CENTS))
+
+
+def _parse_group_by(group_by: Iterable[str]) -> List[str]:
+    wanted = list(dict.fromkeys(group_by)) or ["state"]
+    invalid = sorted(set(wanted) - set(STATS_DIMENSIONS))
+    if invalid:
+        raise ValueError(f"Unknown groupBy: {', '.join(invalid)}. Use {', '.join(STATS_DIMENSIONS)}.")
+    return wanted
+
+
+def trade_stats(
+    group_by: Iterable[str],
+    states: Optional[Iterable[str]] = None,
+    source: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    {"groupBy", "source", "totals", "groups"} for the requested dimensions.
+
+    source defaults to "summary" when TRADE_STATS_SUMMARY is on, else "live".
+    Raises ValueError on an unknown dimension, state or source, or on
+    source=summary while the summary table is not maintained.
+    """
+    dims = _parse_group_by(group_by)
+    wanted_states = list(states or [])
+    invalid = sorted(set(wanted_states) - set(TradeState.values))
+    if invalid:
+        raise ValueError(f"Unknown state: {', '.join(invalid)}.")
+    source = source or ("summary" if summary_enabled() else "live")
+    if source not in STATS_SOURCES:
+        raise ValueError(f"source must be one of {', '.join(STATS_SOURCES)}.")
+    if source == "summary" and not summary_enabled():
+        raise ValueError("The summary table is disabled; set TRADE_STATS_SUMMARY or use source=live.")
+
+    fields = [STATS_DIMENSIONS[d] for d in dims]
+    if source == "live":
+        qs = Trade.objects.all()
+        count, notional = Count("id"), Sum("notional_amount")
+    else:
+        qs = TradeSummary.objects.filter(trade_count__gt=0)
+        count, notional = Sum("trade_count"), Sum("notional_total")
+    if wanted_states:
+        qs = qs.filter(state__in=wanted_states)
+    rows = qs.values(*fields).annotate(count=count, notional=notional).order_by(*fields)
+
+    groups = []
+    total_count, total_notional = 0, Decimal("0")
+    for row in rows:
+        groups.append({
+            **{d: row[STATS_DIMENSIONS[d]] for d in dims},
+            "count": row["count"],
+            "notionalTotal": _money(row["notional"]),
+        })
+        total_count += row["count"]
+        total_notional += Decimal(row["notional"])
+    return {
+        "groupBy": dims,
+        "source": source,
+        "totals": {"count": total_count, "notionalTotal": _money(total_notional)},
+        "groups": groups,
+    }
+
+
+def rebuild_summary() -> int:
+    """Replace TradeSummary with a fresh aggregate of the trade table; returns the number of groups."""
+    rows = Trade.objects.values(*_GROUP_FIELDS).annotate(
+        trade_count=Count("id"), notional_total=Sum("notional_amount"),
+    ).order_by()
+    TradeSummary.objects.all().delete()
+    summaries = TradeSummary.objects.bulk_create([TradeSummary(**row) for row in rows])
+    return len(summaries)
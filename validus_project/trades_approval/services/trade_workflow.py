@@ -1,5 +1,6 @@
-from dataclasses import replace
-from ..dto import TradeDTO
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from ..dto import TradeDTO, evolve
+from ..enums import Action, TradeState
 from ..validators import (
     _assert_dates,
     _assert_underlying_contains_notional,
@@ -12,75 +13,201 @@ from decimal import Decimal
 class InvalidTransition(Exception): pass
 class PermissionDenied(Exception): pass
 
+# A guard returns the PermissionDenied message, or None when the actor may act.
+# It reads only requester_id / approver_id, so DTOs and Trade rows both work.
+Guard = Callable[[TradeDTO, str], Optional[str]]
+
+
+def _not_requester(message: str) -> Guard:
+    return lambda dto, actor_id: message if actor_id == dto.requester_id else None
+
+
+def _requester(message: str) -> Guard:
+    return lambda dto, actor_id: None if _authorized_as_requester(dto, actor_id) else message
+
+
+def _approver(message: str) -> Guard:
+    return lambda dto, actor_id: None if _authorized_as_approver(dto, actor_id) else message
+
+
+def _requester_or_approver(message: str) -> Guard:
+    return lambda dto, actor_id: None if actor_id in {dto.requester_id, dto.approver_id} else message
+
+
+def _updater(dto: TradeDTO, actor_id: str) -> Optional[str]:
+    # The first non-requester to update becomes the approver; after that only they may update.
+    if dto.approver_id is None:
+        return "Requester cannot perform approver-only update." if actor_id == dto.requester_id else None
+    return None if actor_id == dto.approver_id else "Only the assigned approver can update details."
+
+
+class Rule(NamedTuple):
+    next_state: str
+    guard: Optional[Guard]
+    note: str
+    assigns_approver: bool = False
+
+
+S, A = TradeState, Action
+_CANCEL = Rule(S.CANCELLED, _requester_or_approver("Only requester or approver can cancel."), "Trade cancelled")
+_UPDATE = Rule(S.NEEDS_REAPPROVAL, _updater, "Trade details updated", assigns_approver=True)
+
+# (state, action) -> rule. A pair missing from the table is an InvalidTransition.
+TRANSITIONS: Dict[Tuple[str, str], Rule] = {
+    (S.DRAFT, A.SUBMIT): Rule(S.PENDING_APPROVAL, None, "Trade details provided"),
+    (S.PENDING_APPROVAL, A.APPROVE): Rule(
+        S.APPROVED, _not_requester("Requester cannot approve submission."), "Approver confirms trade",
+        assigns_approver=True,
+    ),
+    (S.NEEDS_REAPPROVAL, A.APPROVE): Rule(
+        S.APPROVED, _requester("Only the requester can reapprove after updates."),
+        "Requester reapproves updated trade details",
+    ),
+    (S.PENDING_APPROVAL, A.UPDATE): _UPDATE,
+    (S.NEEDS_REAPPROVAL, A.UPDATE): _UPDATE,
+    (S.APPROVED, A.SEND_TO_EXECUTE): Rule(
+        S.SENT_TO_COUNTERPARTY, _approver("Only the assigned approver can send to execute."), "Trade sent to execution",
+    ),
+    (S.SENT_TO_COUNTERPARTY, A.BOOK): Rule(
+        S.EXECUTED, _requester_or_approver("Only requester or approver can book the trade."), "Trade booked with strike",
+    ),
+    **{(state, A.CANCEL): _CANCEL for state in S.values if state not in {S.EXECUTED, S.CANCELLED}},
+}
+
+INVALID_TRANSITION_MESSAGES: Dict[str, str] = {
+    A.SUBMIT: "Submit is only allowed from Draft.",
+    A.APPROVE: "Approve requires PendingApproval or NeedsReapproval.",
+    A.CANCEL: "Cannot cancel a terminal trade.",
+    A.UPDATE: "Update is only allowed from PendingApproval or NeedsReapproval.",
+    A.SEND_TO_EXECUTE: "SendToExecute is only allowed from Approved.",
+    A.BOOK: "Book is only allowed from SentToCounterparty.",
+}
+
+# Compiled form of TRANSITIONS: one bit per state, one mask of legal source states per action.
+STATE_BITS: Dict[str, int] = {state: 1 << i for i, state in enumerate(S.values)}
+LEGAL_FROM: Dict[str, int] = {action: 0 for action in A.values}
+for _state, _action in TRANSITIONS:
+    LEGAL_FROM[_action] |= STATE_BITS[_state]
+del _state, _action
+
+
+def is_legal(state: str, action: str) -> bool:
+    return bool(STATE_BITS.get(state, 0) & LEGAL_FROM.get(action, 0))
+
+
+def legal_states_mask(action: str) -> int:
+    """Bitmask of the states `action` may start from; test a state with `STATE_BITS[state] & mask`."""
+    return LEGAL_FROM.get(action, 0)
+
+
+def is_legal_many(states: Iterable[str], action: str) -> List[bool]:
+    mask = LEGAL_FROM.get(action, 0)
+    bits = STATE_BITS.get
+    return [bool(bits(state, 0) & mask) for state in states]
+
+
+def transition_note(action: str, before_state: str) -> str:
+    rule = TRANSITIONS.get((before_state, action))
+    return rule.note if rule else ""
+
+
+def allowed_actions(dto: TradeDTO, actor_id: Optional[str] = None) -> List[str]:
+    """
+    Actions legal from dto.state, in Action order. With actor_id, only those
+    that actor would also pass the permission guard for. Field validation
+    (dates, underlying, strike) is not checked.
+    """
+    allowed = []
+    for action in A.values:
+        rule = TRANSITIONS.get((dto.state, action))
+        if rule is None:
+            continue
+        if actor_id is not None and rule.guard is not None and rule.guard(dto, actor_id) is not None:
+            continue
+        allowed.append(action)
+    return allowed
+
+
+def allowed_actions_many(dtos: Sequence[TradeDTO], actor_id: Optional[str] = None) -> List[List[str]]:
+    """
+    allowed_actions() for each dto, in input order. Legality is one
+    is_legal_many() pass over the states per action; permission guards run
+    only for the pairs that are legal.
+    """
+    states = [dto.state for dto in dtos]
+    allowed: List[List[str]] = [[] for _ in dtos]
+    for action in A.values:
+        for i, legal in enumerate(is_legal_many(states, action)):
+            if not legal:
+                continue
+            rule = TRANSITIONS[(states[i], action)]
+            if actor_id is not None and rule.guard is not None and rule.guard(dtos[i], actor_id) is not None:
+                continue
+            allowed[i].append(action)
+    return allowed
+
+
+# tradeUpdateDetails key -> TradeDTO field.
+UPDATE_FIELDS: Dict[str, str] = {
+    "tradingEntity": "trading_entity",
+    "counterparty": "counterparty",
+    "direction": "direction",
+    "style": "style",
+    "notionalCurrency": "notional_currency",
+    "notionalAmount": "notional_amount",
+    "underlying": "underlying",
+    "tradeDate": "trade_date",
+    "valueDate": "value_date",
+    "deliveryDate": "delivery_date",
+    "strike": "strike",
+}
+
+
+def _checked(dto: TradeDTO, action: str, actor_id: Optional[str] = None) -> Dict[str, Any]:
+    """Raise if `action` is not allowed; otherwise return the field changes the transition itself makes."""
+    rule = TRANSITIONS.get((dto.state, action))
+    if rule is None:
+        raise InvalidTransition(INVALID_TRANSITION_MESSAGES[action])
+    if rule.guard is not None:
+        denied = rule.guard(dto, actor_id)
+        if denied is not None:
+            raise PermissionDenied(denied)
+    changes = {"state": rule.next_state, "version": dto.version + 1}
+    if rule.assigns_approver:
+        changes["approver_id"] = actor_id
+    return changes
+
 def submit(dto: TradeDTO) -> TradeDTO:
-    if dto.state != "Draft":
-        raise InvalidTransition("Submit is only allowed from Draft.")
+    if not is_legal(dto.state, A.SUBMIT):
+        raise InvalidTransition(INVALID_TRANSITION_MESSAGES[A.SUBMIT])
     _assert_dates(dto)
     _assert_underlying_contains_notional(dto)
     _assert_no_strike_until_executed(dto)
-    return replace(dto, state="PendingApproval", version=dto.version + 1)
+    return evolve(dto, **_checked(dto, A.SUBMIT))
 
 def approve(dto: TradeDTO, actor_id: str) -> TradeDTO:
-    if dto.state not in {"PendingApproval", "NeedsReapproval"}:
-        raise InvalidTransition("Approve requires PendingApproval or NeedsReapproval.")
-    
-    if dto.state == "PendingApproval":
-        if actor_id == dto.requester_id:
-            raise PermissionDenied("Requester cannot approve submission.")
-        return replace(dto, approver_id=actor_id,state="Approved", version=dto.version + 1)
-    else:  
-        if not _authorized_as_requester(dto, actor_id):
-            raise PermissionDenied("Only the requester can reapprove after updates.")
-    return replace(dto, state="Approved", version=dto.version + 1)
+    return evolve(dto, **_checked(dto, A.APPROVE, actor_id))
 
 def cancel(dto: TradeDTO, actor_id: str) -> TradeDTO:
-    if dto.state in {"Executed", "Cancelled"}:
-        raise InvalidTransition("Cannot cancel a terminal trade.")
-    if actor_id not in {dto.requester_id, dto.approver_id}:
-        raise PermissionDenied("Only requester or approver can cancel.")
-    return replace(dto, state="Cancelled", version=dto.version + 1)
+    return evolve(dto, **_checked(dto, A.CANCEL, actor_id))
 
 def update(dto: TradeDTO, actor_id: str, trade_update_details) -> TradeDTO:
-    if dto.state not in {"PendingApproval", "NeedsReapproval"}:
-        raise InvalidTransition("Update is only allowed from PendingApproval or NeedsReapproval.")
-    if dto.approver_id is None:
-        if actor_id == dto.requester_id:
-            raise PermissionDenied("Requester cannot perform approver-only update.")
-        working = replace(dto, approver_id=actor_id)
-    else:
-        if actor_id != dto.approver_id:
-            raise PermissionDenied("Only the assigned approver can update details.")
-        working = dto
-
-    res_dto=replace(working,
-                    trading_entity=trade_update_details.get("tradingEntity", dto.trading_entity),
-                    counterparty=trade_update_details.get("counterparty", dto.counterparty),
-                    direction=trade_update_details.get("direction", dto.direction),
-                    style=trade_update_details.get("style", dto.style),
-                    notional_currency=trade_update_details.get("notionalCurrency", dto.notional_currency),
-                    notional_amount=trade_update_details.get("notionalAmount", dto.notional_amount),
-                    underlying=trade_update_details.get("underlying", dto.underlying),
-                    trade_date=trade_update_details.get("tradeDate", dto.trade_date),
-                    value_date=trade_update_details.get("valueDate", dto.value_date),
-                    delivery_date=trade_update_details.get("deliveryDate", dto.delivery_date),
-                    strike=trade_update_details.get("strike", dto.strike),
-                    state="NeedsReapproval",
-                    version=dto.version + 1)
+    changes = _checked(dto, A.UPDATE, actor_id)
+    # Only the supplied keys are touched; everything else is carried over by evolve().
+    for key, value in trade_update_details.items():
+        field = UPDATE_FIELDS.get(key)
+        if field is not None:
+            changes[field] = value
+    res_dto = evolve(dto, **changes)
     _assert_dates(res_dto)
     _assert_underlying_contains_notional(res_dto)
     _assert_no_strike_until_executed(res_dto)
     return res_dto
 
 def send_to_execute(dto: TradeDTO, actor_id: str) -> TradeDTO:
-    if dto.state != "Approved":
-        raise InvalidTransition("SendToExecute is only allowed from Approved.")
-    if not _authorized_as_approver(dto, actor_id):
-        raise PermissionDenied("Only the assigned approver can send to execute.")
-    return replace(dto, state="SentToCounterparty", version=dto.version + 1)
+    return evolve(dto, **_checked(dto, A.SEND_TO_EXECUTE, actor_id))
 
 def book(dto: TradeDTO, actor_id: str, strike) -> TradeDTO:
-    if dto.state != "SentToCounterparty":
-        raise InvalidTransition("Book is only allowed from SentToCounterparty.")
-    if actor_id not in {dto.requester_id, dto.approver_id}:
-        raise PermissionDenied("Only requester or approver can book the trade.")
-    return replace(dto, strike=Decimal(str(strike)), state="Executed", version=dto.version + 1)
\ No newline at end of file
+    changes = _checked(dto, A.BOOK, actor_id)
+    changes["strike"] = Decimal(str(strike))
+    return evolve(dto, **changes)
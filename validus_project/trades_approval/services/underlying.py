@@ -0,0 +1,22 @@
+from typing import Iterable, List
+from ..models import Trade, TradeUnderlying
+
+
+def build_underlying_rows(trade: Trade) -> List[TradeUnderlying]:
+    """
+    Unsaved TradeUnderlying rows for trade.underlying, one per distinct currency.
+
+    Codes are stored upper-cased, as trades_by_currency looks them up, since
+    the serializers accept any case.
+    """
+    currencies = dict.fromkeys(ccy.upper() for ccy in trade.underlying or [])
+    return [TradeUnderlying(trade=trade, currency=ccy) for ccy in currencies]
+
+
+def sync_underlying(trades: Iterable[Trade]) -> None:
+    """Replace the TradeUnderlying rows of trades; call inside the transaction that saved them."""
+    trades = list(trades)
+    if not trades:
+        return
+    TradeUnderlying.objects.filter(trade_id__in=[t.id for t in trades]).delete()
+    TradeUnderlying.objects.bulk_create([row for t in trades for row in build_underlying_rows(t)])
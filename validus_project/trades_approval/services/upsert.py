@@ -0,0 +1,88 @@
+"""
+Atomic increments for the running-total tables (WorkQueueCounter, TradeSummary).
+
+An UPDATE followed by create() when no row matched races: two transactions
+writing the first delta for the same key both see zero rows, both INSERT, and
+the second fails on the unique constraint. increment_rows() issues a single
+INSERT ... ON CONFLICT (key) DO UPDATE SET col = col + excluded.col instead,
+which SQLite (3.24+) and PostgreSQL both resolve row by row. Django's
+bulk_create(update_conflicts=True) can only overwrite a column with the new
+value, not add to it, hence the raw statement.
+
+Rows are written in sorted key order, so concurrent transactions that touch
+overlapping keys take the row locks in the same order and cannot deadlock.
+delete_empty_rows() then drops the rows a decrement brought back to zero, so
+the tables hold only groups that still have members.
+"""
+from typing import Any, Dict, Iterable, Sequence, Tuple, Type
+
+from django.db import connections, models, router
+from django.db.models import Q
+
+# Rows per statement; keeps the parameter count under SQLite's variable limit.
+BATCH_SIZE = 500
+
+
+def increment_rows(
+    model: Type[models.Model],
+    key_fields: Sequence[str],
+    increment_fields: Sequence[str],
+    deltas: Dict[Tuple[Any, ...], Sequence[Any]],
+) -> None:
+    """
+    Add each delta onto the row whose key_fields equal its key, inserting it when missing.
+
+    key_fields must be covered by a unique constraint on model; deltas maps a
+    key tuple to one value per increment_fields.
+    """
+    if not deltas:
+        return
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    fields = [model._meta.get_field(name) for name in (*key_fields, *increment_fields)]
+    table = qn(model._meta.db_table)
+    columns = ", ".join(qn(f.column) for f in fields)
+    conflict = ", ".join(qn(model._meta.get_field(name).column) for name in key_fields)
+    increments = ", ".join(
+        f"{qn(col)} = {table}.{qn(col)} + excluded.{qn(col)}"
+        for col in (model._meta.get_field(name).column for name in increment_fields)
+    )
+    placeholders = "(" + ", ".join(["%s"] * len(fields)) + ")"
+
+    items = sorted(deltas.items())
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), BATCH_SIZE):
+            batch = items[start:start + BATCH_SIZE]
+            params = [
+                field.get_db_prep_save(value, connection)
+                for key, values in batch
+                for field, value in zip(fields, (*key, *values))
+            ]
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {', '.join([placeholders] * len(batch))} "
+                f"ON CONFLICT ({conflict}) DO UPDATE SET {increments}",
+                params,
+            )
+
+
+def delete_empty_rows(
+    model: Type[models.Model],
+    key_fields: Sequence[str],
+    keys: Iterable[Tuple[Any, ...]],
+    count_field: str,
+) -> int:
+    """
+    Delete the rows among keys whose count_field is now 0; returns how many.
+
+    Call it after increment_rows() in the same transaction, with the keys
+    that were decremented: those rows are already locked, so a concurrent
+    increment waits and re-inserts the row rather than losing its delta.
+    """
+    keys = sorted(set(keys))
+    deleted = 0
+    for start in range(0, len(keys), BATCH_SIZE):
+        match = Q()
+        for key in keys[start:start + BATCH_SIZE]:
+            match |= Q(**dict(zip(key_fields, key)))
+        deleted += model.objects.filter(match, **{count_field: 0}).delete()[0]
+    return deleted
@@ -1,25 +1,126 @@
-from typing import Any, Dict, Callable, Optional
-from django.db import transaction
-from ..models import Trade
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Callable, FrozenSet, Iterable, List, Optional
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, ValidationError as DjangoValidationError
+from django.db import transaction, DatabaseError, OperationalError
+from django.utils import timezone
+from ..models import Trade, TradeVersion, ActionLog, OutboxEvent, TradeUnderlying
 from ..mappers import dto_to_model, dto_from_model
-from .trade_workflow import submit, approve, cancel, update, send_to_execute, book
-from .versioning import create_snapshot
-from .audit import log_action
-
-def _default_note(action: str, before_state: str) -> str:
-    if action == "Submit":
-        return "Trade details provided"
-    if action == "Approve":
-        return "Requester reapproves updated trade details" if before_state == "NeedsReapproval" else "Approver confirms trade"
-    if action == "Cancel":
-        return "Trade cancelled"
-    if action == "Update":
-        return "Trade details updated"
-    if action == "SendToExecute":
-        return "Trade sent to execution"
-    if action == "Book":
-        return "Trade booked with strike"
-    return ""
+from ..validators import ValidationError
+from .trade_workflow import (
+    submit, approve, cancel, update, send_to_execute, book,
+    transition_note, legal_states_mask, InvalidTransition, PermissionDenied,
+    INVALID_TRANSITION_MESSAGES, STATE_BITS,
+)
+from .versioning import create_snapshot, build_snapshot, previous_snapshot
+from .audit import log_action, build_action_log
+from .cache import refresh_trade_on_commit
+from .outbox import record_event, build_event
+from .underlying import build_underlying_rows, sync_underlying
+from .stats import SummaryDeltas, add_to_summary, update_summary
+from .counters import CounterDeltas, add_to_counters, update_counters
+
+BULK_CHUNK_SIZE = 1000
+
+_ALWAYS_WRITTEN = frozenset({"version", "updated_at"})
+
+LOCKING_MODES = {"optimistic", "nowait", "skip_locked"}
+LOCK_NOT_AVAILABLE = "55P03"
+VALIDATION_MODES = {"full", "changed"}
+
+class ConcurrentUpdate(Exception): pass
+class TradeLocked(Exception): pass
+
+def _conflict(trade_id: int, expected_version: int) -> ConcurrentUpdate:
+    return ConcurrentUpdate(
+        f"Trade {trade_id} was modified concurrently; expected version {expected_version}."
+    )
+
+
+def _save_if_version(trade: Trade, expected_version: int, changed_fields: Iterable[str]) -> None:
+    """
+    Compare-and-swap save: UPDATE ... WHERE id = trade.id AND version = expected_version.
+
+    Only changed_fields plus version/updated_at are written, keeping the UPDATE
+    (and the JSON underlying blob) out of the statement when untouched.
+    Raises ConcurrentUpdate when another transition committed first.
+    """
+    trade.updated_at = timezone.now()
+    fields = set(changed_fields) | _ALWAYS_WRITTEN
+    rows = Trade.objects.filter(id=trade.id, version=expected_version).update(
+        **{name: getattr(trade, name) for name in fields}
+    )
+    if rows != 1:
+        raise _conflict(trade.id, expected_version)
+
+
+def _locking_mode() -> str:
+    mode = getattr(settings, "TRADE_TRANSITION_LOCKING", "optimistic")
+    if mode not in LOCKING_MODES:
+        raise ImproperlyConfigured(
+            f"TRADE_TRANSITION_LOCKING must be one of {', '.join(sorted(LOCKING_MODES))}; got {mode!r}."
+        )
+    return mode
+
+
+def _validation_mode(validation: Optional[str]) -> str:
+    mode = validation or getattr(settings, "TRADE_TRANSITION_VALIDATION", "changed")
+    if mode not in VALIDATION_MODES:
+        raise ImproperlyConfigured(
+            f"TRADE_TRANSITION_VALIDATION must be one of {', '.join(sorted(VALIDATION_MODES))}; got {mode!r}."
+        )
+    return mode
+
+
+@lru_cache(maxsize=None)
+def _field_names(model_cls) -> FrozenSet[str]:
+    return frozenset(f.name for f in model_cls._meta.fields)
+
+
+def _validate_trade(trade: Trade, changed_fields: Iterable[str], mode: str) -> None:
+    """
+    "full" runs trade.full_clean(), re-validating every field and evaluating the
+    CheckConstraints (one query each). "changed" only cleans the fields the DTO
+    diff touched: the workflow functions already asserted the cross-field rules
+    and the database enforces the same constraints on write.
+    """
+    if mode == "full":
+        trade.full_clean()
+        return
+    changed_fields = set(changed_fields)
+    if changed_fields:
+        trade.clean_fields(exclude=_field_names(type(trade)) - changed_fields)
+
+
+def _lock_not_available(error: OperationalError) -> bool:
+    """True for PostgreSQL's lock_not_available (55P03), raised by FOR UPDATE NOWAIT."""
+    cause = error.__cause__
+    return LOCK_NOT_AVAILABLE in (getattr(cause, "sqlstate", None), getattr(cause, "pgcode", None))
+
+
+def _lock_trade(trade: Trade, mode: str) -> None:
+    """
+    Re-read the trade under SELECT ... FOR UPDATE NOWAIT / SKIP LOCKED.
+
+    Must run inside the transition's atomic block. Raises TradeLocked instead of
+    blocking when another transaction holds the row: NOWAIT reports that as
+    lock_not_available, SKIP LOCKED as an empty result. Any other database
+    error propagates.
+    """
+    locked_qs = Trade.objects.select_for_update(
+        nowait=(mode == "nowait"),
+        skip_locked=(mode == "skip_locked"),
+    )
+    locked = TradeLocked(f"Trade {trade.id} is locked by another transition; retry shortly.")
+    try:
+        trade.refresh_from_db(from_queryset=locked_qs)
+    except Trade.DoesNotExist:
+        raise locked
+    except OperationalError as e:
+        if not _lock_not_available(e):
+            raise
+        raise locked from e
 
 
 def _run_transition(
@@ -29,48 +130,69 @@ def _run_transition(
     wf_fn: Callable[..., Any],
     action_name: str,
     wf_kwargs: Optional[Dict[str, Any]] = None,
+    expected_version: Optional[int] = None,
+    validation: Optional[str] = None,
 ) -> Trade:
     wf_kwargs = wf_kwargs or {}
+    mode = _locking_mode()
+    validation = _validation_mode(validation)
     with transaction.atomic():
+        if mode != "optimistic":
+            _lock_trade(trade, mode)
+        if expected_version is not None and expected_version != trade.version:
+            raise _conflict(trade.id, expected_version)
+
         dto_before = dto_from_model(trade)
         before_state = trade.state
 
         dto_after = wf_fn(dto_before, actor_id, **wf_kwargs)
+        snap_before = previous_snapshot(trade)
 
-        dto_to_model(dto_after, trade)
-        trade.full_clean()
-        trade.save()
+        changed = dto_to_model(dto_after, trade)
+        _validate_trade(trade, changed, validation)
+        _save_if_version(trade, expected_version=dto_before.version, changed_fields=changed)
+        if "underlying" in changed:
+            sync_underlying([trade])
+        update_summary(dto_before, trade)
+        update_counters(dto_before, trade)
 
-        create_snapshot(trade, actor_user_id=actor_id, action=action_name)
+        create_snapshot(trade, actor_user_id=actor_id, action=action_name, previous=snap_before)
         log_action(
             trade=trade,
             action=action_name,
             actor_user_id=actor_id,
             before_state=before_state,
             after_state=trade.state,
-            note=_default_note(action_name, before_state),
+            note=transition_note(action_name, before_state),
         )
+        record_event(trade=trade, action=action_name, actor_user_id=actor_id, before_state=before_state)
+        refresh_trade_on_commit(trade)
         return trade
 
+def _draft_trade(trade_detail: Dict[str, Any], actor_id: str) -> Trade:
+    return Trade(
+        trading_entity=trade_detail["tradingEntity"],
+        counterparty=trade_detail["counterparty"],
+        direction=trade_detail["direction"],
+        style=trade_detail.get("style", "FORWARD"),
+        notional_currency=trade_detail["notionalCurrency"],
+        notional_amount=trade_detail["notionalAmount"],
+        underlying=trade_detail["underlying"],
+        trade_date=trade_detail["tradeDate"],
+        value_date=trade_detail["valueDate"],
+        delivery_date=trade_detail["deliveryDate"],
+        requester_id=actor_id,
+        state="Draft",
+        version=1,
+    )
+
 def create_and_submit(trade_detail: Dict[str, Any], actor_id: str) -> Trade:
     with transaction.atomic():
-        trade = Trade(
-            trading_entity=trade_detail["tradingEntity"],
-            counterparty=trade_detail["counterparty"],
-            direction=trade_detail["direction"],
-            style=trade_detail.get("style", "FORWARD"),
-            notional_currency=trade_detail["notionalCurrency"],
-            notional_amount=trade_detail["notionalAmount"],
-            underlying=trade_detail["underlying"],
-            trade_date=trade_detail["tradeDate"],
-            value_date=trade_detail["valueDate"],
-            delivery_date=trade_detail["deliveryDate"],
-            requester_id=actor_id,
-            state="Draft",
-            version=1,
-        )
+        trade = _draft_trade(trade_detail, actor_id)
         trade.full_clean()
         trade.save()
+        TradeUnderlying.objects.bulk_create(build_underlying_rows(trade))
+        add_to_summary([trade])
 
     return _run_transition(
         trade=trade,
@@ -80,48 +202,257 @@ def create_and_submit(trade_detail: Dict[str, Any], actor_id: str) -> Trade:
     )
 
 
-def approve_trade(trade: Trade, actor_id: str) -> Trade:
+def approve_trade(trade: Trade, actor_id: str, expected_version: Optional[int] = None) -> Trade:
     return _run_transition(
         trade=trade,
         actor_id=actor_id,
         wf_fn=approve,
         action_name="Approve",
+        expected_version=expected_version,
     )
 
 
-def cancel_trade(trade: Trade, actor_id: str) -> Trade:
+def cancel_trade(trade: Trade, actor_id: str, expected_version: Optional[int] = None) -> Trade:
     return _run_transition(
         trade=trade,
         actor_id=actor_id,
         wf_fn=cancel,
         action_name="Cancel",
+        expected_version=expected_version,
     )
 
 
-def update_trade(trade: Trade, actor_id: str, trade_detail: Dict[str, Any]) -> Trade:
+def update_trade(
+    trade: Trade,
+    actor_id: str,
+    trade_detail: Dict[str, Any],
+    expected_version: Optional[int] = None,
+) -> Trade:
     return _run_transition(
         trade=trade,
         actor_id=actor_id,
         wf_fn=update,
         action_name="Update",
         wf_kwargs={"trade_update_details": trade_detail},
+        expected_version=expected_version,
     )
 
 
-def send_to_execute_trade(trade: Trade, actor_id: str) -> Trade:
+def send_to_execute_trade(trade: Trade, actor_id: str, expected_version: Optional[int] = None) -> Trade:
     return _run_transition(
         trade=trade,
         actor_id=actor_id,
         wf_fn=send_to_execute,
         action_name="SendToExecute",
+        expected_version=expected_version,
     )
 
 
-def book_trade(trade: Trade, actor_id: str, strike: float) -> Trade:
+def book_trade(
+    trade: Trade,
+    actor_id: str,
+    strike: float,
+    expected_version: Optional[int] = None,
+) -> Trade:
     return _run_transition(
         trade=trade,
         actor_id=actor_id,
         wf_fn=book,
         action_name="Book",
         wf_kwargs={"strike": strike},
+        expected_version=expected_version,
     )
+
+
+@dataclass
+class BulkOutcome:
+    trade_id: Optional[int] = None
+    state: Optional[str] = None
+    error: Optional[str] = None
+
+
+def _chunks(items: List[Any], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_create_and_submit(
+    trade_details: List[Dict[str, Any]],
+    actor_id: str,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[BulkOutcome]:
+    """
+    Create and submit many already-serializer-validated trades.
+
+    The Submit transition runs in memory on each DTO, so only trades that pass
+    the workflow are persisted. Each chunk writes its Trade, TradeUnderlying,
+    TradeVersion, ActionLog and OutboxEvent rows with one bulk_create per table
+    inside one transaction; a failing
+    chunk is reported on its own items and does not abort the rest of the batch.
+    Outcomes are returned in input order.
+    """
+    outcomes = [BulkOutcome() for _ in trade_details]
+    submitted = []
+    for idx, detail in enumerate(trade_details):
+        trade = _draft_trade(detail, actor_id)
+        try:
+            dto_after = submit(dto_from_model(trade))
+        except (ValidationError, InvalidTransition) as e:
+            outcomes[idx].error = str(e)
+            continue
+        dto_to_model(dto_after, trade)
+        submitted.append((idx, trade))
+
+    for chunk in _chunks(submitted, chunk_size):
+        trades = [trade for _, trade in chunk]
+        try:
+            with transaction.atomic():
+                Trade.objects.bulk_create(trades)
+                TradeUnderlying.objects.bulk_create([row for trade in trades for row in build_underlying_rows(trade)])
+                add_to_summary(trades)
+                add_to_counters(trades)
+                TradeVersion.objects.bulk_create([
+                    build_snapshot(trade, actor_user_id=actor_id, action="Submit")
+                    for trade in trades
+                ])
+                ActionLog.objects.bulk_create([
+                    build_action_log(
+                        trade=trade,
+                        action="Submit",
+                        actor_user_id=actor_id,
+                        before_state="Draft",
+                        after_state=trade.state,
+                        note=transition_note("Submit", "Draft"),
+                    )
+                    for trade in trades
+                ])
+                OutboxEvent.objects.bulk_create([
+                    build_event(trade=trade, action="Submit", actor_user_id=actor_id, before_state="Draft")
+                    for trade in trades
+                ])
+        except DatabaseError as e:
+            for idx, _ in chunk:
+                outcomes[idx].error = f"Database error: {str(e)}"
+            continue
+        for idx, trade in chunk:
+            outcomes[idx].trade_id = trade.id
+            outcomes[idx].state = trade.state
+    return outcomes
+
+
+BULK_TRANSITIONS: Dict[str, Callable[..., Any]] = {
+    "Approve": approve,
+    "Cancel": cancel,
+    "Update": update,
+    "SendToExecute": send_to_execute,
+    "Book": book,
+}
+
+@dataclass
+class BulkTransition:
+    trade_id: int
+    action: str
+    actor_id: str
+    wf_kwargs: Dict[str, Any]
+    expected_version: Optional[int] = None
+
+
+def bulk_transition(
+    items: List[BulkTransition],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[BulkOutcome]:
+    """
+    Apply many workflow transitions, one transaction per chunk.
+
+    Each chunk loads its trades with a single locking query, runs the pure
+    workflow functions on the DTOs in input order (so repeated ids chain),
+    validates each result like a single transition (TRADE_TRANSITION_VALIDATION),
+    then writes the rows with bulk_update and the versions/logs with bulk_create.
+    Rejected or invalid transitions only fail their own item; a database error
+    fails the chunk it happened in. Outcomes are returned in input order.
+    """
+    outcomes = [BulkOutcome() for _ in items]
+    validation = _validation_mode(None)
+    masks = {action: legal_states_mask(action) for action in {item.action for item in items}}
+    for chunk in _chunks(list(enumerate(items)), chunk_size):
+        done = []
+        try:
+            with transaction.atomic():
+                # Lock in id order so overlapping chunks in concurrent requests cannot deadlock.
+                trades = {
+                    trade.id: trade
+                    for trade in Trade.objects.select_for_update()
+                    .filter(id__in={item.trade_id for _, item in chunk}).order_by("id")
+                }
+                touched, changed, versions, logs, events = {}, set(_ALWAYS_WRITTEN), [], [], []
+                resync, deltas, counters = {}, SummaryDeltas(), CounterDeltas()
+                for idx, item in chunk:
+                    trade = trades.get(item.trade_id)
+                    if trade is None:
+                        outcomes[idx].error = "Trade not found."
+                        continue
+                    if item.expected_version is not None and item.expected_version != trade.version:
+                        outcomes[idx].error = str(_conflict(trade.id, item.expected_version))
+                        continue
+                    before_state = trade.state
+                    if not STATE_BITS.get(before_state, 0) & masks[item.action]:
+                        # Illegal from this state: reject before building the DTO and snapshot.
+                        outcomes[idx].error = INVALID_TRANSITION_MESSAGES[item.action]
+                        continue
+                    wf_fn = BULK_TRANSITIONS[item.action]
+                    dto_before = dto_from_model(trade)
+                    try:
+                        dto_after = wf_fn(dto_before, item.actor_id, **item.wf_kwargs)
+                    except (InvalidTransition, PermissionDenied, ValidationError) as e:
+                        outcomes[idx].error = str(e)
+                        continue
+                    snap_before = previous_snapshot(trade)
+                    item_changed = dto_to_model(dto_after, trade)
+                    try:
+                        _validate_trade(trade, item_changed, validation)
+                    except DjangoValidationError as e:
+                        dto_to_model(dto_before, trade)
+                        outcomes[idx].error = "; ".join(e.messages)
+                        continue
+                    deltas.move(dto_before, trade)
+                    counters.move(dto_before, trade)
+                    changed |= item_changed
+                    touched[trade.id] = trade
+                    if "underlying" in item_changed:
+                        resync[trade.id] = trade
+                    versions.append(build_snapshot(
+                        trade, actor_user_id=item.actor_id, action=item.action, previous=snap_before,
+                    ))
+                    logs.append(build_action_log(
+                        trade=trade,
+                        action=item.action,
+                        actor_user_id=item.actor_id,
+                        before_state=before_state,
+                        after_state=trade.state,
+                        note=transition_note(item.action, before_state),
+                    ))
+                    events.append(build_event(
+                        trade=trade, action=item.action, actor_user_id=item.actor_id, before_state=before_state,
+                    ))
+                    done.append((idx, trade.id, trade.state))
+
+                now = timezone.now()
+                for trade in touched.values():
+                    trade.updated_at = now
+                    refresh_trade_on_commit(trade)
+                Trade.objects.bulk_update(list(touched.values()), sorted(changed))
+                sync_underlying(resync.values())
+                deltas.apply()
+                counters.apply()
+                TradeVersion.objects.bulk_create(versions)
+                ActionLog.objects.bulk_create(logs)
+                OutboxEvent.objects.bulk_create(events)
+        except DatabaseError as e:
+            for idx, _ in chunk:
+                if outcomes[idx].error is None:
+                    outcomes[idx].error = f"Database error: {str(e)}"
+            continue
+        for idx, trade_id, state in done:
+            outcomes[idx].trade_id = trade_id
+            outcomes[idx].state = state
+    return outcomes
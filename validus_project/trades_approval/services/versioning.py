@@ -1,24 +1,218 @@
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
 from ..models import Trade, TradeVersion
 from ..mappers import snapshot_model_dict
 
+STORAGE_MODES = {"full", "delta"}
 
-def create_snapshot(trade: Trade, *, actor_user_id: str, action: str) -> TradeVersion:
-    snap = snapshot_model_dict(trade)
+
+def _storage_mode() -> str:
+    mode = getattr(settings, "TRADE_VERSION_STORAGE", "full")
+    if mode not in STORAGE_MODES:
+        raise ImproperlyConfigured(
+            f"TRADE_VERSION_STORAGE must be one of {', '.join(sorted(STORAGE_MODES))}; got {mode!r}."
+        )
+    return mode
+
+
+def _keyframe_interval() -> int:
+    return max(1, int(getattr(settings, "TRADE_VERSION_KEYFRAME_INTERVAL", 10)))
+
+
+def _is_keyframe(version_number: int, has_previous: bool, interval: int) -> bool:
+    return not has_previous or version_number % interval == 0
+
+
+def _encode(snap: Dict[str, Any], previous: Optional[Dict[str, Any]], version_number: int) -> Tuple[Dict[str, Any], bool]:
+    if _storage_mode() != "delta" or _is_keyframe(version_number, previous is not None, _keyframe_interval()):
+        return snap, True
+    return {k: new for k, (_, new) in diff_snapshots(previous, snap).items()}, False
+
+
+def previous_snapshot(trade: Trade) -> Optional[Dict[str, Any]]:
+    """
+    Snapshot of the trade's current version, taken before a transition mutates it.
+
+    Only needed (and only computed) under delta storage; Draft trades have no
+    stored version to diff against.
+    """
+    if _storage_mode() != "delta" or trade.state == "Draft":
+        return None
+    return snapshot_model_dict(trade)
+
+
+def create_snapshot(
+    trade: Trade,
+    *,
+    actor_user_id: str,
+    action: str,
+    previous: Optional[Dict[str, Any]] = None,
+) -> TradeVersion:
+    snap, is_keyframe = _encode(snapshot_model_dict(trade), previous, trade.version)
     return TradeVersion.objects.create(
         trade=trade,
         version_number=trade.version,
         state=trade.state,
         snapshot=snap,
+        is_keyframe=is_keyframe,
+        actor_user_id=actor_user_id,
+        action=action,
+    )
+
+
+def build_snapshot(
+    trade: Trade,
+    *,
+    actor_user_id: str,
+    action: str,
+    previous: Optional[Dict[str, Any]] = None,
+) -> TradeVersion:
+    """Unsaved TradeVersion for create_snapshot's bulk callers."""
+    snap, is_keyframe = _encode(snapshot_model_dict(trade), previous, trade.version)
+    return TradeVersion(
+        trade=trade,
+        version_number=trade.version,
+        state=trade.state,
+        snapshot=snap,
+        is_keyframe=is_keyframe,
         actor_user_id=actor_user_id,
         action=action,
     )
 
 
+def _resolve(rows: Iterable[TradeVersion], wanted: set) -> Dict[int, TradeVersion]:
+    resolved = {}
+    current = None
+    last = None
+    for tv in rows:
+        if tv.is_keyframe:
+            current = tv.snapshot
+        elif current is not None and tv.version_number == last + 1:
+            current = {**current, **tv.snapshot}
+        else:
+            current = None
+        last = tv.version_number
+        if current is not None and tv.version_number in wanted:
+            tv.snapshot = dict(current)
+            tv.is_keyframe = True
+            resolved[tv.version_number] = tv
+    return resolved
+
+
+def _resolve_from_keyframe(trade: Trade, version_number: int) -> Optional[TradeVersion]:
+    # Fallback for chains longer than the current interval (interval lowered after writing).
+    keyframe = (
+        trade.versions
+        .filter(version_number__lte=version_number, is_keyframe=True)
+        .order_by("-version_number")
+        .values_list("version_number", flat=True)
+        .first()
+    )
+    if keyframe is None:
+        return None
+    rows = trade.versions.filter(
+        version_number__gte=keyframe, version_number__lte=version_number
+    ).order_by("version_number")
+    return _resolve(rows, {version_number}).get(version_number)
+
+
+def _resolve_deltas(trade: Trade, version_numbers: List[int]) -> Dict[int, TradeVersion]:
+    interval = _keyframe_interval()
+    window = Q()
+    for v in version_numbers:
+        window |= Q(version_number__gt=v - interval, version_number__lte=v)
+    rows = trade.versions.filter(window).order_by("version_number")
+    resolved = _resolve(rows, set(version_numbers))
+    for v in version_numbers:
+        if v not in resolved:
+            tv = _resolve_from_keyframe(trade, v)
+            if tv is not None:
+                resolved[v] = tv
+    return resolved
+
+
+def load_versions(trade: Trade, version_numbers: Iterable[int]) -> Dict[int, TradeVersion]:
+    """
+    Fetch the requested versions with full snapshots, keyed by version number.
+
+    One version_number__in query (served by the (trade, version_number) unique
+    index) answers full-snapshot rows. Delta rows are then folded onto their
+    keyframe, which sits at most one interval back, with a single windowed
+    query. Missing versions are simply absent from the result.
+    """
+    wanted = {int(v) for v in version_numbers}
+    if not wanted:
+        return {}
+    rows = list(trade.versions.filter(version_number__in=wanted))
+    resolved = {tv.version_number: tv for tv in rows if tv.is_keyframe}
+    deltas = sorted(tv.version_number for tv in rows if not tv.is_keyframe)
+    if deltas:
+        resolved.update(_resolve_deltas(trade, deltas))
+    return resolved
+
+
+def resolve_delta_snapshots(trade_id: int, version_numbers: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+    """Full snapshots of delta-stored versions of one trade, keyed by version number, from one windowed query."""
+    resolved = _resolve_deltas(Trade(id=trade_id), sorted(set(version_numbers)))
+    return {v: tv.snapshot for v, tv in resolved.items()}
+
+
+def load_version_range(trade: Trade, from_version: int, to_version: int) -> Dict[int, TradeVersion]:
+    """Every version in [from_version, to_version] with full snapshots, from one range query."""
+    rows = list(
+        trade.versions
+        .filter(version_number__lte=to_version, version_number__gt=from_version - _keyframe_interval())
+        .order_by("version_number")
+    )
+    wanted = set(range(from_version, to_version + 1))
+    resolved = _resolve(rows, wanted)
+    first_delta = next((tv.version_number for tv in rows if tv.version_number in wanted
+                        and tv.version_number not in resolved), None)
+    if first_delta is not None:
+        # The chain starts before the window: resolve it from its keyframe, then refold.
+        head = _resolve_from_keyframe(trade, first_delta)
+        if head is not None:
+            rest = [tv for tv in rows if tv.version_number > first_delta]
+            resolved.update(_resolve([head] + rest, wanted))
+    return resolved
+
+
+def reencode_trade_versions(trade_id: int, *, interval: int, expand: bool = False) -> int:
+    """
+    Rewrite one trade's versions as keyframes every `interval` versions and
+    deltas in between (or all keyframes with expand=True). Returns rows changed.
+    """
+    with transaction.atomic():
+        rows: List[TradeVersion] = list(
+            TradeVersion.objects.select_for_update()
+            .filter(trade_id=trade_id)
+            .order_by("version_number")
+        )
+        changed = []
+        previous = None
+        current = None
+        for tv in rows:
+            current = tv.snapshot if tv.is_keyframe else {**(current or {}), **tv.snapshot}
+            if expand or _is_keyframe(tv.version_number, previous is not None, interval):
+                snap, is_keyframe = current, True
+            else:
+                snap = {k: new for k, (_, new) in diff_snapshots(previous, current).items()}
+                is_keyframe = False
+            if snap != tv.snapshot or is_keyframe != tv.is_keyframe:
+                tv.snapshot, tv.is_keyframe = snap, is_keyframe
+                changed.append(tv)
+            previous = current
+        TradeVersion.objects.bulk_update(changed, ["snapshot", "is_keyframe"])
+    return len(changed)
+
+
 def diff_snapshots(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, tuple]:
     keys = set(a.keys()) | set(b.keys())
     diff_kv = {}
     for k in keys:
         if a.get(k) != b.get(k):
             diff_kv[k] = (a.get(k), b.get(k))
-    return diff_kv
\ No newline at end of file
+    return diff_kv
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from trades_approval.models import Trade
+from trades_approval.services.trade_workflow import PermissionDenied
+from trades_approval.services.use_cases import ConcurrentUpdate
+
+
+def fake_trade(**kw):
+    base = dict(id=7, state="PendingApproval", version=2, strike=None)
+    base.update(kw)
+    return SimpleNamespace(**base)
+
+
+def url(action, pk=7):
+    return reverse("async-trade-transition", kwargs={"pk": pk, "action": action})
+
+
+class TestAsyncTransitions(SimpleTestCase):
+    @patch("trades_approval.async_views.close_old_connections")
+    @patch("trades_approval.async_views.approve_trade")
+    @patch("trades_approval.async_views._load_trade")
+    async def test_approve(self, mock_load, mock_approve, _):
+        trade = fake_trade()
+        mock_load.return_value = trade
+        mock_approve.side_effect = lambda t, actor_id, expected_version: setattr(t, "state", "Approved")
+
+        res = await self.async_client.post(
+            url("approve"), {"userId": "user_002"}, content_type="application/json", headers={"If-Match": '"t7-v2"'}
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {"id": 7, "state": "Approved"})
+        mock_approve.assert_called_once_with(trade, actor_id="user_002", expected_version=2)
+
+    @patch("trades_approval.async_views.close_old_connections")
+    @patch("trades_approval.async_views.book_trade")
+    @patch("trades_approval.async_views._load_trade")
+    async def test_book_validates_like_sync_view(self, mock_load, mock_book, _):
+        mock_load.return_value = fake_trade(state="SentToCounterparty")
+
+        res = await self.async_client.post(url("book"), {"userId": "u1"}, content_type="application/json")
+
+        self.assertEqual(res.status_code, 400)
+        self.assertIn("strike", res.json())
+        mock_book.assert_not_called()
+
+    @patch("trades_approval.async_views.close_old_connections")
+    @patch("trades_approval.async_views.cancel_trade")
+    @patch("trades_approval.async_views._load_trade")
+    async def test_errors_map_to_sync_statuses(self, mock_load, mock_cancel, _):
+        mock_load.return_value = fake_trade()
+        body = {"userId": "user_001"}
+
+        mock_cancel.side_effect = PermissionDenied("not allowed")
+        res = await self.async_client.post(url("cancel"), body, content_type="application/json")
+        self.assertEqual(res.status_code, 400)
+
+        mock_cancel.side_effect = ConcurrentUpdate("modified concurrently")
+        res = await self.async_client.post(url("cancel"), body, content_type="application/json")
+        self.assertEqual(res.status_code, 409)
+
+        res = await self.async_client.post(
+            url("cancel"), body, content_type="application/json", headers={"If-Match": '"t5-v2"'}
+        )
+        self.assertEqual(res.status_code, 412)
+
+        res = await self.async_client.post(url("cancel"), {}, content_type="application/json")
+        self.assertEqual(res.json(), {"error": "userId is required."})
+
+        mock_load.side_effect = Trade.DoesNotExist
+        res = await self.async_client.post(url("cancel"), body, content_type="application/json")
+        self.assertEqual(res.status_code, 404)
+
+    async def test_unknown_action_and_wrong_method(self):
+        res = await self.async_client.post(url("explode"), {}, content_type="application/json")
+        self.assertEqual(res.status_code, 404)
+
+        res = await self.async_client.post(url("update"), {}, content_type="application/json")
+        self.assertEqual(res.status_code, 405)
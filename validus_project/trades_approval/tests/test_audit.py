@@ -3,7 +3,12 @@ from datetime import datetime
 from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
-from trades_approval.services.audit import log_action, get_trade_action_logs
+from trades_approval.services.audit import (
+    log_action,
+    get_trade_action_logs,
+    iter_trade_action_logs,
+    HISTORY_FIELDS,
+)
 
 
 class TestAuditUnit(unittest.TestCase):
@@ -74,3 +79,21 @@ class TestAuditUnit(unittest.TestCase):
         self.assertEqual(result[1]["timestamp"], created2.isoformat())
 
         order_by_mock.assert_called_once_with("created_at")
+
+    def test_iter_trade_action_logs_streams_value_rows(self):
+        created = datetime(2025, 11, 11, 9, 30, 15)
+        values = {"id": 1, "created_at": created, "action": "Submit", "actor_user_id": "user_001",
+                  "before_state": "Draft", "after_state": "PendingApproval", "note": "init"}
+        trade = MagicMock()
+        qs = trade.action_logs.order_by.return_value.values.return_value
+        qs.iterator.return_value = iter([values])
+
+        result = list(iter_trade_action_logs(trade, chunk_size=50))
+
+        trade.action_logs.order_by.assert_called_once_with("created_at", "id")
+        trade.action_logs.order_by.return_value.values.assert_called_once_with(*HISTORY_FIELDS)
+        qs.iterator.assert_called_once_with(chunk_size=50)
+        self.assertEqual(result, [{
+            "timestamp": created.isoformat(), "action": "Submit", "actorUserId": "user_001",
+            "fromState": "Draft", "toState": "PendingApproval", "note": "init",
+        }])
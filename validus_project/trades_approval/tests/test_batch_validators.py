@@ -0,0 +1,86 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+
+from trades_approval.batch_validators import HAS_NUMPY, validate_columns, validate_dtos
+from trades_approval.validators import (
+    ValidationError,
+    _assert_dates,
+    _assert_underlying_contains_notional,
+    _assert_no_strike_until_executed,
+)
+from trades_approval.tests.test_trade_workflow import make_dto
+
+D1, D2, D3 = date(2025, 11, 1), date(2025, 11, 2), date(2025, 11, 3)
+
+ROWS = [
+    make_dto(),
+    make_dto(value_date=date(2025, 10, 1)),
+    make_dto(notional_currency="GBP", underlying=["USD", "EUR"]),
+    make_dto(value_date=date(2025, 10, 1), notional_currency="GBP", underlying=["USD"]),
+    make_dto(strike=Decimal("1.1"), state="PendingApproval"),
+    make_dto(strike=Decimal("1.1"), state="Executed"),
+    make_dto(notional_currency="EUR", underlying=["USD", "JPY", "EUR"]),
+    make_dto(underlying=[]),
+    make_dto(trade_date=D3, value_date=D3, delivery_date=D3),
+]
+
+
+def scalar_message(dto):
+    try:
+        _assert_dates(dto)
+        _assert_underlying_contains_notional(dto)
+        _assert_no_strike_until_executed(dto)
+    except ValidationError as e:
+        return str(e)
+    return None
+
+
+class BatchValidatorCases:
+    use_numpy = None
+
+    def test_messages_match_scalar_validators(self):
+        result = validate_dtos(ROWS, use_numpy=self.use_numpy)
+        self.assertEqual(result.messages, [scalar_message(d) for d in ROWS])
+        self.assertEqual([bool(x) for x in result.invalid], [scalar_message(d) is not None for d in ROWS])
+        self.assertEqual(result.error_count, 5)
+        self.assertEqual([i for i, _ in result.errors()], [1, 2, 3, 4, 7])
+
+    def test_pairs_and_no_strike_columns(self):
+        result = validate_columns(
+            [D1, D1, D3], [D2, D2, D2], [D3, D3, D3],
+            ["USD", "GBP", "USD"], [["USD", "EUR"], ["USD", "EUR"], ["EUR", "USD"]],
+            use_numpy=self.use_numpy,
+        )
+        self.assertEqual(result.messages, [
+            None,
+            "Notional currency must be included in the underlying.",
+            "Trade Date ≤ Value Date ≤ Delivery Date must hold.",
+        ])
+
+    def test_empty_batch(self):
+        result = validate_columns([], [], [], [], [], use_numpy=self.use_numpy)
+        self.assertEqual(result.messages, [])
+        self.assertEqual(result.error_count, 0)
+
+    def test_mismatched_columns_raise(self):
+        with self.assertRaises(ValueError):
+            validate_columns([D1], [D2], [D3], ["USD"], [], use_numpy=self.use_numpy)
+
+
+class TestBatchValidatorsPython(BatchValidatorCases, unittest.TestCase):
+    use_numpy = False
+
+
+@unittest.skipUnless(HAS_NUMPY, "NumPy is not installed; pip install -r requirements-perf.txt")
+class TestBatchValidatorsNumpy(BatchValidatorCases, unittest.TestCase):
+    use_numpy = True
+
+    def test_accepts_2d_pair_array(self):
+        import numpy as np
+
+        result = validate_columns(
+            np.array([D1, D1], dtype="datetime64[D]"), [D2, D2], [D3, D3],
+            np.array(["USD", "GBP"]), np.array([["USD", "EUR"], ["USD", "EUR"]]),
+        )
+        self.assertEqual(result.invalid.tolist(), [False, True])
@@ -0,0 +1,173 @@
+import shutil
+import tempfile
+from datetime import date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase, override_settings
+
+from trades_approval.models import Trade
+from trades_approval.services import cache
+
+LOCMEM = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "trade-cache-tests"}}
+# Current state is only cached in a backend shared across processes; a file cache is the simplest one.
+SHARED_DIR = tempfile.mkdtemp(prefix="trade-cache-tests-")
+SHARED = {**LOCMEM, "shared": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": SHARED_DIR}}
+
+
+def version_row(n):
+    return SimpleNamespace(
+        version_number=n, state="Approved", snapshot={"version": n},
+        created_at=datetime(2025, 11, 11, 9, n), actor_user_id="u", action="Approve",
+    )
+
+
+def make_trade(**overrides):
+    fields = dict(
+        id=5, trading_entity="E", counterparty="C", direction="BUY", style="FORWARD",
+        notional_currency="USD", notional_amount=Decimal("10.00"), underlying=["USD"],
+        trade_date=date(2025, 11, 1), value_date=date(2025, 11, 5), delivery_date=date(2025, 11, 10),
+        requester_id="req", state="PendingApproval", version=2,
+    )
+    fields.update(overrides)
+    return Trade(**fields)
+
+
+@override_settings(CACHES=LOCMEM, TRADE_CACHE_ALIAS="default", TRADE_CACHE_LOCAL_SIZE=2)
+class TestTradeCache(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SHARED_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache._shared().clear()
+        cache.reset()
+
+    @patch("trades_approval.services.cache.load_versions")
+    def test_versions_read_through_both_tiers(self, mock_load):
+        mock_load.side_effect = lambda trade, wanted: {n: version_row(n) for n in wanted}
+        trade = SimpleNamespace(id=5)
+
+        first = cache.get_versions(trade, [1, 2])
+        again = cache.get_versions(trade, [2, 1])
+
+        mock_load.assert_called_once_with(trade, [1, 2])
+        self.assertEqual(again[2].snapshot, {"version": 2})
+        self.assertEqual(first[1], again[1])
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertEqual(cache.stats()["local_hits"], 2)
+
+    @patch("trades_approval.services.cache.load_versions")
+    def test_local_tier_is_bounded_and_falls_back_to_shared(self, mock_load):
+        mock_load.side_effect = lambda trade, wanted: {n: version_row(n) for n in wanted}
+        trade = SimpleNamespace(id=5)
+
+        cache.get_versions(trade, [1, 2, 3])
+        self.assertEqual(cache.stats()["local_entries"], 2)
+
+        cache.get_versions(trade, [1])
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(cache.stats()["shared_hits"], 1)
+
+    @patch("trades_approval.services.cache.load_version_range")
+    def test_version_range_loads_only_the_missing_span(self, mock_range):
+        mock_range.side_effect = lambda trade, lo, hi: {n: version_row(n) for n in range(lo, hi + 1)}
+        trade = SimpleNamespace(id=5)
+
+        cache.get_version_range(trade, 1, 2)
+        out = cache.get_version_range(trade, 1, 4)
+
+        self.assertEqual(sorted(out), [1, 2, 3, 4])
+        self.assertEqual(mock_range.call_args_list[-1].args, (trade, 3, 4))
+
+    @override_settings(CACHES=SHARED, TRADE_CACHE_ALIAS="shared")
+    def test_trade_state_cached_and_invalidated_on_commit(self):
+        cache._shared().clear()
+        manager = MagicMock()
+        manager.get.side_effect = [make_trade(), make_trade(state="Approved", version=3)]
+        manager.db = "default"
+        with patch.object(Trade, "objects", manager), \
+                patch("trades_approval.services.cache.transaction.on_commit", side_effect=lambda fn: fn()):
+            self.assertEqual(cache.get_trade(5).version, 2)
+            cached = cache.get_trade(5)
+            self.assertEqual((cached.state, cached.notional_amount), ("PendingApproval", Decimal("10.00")))
+            self.assertFalse(cached._state.adding)
+
+            cache.refresh_trade_on_commit(make_trade(state="Approved", version=3))
+            self.assertEqual(cache.get_trade(5).state, "Approved")
+
+        self.assertEqual(manager.get.call_count, 2)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+    @override_settings(CACHES=SHARED, TRADE_CACHE_ALIAS="shared")
+    def test_commit_between_miss_and_add_never_caches_the_old_row(self):
+        cache._shared().clear()
+        manager = MagicMock()
+        manager.db = "default"
+
+        def load_then_commit(pk):
+            # The reader has loaded the old row; the writer commits before the reader's add().
+            cache.refresh_trade_on_commit(make_trade(state="Approved", version=3))
+            return make_trade()
+
+        manager.get.side_effect = lambda pk: (
+            load_then_commit(pk) if manager.get.call_count == 1 else make_trade(state="Approved", version=3)
+        )
+        with patch.object(Trade, "objects", manager), \
+                patch("trades_approval.services.cache.transaction.on_commit", side_effect=lambda fn: fn()):
+            self.assertEqual(cache.get_trade(5).version, 2)
+            self.assertEqual(cache.get_trade(5).version, 3)
+            self.assertEqual(cache.get_trade(5).version, 3)
+
+        self.assertEqual(manager.get.call_count, 2)
+
+    @override_settings(CACHES=SHARED, TRADE_CACHE_ALIAS="shared")
+    def test_expired_pointer_restarts_at_a_fresh_generation(self):
+        cache._shared().clear()
+        manager = MagicMock()
+        manager.db = "default"
+        manager.get.side_effect = [make_trade(), make_trade(state="Approved", version=3)]
+        with patch.object(Trade, "objects", manager), \
+                patch("trades_approval.services.cache.transaction.on_commit", side_effect=lambda fn: fn()):
+            self.assertEqual(cache.get_trade(5).version, 2)
+            cache._shared().delete(cache._generation_key(5))
+            cache.refresh_trade_on_commit(make_trade(state="Approved", version=3))
+            self.assertEqual(cache.get_trade(5).version, 3)
+
+    @override_settings(CACHES=SHARED, TRADE_CACHE_ALIAS="shared")
+    def test_out_of_order_commit_callbacks_never_leave_older_state(self):
+        cache._shared().clear()
+        manager = MagicMock()
+        manager.get.return_value = make_trade(state="NeedsReapproval", version=4)
+        manager.db = "default"
+        callbacks = []
+        with patch.object(Trade, "objects", manager), \
+                patch("trades_approval.services.cache.transaction.on_commit", side_effect=callbacks.append):
+            cache.refresh_trade_on_commit(make_trade(state="Approved", version=3))
+            cache.refresh_trade_on_commit(make_trade(state="NeedsReapproval", version=4))
+            for publish in reversed(callbacks):
+                publish()
+            self.assertEqual(cache.get_trade(5).version, 4)
+
+    def test_per_process_alias_never_caches_state(self):
+        manager = MagicMock()
+        manager.get.side_effect = [make_trade(), make_trade(state="Approved", version=3)]
+        with patch.object(Trade, "objects", manager), \
+                patch("trades_approval.services.cache.transaction.on_commit") as mock_on_commit:
+            self.assertEqual(cache.get_trade(5).version, 2)
+            self.assertEqual(cache.get_trade(5).version, 3)
+            cache.refresh_trade_on_commit(make_trade(state="Approved", version=3))
+
+        mock_on_commit.assert_not_called()
+        self.assertEqual(cache._shared().get(cache._generation_key(5)), None)
+        self.assertFalse(cache.stats()["state_cached"])
+
+    @override_settings(TRADE_CACHE_ENABLED=False)
+    @patch("trades_approval.services.cache.load_versions", return_value={})
+    def test_disabled_cache_passes_through(self, mock_load):
+        trade = SimpleNamespace(id=5)
+        cache.get_versions(trade, [1])
+        cache.get_versions(trade, [1])
+        self.assertEqual(mock_load.call_count, 2)
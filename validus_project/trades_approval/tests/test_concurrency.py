@@ -0,0 +1,261 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from django.apps import apps
+from django.db import OperationalError, connections
+from django.test import TransactionTestCase, override_settings
+
+from trades_approval.models import ActionLog, Trade, TradeVersion
+from trades_approval.services import use_cases
+from trades_approval.services.trade_workflow import InvalidTransition, PermissionDenied
+from trades_approval.tests.test_usecases import FakeTrade, dto_from_model_copy, dto_to_model_copy, make_details
+
+
+class DriverError(Exception):
+    def __init__(self, message, sqlstate):
+        super().__init__(message)
+        self.sqlstate = sqlstate
+
+
+def db_error(message, sqlstate):
+    """OperationalError as Django wraps a psycopg error carrying its SQLSTATE."""
+    error = OperationalError(message)
+    error.__cause__ = DriverError(message, sqlstate)
+    return error
+
+
+def lock_not_available():
+    return db_error('could not obtain lock on row in relation "trades_approval_trade"', "55P03")
+
+
+class FakeRowStore:
+    """A single trade row with a row lock released at the end of the enclosing atomic block."""
+
+    def __init__(self, **row):
+        self.row = row
+        self.mutex = threading.Lock()
+        self.row_lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def atomic(self):
+        try:
+            yield
+        finally:
+            if getattr(self.local, "holds_lock", False):
+                self.local.holds_lock = False
+                self.row_lock.release()
+
+    def acquire(self, *, nowait, skip_locked):
+        if not self.row_lock.acquire(blocking=False):
+            if skip_locked:
+                raise LockingTrade.DoesNotExist()
+            raise lock_not_available()
+        self.local.holds_lock = True
+        with self.mutex:
+            return dict(self.row)
+
+    def compare_and_swap(self, version, fields):
+        with self.mutex:
+            if self.row["version"] != version:
+                return 0
+            self.row.update(fields)
+            return 1
+
+
+class FakeLockingQuerySet:
+    def __init__(self, store, nowait, skip_locked):
+        self.store, self.nowait, self.skip_locked = store, nowait, skip_locked
+
+
+class FakeVersionFilter:
+    def __init__(self, store, version):
+        self.store, self.version = store, version
+
+    def update(self, **fields):
+        return self.store.compare_and_swap(self.version, fields)
+
+
+class FakeManager:
+    def __init__(self, store):
+        self.store = store
+
+    def select_for_update(self, nowait=False, skip_locked=False):
+        return FakeLockingQuerySet(self.store, nowait, skip_locked)
+
+    def filter(self, id, version):
+        return FakeVersionFilter(self.store, version)
+
+
+class LockingTrade(FakeTrade):
+    class DoesNotExist(Exception): pass
+
+    def refresh_from_db(self, from_queryset):
+        row = from_queryset.store.acquire(nowait=from_queryset.nowait, skip_locked=from_queryset.skip_locked)
+        for name, value in row.items():
+            setattr(self, name, value)
+
+
+class TestConcurrentTransitions(unittest.TestCase):
+    THREADS = 16
+
+    def setUp(self):
+        self.store = FakeRowStore(
+            id=1, state="PendingApproval", requester_id="req", approver_id=None, version=2, strike=None,
+        )
+
+        def _slow_snapshot(*args, **kwargs):
+            time.sleep(0.05)
+
+        self.patches = [
+            patch("trades_approval.services.use_cases.Trade", LockingTrade),
+            patch.object(LockingTrade, "objects", FakeManager(self.store), create=True),
+            patch("trades_approval.services.use_cases.create_snapshot", side_effect=_slow_snapshot),
+            patch("trades_approval.services.use_cases.log_action"),
+            patch("trades_approval.services.use_cases.record_event"),
+            patch("trades_approval.services.use_cases.refresh_trade_on_commit"),
+            patch("trades_approval.services.use_cases.dto_to_model", side_effect=dto_to_model_copy),
+            patch("trades_approval.services.use_cases.dto_from_model", side_effect=dto_from_model_copy),
+            patch("trades_approval.services.use_cases.transaction.atomic", self.store.atomic),
+            patch("trades_approval.services.use_cases.update_counters"),
+        ]
+        for p in self.patches:
+            p.start()
+        self.addCleanup(lambda: [p.stop() for p in self.patches])
+
+    def _fire(self):
+        barrier = threading.Barrier(self.THREADS)
+        outcomes = [None] * self.THREADS
+
+        def worker(i):
+            with self.store.mutex:
+                trade = LockingTrade(**self.store.row)
+            barrier.wait()
+            try:
+                if i % 2:
+                    use_cases.cancel_trade(trade, actor_id="req")
+                else:
+                    use_cases.approve_trade(trade, actor_id=f"appr_{i}")
+                outcomes[i] = "ok"
+            except Exception as e:
+                outcomes[i] = type(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return outcomes
+
+    def _assert_serialised(self, outcomes):
+        successes = outcomes.count("ok")
+        self.assertGreaterEqual(successes, 1)
+        self.assertIn(use_cases.TradeLocked, outcomes)
+        self.assertNotIn(use_cases.ConcurrentUpdate, outcomes)
+        self.assertTrue(set(outcomes) <= {"ok", use_cases.TradeLocked, InvalidTransition, PermissionDenied})
+        self.assertEqual(self.store.row["version"], 2 + successes)
+        self.assertEqual(use_cases.log_action.call_count, successes)
+        self.assertFalse(self.store.row_lock.locked())
+
+    def test_nowait_locking_fails_fast_and_never_loses_updates(self):
+        with override_settings(TRADE_TRANSITION_LOCKING="nowait"):
+            outcomes = self._fire()
+        self._assert_serialised(outcomes)
+
+    def test_skip_locked_locking_fails_fast_and_never_loses_updates(self):
+        with override_settings(TRADE_TRANSITION_LOCKING="skip_locked"):
+            outcomes = self._fire()
+        self._assert_serialised(outcomes)
+
+    def test_optimistic_mode_lets_exactly_one_racer_win(self):
+        with override_settings(TRADE_TRANSITION_LOCKING="optimistic"):
+            outcomes = self._fire()
+        self.assertEqual(outcomes.count("ok"), 1)
+        self.assertEqual(outcomes.count(use_cases.ConcurrentUpdate), self.THREADS - 1)
+        self.assertEqual(self.store.row["version"], 3)
+
+    def test_only_lock_not_available_maps_to_trade_locked(self):
+        trade = LockingTrade(**self.store.row)
+        lost = db_error("server closed the connection unexpectedly", "08006")
+        for error, expected in ((lock_not_available(), use_cases.TradeLocked), (lost, OperationalError)):
+            with patch.object(LockingTrade, "refresh_from_db", side_effect=error):
+                with self.assertRaises(expected):
+                    use_cases._lock_trade(trade, "nowait")
+
+
+@contextmanager
+def sqlite_file(path):
+    """
+    Point this thread's default connection at the SQLite file path.
+
+    The in-memory test database is shared-cache, where concurrent writers fail
+    with "database table is locked" instead of waiting on busy_timeout, so the
+    racing tests run against a file with the same OPTIONS.
+    """
+    previous = connections["default"]
+    db = type(previous)({**previous.settings_dict, "NAME": path}, "default")
+    connections["default"] = db
+    try:
+        yield
+    finally:
+        db.close()
+        connections["default"] = previous
+
+
+class TestConcurrentApprovalsOnSqlite(TransactionTestCase):
+    """
+    Racing approvers against a real SQLite database: no fakes between
+    approve_trade and the compare-and-swap UPDATE ... WHERE version = ?.
+    """
+    APPROVERS = 4
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "race.sqlite3")
+        with sqlite_file(self.path), connections["default"].schema_editor() as editor:
+            # The app ships without migrations; create its tables from the models.
+            for model in apps.get_app_config("trades_approval").get_models():
+                editor.create_model(model)
+
+    def _race(self, trade_id):
+        # Every approver loads the same version before any of them writes.
+        loaded = threading.Barrier(self.APPROVERS)
+        outcomes = [None] * self.APPROVERS
+
+        def approver(i):
+            with sqlite_file(self.path):
+                try:
+                    trade = Trade.objects.get(id=trade_id)
+                    loaded.wait()
+                    use_cases.approve_trade(trade, actor_id=f"appr_{i}")
+                    outcomes[i] = "ok"
+                except Exception as e:
+                    outcomes[i] = type(e)
+
+        threads = [threading.Thread(target=approver, args=(i,)) for i in range(self.APPROVERS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return outcomes
+
+    @override_settings(TRADE_TRANSITION_LOCKING="optimistic", TRADE_CACHE_ENABLED=False)
+    def test_optimistic_mode_exactly_one_approver_wins(self):
+        with sqlite_file(self.path):
+            trade = use_cases.create_and_submit(make_details(), actor_id="req")
+
+        outcomes = self._race(trade.id)
+
+        self.assertEqual(outcomes.count("ok"), 1, outcomes)
+        self.assertEqual(outcomes.count(use_cases.ConcurrentUpdate), self.APPROVERS - 1, outcomes)
+        with sqlite_file(self.path):
+            trade.refresh_from_db()
+            self.assertEqual((trade.state, trade.version), ("Approved", 3))
+            self.assertEqual(ActionLog.objects.filter(trade=trade, action="Approve").count(), 1)
+            self.assertEqual(list(TradeVersion.objects.filter(trade=trade).values_list("action", flat=True).order_by("version_number")), ["Submit", "Approve"])
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.apps import apps
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from trades_approval.models import WorkQueueCounter
+from trades_approval.services import use_cases
+from trades_approval.services.counters import CounterDeltas, counter_keys, update_counters, user_counts
+from trades_approval.tests.test_concurrency import sqlite_file
+from trades_approval.tests.test_usecases import make_details
+
+
+def row(state="PendingApproval", requester_id="req", approver_id=None):
+    return SimpleNamespace(state=state, requester_id=requester_id, approver_id=approver_id)
+
+
+class TestWorkQueueCounters(unittest.TestCase):
+    def test_counter_keys(self):
+        self.assertEqual(counter_keys(row()), {("req", "PendingApproval")})
+        self.assertEqual(counter_keys(row(state="NeedsReapproval", approver_id="appr")),
+                         {("req", "NeedsReapproval"), ("appr", "NeedsReapproval")})
+        self.assertEqual(counter_keys(row(approver_id="req")), {("req", "PendingApproval")})
+        self.assertEqual(counter_keys(row(state="Approved", approver_id="appr")), frozenset())
+
+    @patch("trades_approval.services.counters.delete_empty_rows")
+    @patch("trades_approval.services.counters.increment_rows")
+    def test_transition_moves_only_changed_keys(self, mock_increment, mock_delete):
+        update_counters(row(), row(state="NeedsReapproval", approver_id="appr"))
+
+        mock_increment.assert_called_once_with(WorkQueueCounter, ("user_id", "state"), ("count",), {
+            ("req", "PendingApproval"): (-1,),
+            ("req", "NeedsReapproval"): (1,),
+            ("appr", "NeedsReapproval"): (1,),
+        })
+        mock_delete.assert_called_once_with(
+            WorkQueueCounter, ("user_id", "state"), [("req", "PendingApproval")], "count",
+        )
+
+    @patch("trades_approval.services.counters.delete_empty_rows")
+    @patch("trades_approval.services.counters.increment_rows")
+    def test_deltas_are_netted_and_noop_moves_write_nothing(self, mock_increment, _):
+        deltas = CounterDeltas()
+        deltas.add(row())
+        deltas.add(row())
+        deltas.move(row(approver_id="appr"), row(approver_id="appr"))
+        deltas.add(row(state="NeedsReapproval"))
+        deltas.add(row(state="NeedsReapproval"), -1)
+        deltas.apply()
+
+        mock_increment.assert_called_once_with(
+            WorkQueueCounter, ("user_id", "state"), ("count",), {("req", "PendingApproval"): (2,)},
+        )
+
+    @patch("trades_approval.services.counters.WorkQueueCounter")
+    def test_user_counts_fills_missing_states(self, MockCounter):
+        MockCounter.objects.filter.return_value.values_list.return_value = [("NeedsReapproval", 3)]
+        self.assertEqual(user_counts("req"), {"PendingApproval": 0, "NeedsReapproval": 3})
+        MockCounter.objects.filter.assert_called_once_with(user_id="req")
+
+
+class TestWorkQueueCountersOnSqlite(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "counters.sqlite3")
+        with sqlite_file(self.path), connections["default"].schema_editor() as editor:
+            for model in apps.get_app_config("trades_approval").get_models():
+                editor.create_model(model)
+
+    @override_settings(TRADE_CACHE_ENABLED=False)
+    def test_counters_that_drop_to_zero_are_deleted(self):
+        with sqlite_file(self.path):
+            trade = use_cases.create_and_submit(make_details(), actor_id="req")
+            self.assertEqual(list(WorkQueueCounter.objects.values_list("user_id", "state", "count")),
+                             [("req", "PendingApproval", 1)])
+
+            use_cases.approve_trade(trade, actor_id="appr")
+
+            self.assertFalse(WorkQueueCounter.objects.exists())
+            self.assertEqual(user_counts("req"), {"PendingApproval": 0, "NeedsReapproval": 0})
@@ -0,0 +1,133 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+
+from django.apps import apps
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from trades_approval.mappers import snapshot_model_dict
+from trades_approval.services import use_cases
+from trades_approval.services.export import (
+    decode_cursor,
+    encode_cursor,
+    iter_export_rows,
+    parse_instant,
+    render_export,
+)
+from trades_approval.tests.test_concurrency import sqlite_file
+from trades_approval.tests.test_usecases import make_details
+
+
+def log_row(n):
+    return {
+        "id": n, "trade_id": 1, "action": "Submit", "actor_user_id": "u1", "before_state": "Draft",
+        "after_state": "PendingApproval", "note": "", "created_at": datetime(2025, 11, 11, 9, n, tzinfo=timezone.utc),
+    }
+
+
+class TestExport(unittest.TestCase):
+    def test_parse_instant_accepts_dates_and_datetimes(self):
+        self.assertEqual(parse_instant("from", "2025-11-11"), datetime(2025, 11, 11, tzinfo=timezone.utc))
+        self.assertEqual(parse_instant("to", "2025-11-11T09:30:00Z"), datetime(2025, 11, 11, 9, 30, tzinfo=timezone.utc))
+        with self.assertRaises(ValueError):
+            parse_instant("from", "yesterday")
+
+    def test_cursor_round_trip(self):
+        cursor = (datetime(2025, 11, 11, 9, 30, 0, 123456, tzinfo=timezone.utc), 42)
+        self.assertEqual(decode_cursor(encode_cursor(cursor)), cursor)
+        with self.assertRaises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    def test_iter_export_rows_pages_by_keyset(self):
+        model = MagicMock()
+        base = model.objects.filter.return_value.order_by.return_value.values.return_value
+        base.__getitem__.return_value.iterator.return_value = iter([log_row(1), log_row(2)])
+        base.filter.return_value.__getitem__.return_value.iterator.return_value = iter([log_row(3)])
+        start, end = datetime(2025, 11, 11, tzinfo=timezone.utc), datetime(2025, 11, 12, tzinfo=timezone.utc)
+
+        with patch.dict("trades_approval.services.export.EXPORT_KINDS", {"actions": (model, ("id",))}):
+            rows = list(iter_export_rows("actions", start, end, chunk_size=2))
+
+        self.assertEqual([r["id"] for r in rows], [1, 2, 3])
+        model.objects.filter.assert_called_once_with(created_at__gte=start, created_at__lt=end)
+        model.objects.filter.return_value.order_by.assert_called_once_with("created_at", "id")
+        base.__getitem__.assert_called_once_with(slice(None, 2))
+        keyset = base.filter.call_args.args[0]
+        self.assertIn(("created_at", log_row(2)["created_at"]), keyset.children[1].children)
+        self.assertIn(("id__gt", 2), keyset.children[1].children)
+
+    def test_iter_export_rows_stops_at_limit(self):
+        model = MagicMock()
+        base = model.objects.filter.return_value.order_by.return_value.values.return_value
+        base.__getitem__.return_value.iterator.return_value = iter([log_row(1), log_row(2)])
+        start, end = datetime(2025, 11, 11, tzinfo=timezone.utc), datetime(2025, 11, 12, tzinfo=timezone.utc)
+
+        with patch.dict("trades_approval.services.export.EXPORT_KINDS", {"actions": (model, ("id",))}):
+            rows = list(iter_export_rows("actions", start, end, limit=2, chunk_size=5))
+
+        self.assertEqual(len(rows), 2)
+        base.filter.assert_not_called()
+
+    def test_render_export_formats(self):
+        rows = [log_row(1), log_row(2)]
+
+        ndjson = "".join(render_export("actions", "ndjson", rows)).splitlines()
+        self.assertEqual(json.loads(ndjson[1])["created_at"], "2025-11-11T09:02:00+00:00")
+
+        csv_lines = "".join(render_export("actions", "csv", rows)).splitlines()
+        self.assertEqual(csv_lines[0], "id,trade_id,action,actor_user_id,before_state,after_state,note,created_at")
+        self.assertEqual(len(csv_lines), 3)
+
+        groups = [json.loads(line) for line in render_export("actions", "columnar", rows * 3, row_group=4)]
+        self.assertEqual([g["numRows"] for g in groups], [4, 2])
+        self.assertEqual(groups[0]["columns"]["id"], [1, 2, 1, 2])
+
+    @patch("trades_approval.services.export.resolve_delta_snapshots")
+    def test_version_pages_resolve_delta_snapshots(self, mock_resolve):
+        def version(n, trade_id, snapshot, is_keyframe):
+            return {"id": n, "trade_id": trade_id, "version_number": n, "is_keyframe": is_keyframe,
+                    "snapshot": snapshot, "created_at": datetime(2025, 11, 11, 9, n, tzinfo=timezone.utc)}
+
+        model = MagicMock()
+        base = model.objects.filter.return_value.order_by.return_value.values.return_value
+        base.__getitem__.return_value.iterator.return_value = iter([
+            version(2, 1, {"a": 1, "b": 1}, True), version(3, 1, {"b": 2}, False), version(4, 7, {"a": 5}, False),
+        ])
+        mock_resolve.side_effect = lambda trade_id, numbers: {1: {3: {"a": 1, "b": 2}}, 7: {}}[trade_id]
+        start, end = datetime(2025, 11, 11, tzinfo=timezone.utc), datetime(2025, 11, 12, tzinfo=timezone.utc)
+
+        with patch.dict("trades_approval.services.export.EXPORT_KINDS", {"versions": (model, ("id",))}):
+            rows = list(iter_export_rows("versions", start, end, chunk_size=5))
+
+        self.assertEqual([r["snapshot"] for r in rows], [{"a": 1, "b": 1}, {"a": 1, "b": 2}, None])
+        self.assertEqual(sorted(c.args for c in mock_resolve.call_args_list), [(1, [3]), (7, [4])])
+
+
+class TestVersionExportOnSqlite(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "export.sqlite3")
+        with sqlite_file(self.path), connections["default"].schema_editor() as editor:
+            for model in apps.get_app_config("trades_approval").get_models():
+                editor.create_model(model)
+
+    @override_settings(TRADE_VERSION_STORAGE="delta", TRADE_VERSION_KEYFRAME_INTERVAL=10, TRADE_CACHE_ENABLED=False)
+    def test_delta_stored_versions_export_full_snapshots(self):
+        with sqlite_file(self.path):
+            trade = use_cases.create_and_submit(make_details(), actor_id="req")
+            expected = {trade.version: snapshot_model_dict(trade)}
+            trade = use_cases.approve_trade(trade, actor_id="appr")
+            expected[trade.version] = snapshot_model_dict(trade)
+            trade = use_cases.send_to_execute_trade(trade, actor_id="appr")
+            expected[trade.version] = snapshot_model_dict(trade)
+
+            now = datetime.now(timezone.utc)
+            rows = list(iter_export_rows("versions", now - timedelta(hours=1), now + timedelta(hours=1), chunk_size=1))
+
+        self.assertEqual([r["is_keyframe"] for r in rows], [True, False, False])
+        self.assertEqual({r["version_number"]: r["snapshot"] for r in rows}, expected)
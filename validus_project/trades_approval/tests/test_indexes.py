@@ -0,0 +1,31 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from trades_approval.indexes import UNDERLYING_GIN_INDEX, create_postgres_indexes
+
+
+def fake_connection(vendor):
+    connection = MagicMock(vendor=vendor)
+    connection.ops.quote_name = lambda name: f'"{name}"'
+    return connection
+
+
+class TestPostgresIndexes(unittest.TestCase):
+    def test_creates_gin_index_on_postgresql(self):
+        connection = fake_connection("postgresql")
+        with patch("trades_approval.indexes.connections", {"default": connection}):
+            create_postgres_indexes(using="default")
+
+        cursor = connection.cursor.return_value.__enter__.return_value
+        (sql,), _ = cursor.execute.call_args
+        self.assertEqual(
+            sql,
+            f'CREATE INDEX IF NOT EXISTS "{UNDERLYING_GIN_INDEX}" '
+            'ON "trades_approval_trade" USING gin ("underlying" jsonb_path_ops)',
+        )
+
+    def test_noop_on_sqlite(self):
+        connection = fake_connection("sqlite")
+        with patch("trades_approval.indexes.connections", {"default": connection}):
+            create_postgres_indexes(using="default")
+        connection.cursor.assert_not_called()
@@ -0,0 +1,64 @@
+import unittest
+from dataclasses import replace
+from datetime import date
+from decimal import Decimal
+
+from trades_approval.dto import evolve
+from trades_approval.mappers import dto_from_model, dto_to_model, _mapped_field_names
+from trades_approval.models import Trade
+
+
+def make_trade(**overrides):
+    fields = dict(
+        id=1,
+        trading_entity="Validus Capital Ltd",
+        counterparty="Bank of England",
+        direction="BUY",
+        style="FORWARD",
+        notional_currency="USD",
+        notional_amount=Decimal("5000000.00"),
+        underlying=["USD", "EUR"],
+        trade_date=date(2025, 11, 1),
+        value_date=date(2025, 11, 5),
+        delivery_date=date(2025, 11, 10),
+        requester_id="user_001",
+        state="PendingApproval",
+        version=2,
+    )
+    fields.update(overrides)
+    return Trade(**fields)
+
+
+class TestMappers(unittest.TestCase):
+    def test_dto_to_model_returns_changed_fields(self):
+        trade = make_trade()
+        dto = dto_from_model(trade)
+        after = replace(dto, state="NeedsReapproval", approver_id="user_002",
+                        notional_amount=Decimal("2000000.00"), version=3)
+
+        changed = dto_to_model(after, trade)
+
+        self.assertEqual(changed, {"state", "approver_id", "notional_amount", "version"})
+        self.assertEqual(trade.notional_amount, Decimal("2000000.00"))
+        self.assertEqual(trade.approver_id, "user_002")
+
+    def test_dto_to_model_no_changes(self):
+        trade = make_trade()
+        self.assertEqual(dto_to_model(dto_from_model(trade), trade), set())
+
+    def test_field_names_cached_per_model_class(self):
+        names = _mapped_field_names(Trade)
+        self.assertIs(names, _mapped_field_names(Trade))
+        self.assertNotIn("id", names)
+        self.assertNotIn("updated_at", names)
+        self.assertIn("underlying", names)
+
+    def test_dto_is_slotted(self):
+        dto = dto_from_model(make_trade())
+        self.assertFalse(hasattr(dto, "__dict__"))
+
+    def test_evolve_matches_replace(self):
+        dto = dto_from_model(make_trade())
+        changes = dict(state="Approved", approver_id="user_002", version=3)
+        self.assertEqual(evolve(dto, **changes), replace(dto, **changes))
+        self.assertEqual(evolve(dto), dto)
@@ -0,0 +1,150 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from django.apps import apps
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+
+from trades_approval.models import OutboxSequence
+from trades_approval.services import outbox, use_cases
+from trades_approval.tests.test_concurrency import sqlite_file
+from trades_approval.tests.test_usecases import make_details
+
+
+@contextmanager
+def _noop_atomic():
+    yield
+
+
+def event(n, to_state="SentToCounterparty"):
+    return SimpleNamespace(
+        id=n, trade_id=1, action="SendToExecute", actor_user_id="appr", from_state="Approved",
+        to_state=to_state, version=4, created_at=datetime(2025, 11, 11, 9, n), sequence=None,
+    )
+
+
+class TestOutbox(unittest.TestCase):
+    @patch("trades_approval.services.outbox.OutboxEvent")
+    def test_record_event_captures_transition(self, MockEvent):
+        trade = SimpleNamespace(id=1, state="Executed", version=5)
+        outbox.record_event(trade=trade, action="Book", actor_user_id="req", before_state="SentToCounterparty")
+        MockEvent.objects.create.assert_called_once_with(
+            trade=trade, action="Book", actor_user_id="req",
+            from_state="SentToCounterparty", to_state="Executed", version=5,
+        )
+
+    @patch("trades_approval.services.outbox.transaction.atomic", _noop_atomic)
+    @patch("trades_approval.services.outbox.OutboxSequence")
+    @patch("trades_approval.services.outbox.OutboxEvent")
+    def test_relay_batch_numbers_publishes_then_marks(self, MockEvent, MockSequence):
+        counter = MockSequence.objects.select_for_update.return_value.get.return_value
+        counter.last = 40
+        pending = MockEvent.objects.filter.return_value.order_by.return_value
+        pending.__getitem__.return_value = [event(1), event(2)]
+        sink = MagicMock()
+
+        self.assertEqual(outbox.relay_batch(sink, batch_size=10), 2)
+
+        MockSequence.objects.bulk_create.assert_called_once()
+        MockSequence.objects.select_for_update.return_value.get.assert_called_once_with(pk=1)
+        MockEvent.objects.filter.assert_called_once_with(published_at__isnull=True)
+        pending.__getitem__.assert_called_once_with(slice(None, 10))
+        published = sink.publish.call_args.args[0]
+        self.assertEqual([(e["id"], e["sequence"]) for e in published], [(1, 41), (2, 42)])
+        self.assertEqual(published[0]["toState"], "SentToCounterparty")
+        marked, fields = MockEvent.objects.bulk_update.call_args.args
+        self.assertEqual(fields, ["sequence", "published_at"])
+        self.assertTrue(all(e.published_at is not None for e in marked))
+        self.assertEqual(counter.last, 42)
+        counter.save.assert_called_once_with(update_fields=["last"])
+
+    @patch("trades_approval.services.outbox.transaction.atomic", _noop_atomic)
+    @patch("trades_approval.services.outbox.OutboxSequence")
+    @patch("trades_approval.services.outbox.OutboxEvent")
+    def test_sink_failure_leaves_events_unpublished(self, MockEvent, MockSequence):
+        counter = MockSequence.objects.select_for_update.return_value.get.return_value
+        counter.last = 0
+        MockEvent.objects.filter.return_value.order_by.return_value.__getitem__.return_value = [event(1)]
+        sink = MagicMock()
+        sink.publish.side_effect = OSError("broker down")
+
+        with self.assertRaises(OSError):
+            outbox.relay_batch(sink)
+        MockEvent.objects.bulk_update.assert_not_called()
+        counter.save.assert_not_called()
+
+    @patch("trades_approval.services.outbox.relay_batch", side_effect=[2, 2, 1])
+    def test_relay_pending_drains(self, mock_batch):
+        self.assertEqual(outbox.relay_pending(MagicMock(), batch_size=2), 5)
+        self.assertEqual(mock_batch.call_count, 3)
+
+    def test_sinks(self):
+        outbox.QueueSink().publish([{"id": 1}, {"id": 2}])
+        self.assertEqual([outbox.QueueSink.queue.get_nowait()["id"] for _ in range(2)], [1, 2])
+
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        sink = outbox.FileSink(path)
+        sink.publish([{"id": 1}])
+        sink.publish([{"id": 2}])
+        with open(path) as f:
+            self.assertEqual([json.loads(line)["id"] for line in f], [1, 2])
+
+    @patch("trades_approval.services.outbox.OutboxEvent")
+    def test_events_after_pages_by_relay_sequence(self, MockEvent):
+        qs = MockEvent.objects.filter.return_value.order_by.return_value
+        qs.filter.return_value = qs
+        qs.__getitem__.return_value = [event(5)]
+
+        self.assertEqual([e["id"] for e in outbox.events_after(4, to_states=["Executed"])], [5])
+
+        MockEvent.objects.filter.assert_called_once_with(sequence__gt=4)
+        MockEvent.objects.filter.return_value.order_by.assert_called_once_with("sequence")
+        qs.filter.assert_called_once_with(to_state__in=["Executed"])
+
+    @patch("trades_approval.services.outbox.time.sleep")
+    @patch("trades_approval.services.outbox.events_after", side_effect=[[], [], [{"id": 3}]])
+    def test_wait_for_events_polls_until_events(self, mock_after, mock_sleep):
+        self.assertEqual(outbox.wait_for_events(2, to_states=["Executed"], timeout=60), [{"id": 3}])
+        self.assertEqual(mock_sleep.call_count, 2)
+        mock_after.assert_called_with(2, to_states=["Executed"])
+
+    @patch("trades_approval.services.outbox.events_after", return_value=[])
+    def test_wait_for_events_times_out_empty(self, _):
+        self.assertEqual(outbox.wait_for_events(0, timeout=0), [])
+
+
+class TestRelayOrderingOnSqlite(TransactionTestCase):
+    """The relay and the subscriber feed against a real database."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "outbox.sqlite3")
+        with sqlite_file(self.path), connections["default"].schema_editor() as editor:
+            for model in apps.get_app_config("trades_approval").get_models():
+                editor.create_model(model)
+
+    @override_settings(TRADE_CACHE_ENABLED=False)
+    def test_subscribers_only_see_relayed_events_in_sequence_order(self):
+        with sqlite_file(self.path):
+            trade = use_cases.create_and_submit(make_details(), actor_id="req")
+            self.assertEqual(outbox.events_after(0), [])
+
+            sink = MagicMock()
+            self.assertEqual(outbox.relay_batch(sink), 1)
+            use_cases.approve_trade(trade, actor_id="appr")
+            self.assertEqual(outbox.relay_batch(sink), 1)
+            self.assertEqual(outbox.relay_batch(sink), 0)
+
+            feed = outbox.events_after(0)
+            self.assertEqual([(e["sequence"], e["toState"]) for e in feed], [(1, "PendingApproval"), (2, "Approved")])
+            self.assertEqual([e["sequence"] for e in outbox.events_after(1)], [2])
+            self.assertEqual(OutboxSequence.objects.get(pk=1).last, 2)
@@ -0,0 +1,107 @@
+import unittest
+from datetime import date
+from unittest.mock import patch, MagicMock
+
+from types import SimpleNamespace
+
+from trades_approval.services.queries import (
+    filter_trades, work_queue, action_predicate, allowed_actions_from_row, trades_by_currency, _ACTOR_PREDICATES,
+)
+from trades_approval.services.underlying import build_underlying_rows
+from trades_approval.services.trade_workflow import TRANSITIONS
+
+
+class TestFilterTrades(unittest.TestCase):
+    @patch("trades_approval.services.queries.Trade")
+    def test_no_params_returns_all(self, MockTrade):
+        qs = filter_trades({})
+        self.assertIs(qs, MockTrade.objects.all.return_value)
+        MockTrade.objects.all.return_value.filter.assert_not_called()
+
+    @patch("trades_approval.services.queries.Trade")
+    def test_filters_are_chained(self, MockTrade):
+        qs = MagicMock()
+        qs.filter.return_value = qs
+        MockTrade.objects.all.return_value = qs
+
+        filter_trades({
+            "state": "PendingApproval,NeedsReapproval",
+            "approverId": "user_002",
+            "counterparty": "Bank of England",
+            "tradeDateFrom": "2025-11-01",
+            "deliveryDateTo": "2025-12-31",
+        })
+
+        qs.filter.assert_any_call(state__in=["PendingApproval", "NeedsReapproval"])
+        qs.filter.assert_any_call(approver_id="user_002")
+        qs.filter.assert_any_call(counterparty="Bank of England")
+        qs.filter.assert_any_call(trade_date__gte=date(2025, 11, 1))
+        qs.filter.assert_any_call(delivery_date__lte=date(2025, 12, 31))
+        self.assertEqual(qs.filter.call_count, 5)
+
+    @patch("trades_approval.services.queries.Trade")
+    def test_single_state_uses_equality(self, MockTrade):
+        qs = MockTrade.objects.all.return_value
+        filter_trades({"state": "Approved"})
+        qs.filter.assert_called_once_with(state="Approved")
+
+    @patch("trades_approval.services.queries.Trade")
+    def test_invalid_params_raise(self, MockTrade):
+        with self.assertRaises(ValueError):
+            filter_trades({"state": "Bogus"})
+        with self.assertRaises(ValueError):
+            filter_trades({"valueDateFrom": "01/11/2025"})
+
+
+class TestWorkQueue(unittest.TestCase):
+    def test_every_actor_transition_has_a_predicate(self):
+        self.assertEqual(set(_ACTOR_PREDICATES), {key for key in TRANSITIONS if key[1] != "Submit"})
+
+    def test_predicate_ors_legal_states(self):
+        q = action_predicate("u2", "Approve")
+        self.assertEqual(q.connector, "OR")
+        states = [branch.children[0] for branch in q.children]
+        self.assertEqual(states, [("state", "PendingApproval"), ("state", "NeedsReapproval")])
+
+    @patch("trades_approval.services.queries.Trade")
+    def test_annotates_one_flag_per_requested_action(self, MockTrade):
+        qs = work_queue("u2", ["Approve", "SendToExecute"])
+
+        annotated = MockTrade.objects.filter.return_value.annotate
+        self.assertIs(qs, annotated.return_value)
+        self.assertEqual(sorted(annotated.call_args.kwargs), ["can_approve", "can_send_to_execute"])
+
+    @patch("trades_approval.services.queries.Trade")
+    def test_unknown_action_raises(self, MockTrade):
+        with self.assertRaises(ValueError):
+            work_queue("u2", ["Submit"])
+        MockTrade.objects.filter.assert_not_called()
+
+    def test_allowed_actions_from_row(self):
+        row = SimpleNamespace(can_approve=True, can_cancel=True, can_update=False)
+        self.assertEqual(allowed_actions_from_row(row), ["Approve", "Cancel"])
+
+
+class TestTradesByCurrency(unittest.TestCase):
+    @patch("trades_approval.services.queries.Trade")
+    def test_filters_side_table_and_states(self, MockTrade):
+        qs = trades_by_currency("eur", ["PendingApproval", "Approved"])
+
+        MockTrade.objects.filter.assert_called_once_with(underlying_currencies__currency="EUR")
+        annotated = MockTrade.objects.filter.return_value.annotate
+        self.assertEqual(list(annotated.call_args.kwargs), ["underlying_trade_id"])
+        annotated.return_value.filter.assert_called_once_with(state__in=["PendingApproval", "Approved"])
+        self.assertIs(qs, annotated.return_value.filter.return_value)
+
+    @patch("trades_approval.services.queries.Trade")
+    def test_invalid_params_raise(self, MockTrade):
+        with self.assertRaises(ValueError):
+            trades_by_currency("EURO")
+        with self.assertRaises(ValueError):
+            trades_by_currency("EUR", ["Bogus"])
+
+    def test_underlying_rows_are_upper_cased_distinct_in_order(self):
+        trade = SimpleNamespace(id=1, underlying=["eur", "USD", "EUR"])
+        with patch("trades_approval.services.underlying.TradeUnderlying", SimpleNamespace):
+            rows = build_underlying_rows(trade)
+        self.assertEqual([r.currency for r in rows], ["EUR", "USD"])
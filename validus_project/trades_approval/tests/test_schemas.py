@@ -0,0 +1,118 @@
+import unittest
+from unittest.mock import patch
+
+from rest_framework.exceptions import ValidationError
+
+from trades_approval.schemas import BOOK_SCHEMA, TRADE_DETAILS_SCHEMA, TRADE_UPDATE_SCHEMA
+from trades_approval.serializers import BookSerializer, TradeDetailsSerializer, TradeUpdateSerializer
+
+DETAILS = {
+    "tradingEntity": "Validus Capital Ltd",
+    "counterparty": "Bank of England",
+    "direction": "BUY",
+    "style": "FORWARD",
+    "notionalCurrency": "USD",
+    "notionalAmount": "5000000.00",
+    "underlying": ["USD", "EUR"],
+    "tradeDate": "2025-11-01",
+    "valueDate": "2025-11-05",
+    "deliveryDate": "2025-11-10",
+}
+
+
+def details(**overrides):
+    payload = dict(DETAILS, **overrides)
+    return {k: v for k, v in payload.items() if v is not None}
+
+
+DETAILS_CASES = [
+    details(),
+    details(notionalAmount=5000000),
+    details(notionalAmount=1.5),
+    details(notionalAmount="1.005"),
+    details(notionalAmount="1e3"),
+    details(notionalAmount="NaN"),
+    details(notionalAmount="123456789012345678901"),
+    details(notionalAmount=True),
+    details(tradingEntity="  padded  "),
+    details(tradingEntity="   "),
+    details(tradingEntity="x" * 121),
+    details(tradingEntity="nul\x00"),
+    details(tradingEntity=12),
+    details(direction="buy"),
+    details(notionalCurrency="USDX"),
+    details(underlying=[]),
+    details(underlying="USD"),
+    details(underlying=["USD", 1]),
+    details(tradeDate="2025-11-1"),
+    details(tradeDate="2025-02-30"),
+    details(tradeDate="20251101"),
+    details(valueDate=None),
+    dict(DETAILS, extra="x"),
+    {},
+    [],
+    None,
+]
+
+UPDATE_CASES = [
+    {"notionalAmount": "2000000.00"},
+    {"counterparty": "Bank of France", "deliveryDate": "2025-12-01"},
+    {},
+    {"unknown": 1},
+    {"direction": "HOLD"},
+    {"underlying": ["USD"], "valueDate": "not a date"},
+]
+
+BOOK_CASES = [
+    {"userId": "user_002", "strike": "1.2345"},
+    {"userId": "user_002", "strike": 1.1, "expectedVersion": 3},
+    {"userId": "user_002", "strike": "0"},
+    {"userId": "user_002", "strike": "-1"},
+    {"userId": "user_002", "strike": "1.1234567"},
+    {"userId": "user_002", "strike": "1.1", "expectedVersion": 0},
+    {"userId": "user_002", "strike": "1.1", "expectedVersion": "3"},
+    {"userId": "", "strike": "1.1"},
+    {"strike": "1.1"},
+    {"userId": "user_002", "strike": "1.1", "note": "x"},
+]
+
+
+class TestCompiledSchemas(unittest.TestCase):
+    def assert_matches_serializer(self, schema, serializer_class, cases):
+        for data in cases:
+            with self.subTest(data=data):
+                serializer = serializer_class(data=data)
+                expected_valid = serializer.is_valid()
+                result = schema(data)
+                self.assertEqual(result.is_valid(), expected_valid)
+                if expected_valid:
+                    self.assertEqual(list(result.validated_data.items()), list(serializer.validated_data.items()))
+                    self.assertEqual(
+                        [type(v) for v in result.validated_data.values()],
+                        [type(v) for v in serializer.validated_data.values()],
+                    )
+                else:
+                    self.assertEqual(result.errors, serializer.errors)
+
+    def test_trade_details_match_serializer(self):
+        self.assert_matches_serializer(TRADE_DETAILS_SCHEMA, TradeDetailsSerializer, DETAILS_CASES)
+
+    def test_trade_update_matches_serializer(self):
+        self.assert_matches_serializer(TRADE_UPDATE_SCHEMA, TradeUpdateSerializer, UPDATE_CASES)
+
+    def test_book_matches_serializer(self):
+        self.assert_matches_serializer(BOOK_SCHEMA, BookSerializer, BOOK_CASES)
+
+    def test_valid_payload_skips_serializer(self):
+        with patch.object(TRADE_DETAILS_SCHEMA, "serializer_class") as serializer_class:
+            result = TRADE_DETAILS_SCHEMA(details())
+        self.assertTrue(result.is_valid())
+        serializer_class.assert_not_called()
+
+    def test_invalid_payload_uses_serializer_errors(self):
+        result = BOOK_SCHEMA({"userId": "user_002", "strike": "-1"})
+        self.assertFalse(result.is_valid())
+        self.assertEqual(result.errors, {"strike": ["strike must be greater than 0."]})
+        with self.assertRaises(ValidationError) as ctx:
+            result.is_valid(raise_exception=True)
+        self.assertEqual(ctx.exception.detail, result.errors)
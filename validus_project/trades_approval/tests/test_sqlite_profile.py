@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+
+from django.conf import settings
+from django.db.backends.sqlite3.base import DatabaseWrapper
+
+
+class TestSqliteProfile(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.db = DatabaseWrapper({**settings.DATABASES["default"], "NAME": self.path}, alias="profile")
+
+    def tearDown(self):
+        self.db.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+    def pragma(self, name):
+        with self.db.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connect(self):
+        self.assertEqual(self.pragma("journal_mode"), "wal")
+        self.assertEqual(self.pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self.pragma("busy_timeout"), settings.SQLITE_PRAGMAS["busy_timeout"])
+        self.assertEqual(self.pragma("mmap_size"), settings.SQLITE_PRAGMAS["mmap_size"])
+
+    def test_transactions_begin_immediate(self):
+        self.db.ensure_connection()
+        self.assertEqual(self.db.transaction_mode, "IMMEDIATE")
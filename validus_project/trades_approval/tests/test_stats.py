@@ -0,0 +1,141 @@
+import os
+import tempfile
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from django.apps import apps
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from trades_approval.models import TradeSummary
+from trades_approval.services import use_cases
+from trades_approval.services.stats import SummaryDeltas, trade_stats, update_summary
+from trades_approval.tests.test_concurrency import sqlite_file
+from trades_approval.tests.test_usecases import make_details
+
+
+def row(state="PendingApproval", counterparty="Bank A", currency="USD", direction="BUY", notional="100.00"):
+    return SimpleNamespace(
+        state=state, counterparty=counterparty, notional_currency=currency, direction=direction,
+        notional_amount=Decimal(notional),
+    )
+
+
+def key(state, counterparty="Bank A", currency="USD", direction="BUY"):
+    return (state, counterparty, currency, direction)
+
+
+def written(mock_increment):
+    """The group deltas passed to increment_rows, merged over every call."""
+    deltas = {}
+    for args, _ in mock_increment.call_args_list:
+        model, key_fields, increment_fields, rows = args
+        assert (model, key_fields, increment_fields) == (
+            TradeSummary, ("state", "counterparty", "notional_currency", "direction"), ("trade_count", "notional_total"),
+        )
+        deltas.update(rows)
+    return deltas
+
+
+@override_settings(TRADE_STATS_SUMMARY=True)
+@patch("trades_approval.services.stats.delete_empty_rows")
+class TestSummaryDeltas(SimpleTestCase):
+    @patch("trades_approval.services.stats.increment_rows")
+    def test_move_between_groups(self, mock_increment, mock_delete):
+        update_summary(row(), row(state="Approved"))
+
+        self.assertEqual(written(mock_increment), {
+            key("PendingApproval"): (-1, Decimal("-100.00")),
+            key("Approved"): (1, Decimal("100.00")),
+        })
+        mock_delete.assert_called_once_with(
+            TradeSummary, ("state", "counterparty", "notional_currency", "direction"), [key("PendingApproval")],
+            "trade_count",
+        )
+
+    @patch("trades_approval.services.stats.increment_rows")
+    def test_adds_are_netted_per_group(self, mock_increment, mock_delete):
+        deltas = SummaryDeltas()
+        deltas.add(row())
+        deltas.add(row(notional="50.00"))
+        deltas.apply()
+
+        mock_increment.assert_called_once()
+        self.assertEqual(written(mock_increment), {key("PendingApproval"): (2, Decimal("150.00"))})
+        self.assertEqual(mock_delete.call_args.args[2], [])
+
+    @patch("trades_approval.services.stats.increment_rows")
+    def test_unchanged_group_and_notional_writes_nothing(self, mock_increment, _):
+        update_summary(row(), row(counterparty="Bank A"))
+        deltas = SummaryDeltas()
+        deltas.move(row(), row(state="Approved"))
+        deltas.move(row(state="Approved"), row())
+        deltas.apply()
+        self.assertEqual(written(mock_increment), {})
+
+    @override_settings(TRADE_STATS_SUMMARY=False)
+    @patch("trades_approval.services.stats.increment_rows")
+    def test_disabled_is_noop(self, mock_increment, _):
+        update_summary(row(), row(state="Approved"))
+        self.assertEqual(written(mock_increment), {})
+
+
+class TestTradeStats(SimpleTestCase):
+    @patch("trades_approval.services.stats.Trade")
+    def test_live_groups_and_totals(self, MockTrade):
+        qs = MagicMock()
+        qs.filter.return_value = qs
+        MockTrade.objects.all.return_value = qs
+        qs.values.return_value.annotate.return_value.order_by.return_value = [
+            {"state": "Approved", "notional_currency": "EUR", "count": 2, "notional": Decimal("10")},
+            {"state": "Approved", "notional_currency": "USD", "count": 1, "notional": Decimal("2.5")},
+        ]
+
+        result = trade_stats(["state", "currency"], ["Approved"])
+
+        qs.filter.assert_called_once_with(state__in=["Approved"])
+        qs.values.assert_called_once_with("state", "notional_currency")
+        self.assertEqual(result, {
+            "groupBy": ["state", "currency"],
+            "source": "live",
+            "totals": {"count": 3, "notionalTotal": "12.50"},
+            "groups": [
+                {"state": "Approved", "currency": "EUR", "count": 2, "notionalTotal": "10.00"},
+                {"state": "Approved", "currency": "USD", "count": 1, "notionalTotal": "2.50"},
+            ],
+        })
+
+    @override_settings(TRADE_STATS_SUMMARY=True)
+    @patch("trades_approval.services.stats.TradeSummary")
+    def test_summary_is_default_when_enabled(self, MockSummary):
+        MockSummary.objects.filter.return_value.values.return_value.annotate.return_value.order_by.return_value = []
+        self.assertEqual(trade_stats([])["source"], "summary")
+        MockSummary.objects.filter.assert_called_once_with(trade_count__gt=0)
+
+    def test_invalid_params_raise(self):
+        for kwargs in ({"group_by": ["desk"]}, {"group_by": [], "states": ["Bogus"]},
+                       {"group_by": [], "source": "cache"}, {"group_by": [], "source": "summary"}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                trade_stats(**kwargs)
+
+
+class TestSummaryOnSqlite(TransactionTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "summary.sqlite3")
+        with sqlite_file(self.path), connections["default"].schema_editor() as editor:
+            for model in apps.get_app_config("trades_approval").get_models():
+                editor.create_model(model)
+
+    @override_settings(TRADE_STATS_SUMMARY=True, TRADE_CACHE_ENABLED=False)
+    def test_emptied_groups_are_deleted(self):
+        with sqlite_file(self.path):
+            trade = use_cases.create_and_submit(make_details(counterparty="Bank A"), actor_id="req")
+            use_cases.update_trade(trade, actor_id="appr", trade_detail=make_details(counterparty="Bank B"))
+
+            self.assertEqual(
+                list(TradeSummary.objects.values_list("state", "counterparty", "trade_count")),
+                [("NeedsReapproval", "Bank B", 1)],
+            )
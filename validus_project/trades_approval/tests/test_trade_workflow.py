@@ -10,6 +10,12 @@ from trades_approval.services.trade_workflow import (
     update,
     send_to_execute,
     book,
+    allowed_actions,
+    allowed_actions_many,
+    is_legal,
+    is_legal_many,
+    transition_note,
+    TRANSITIONS,
     InvalidTransition,
     PermissionDenied,
 )
@@ -171,4 +177,57 @@ class TestTradeWorkflow(unittest.TestCase):
     def test_book_unauthorized(self):
         dto = make_dto(state="SentToCounterparty", requester_id="req", approver_id="approver")
         with self.assertRaises(PermissionDenied):
-            book(dto, actor_id="other", strike=1.0)
\ No newline at end of file
+            book(dto, actor_id="other", strike=1.0)
+
+
+class TestTransitionTable(unittest.TestCase):
+    def test_compiled_masks_match_table(self):
+        states = ["Draft", "PendingApproval", "NeedsReapproval", "Approved", "SentToCounterparty", "Executed", "Cancelled"]
+        for action in ["Submit", "Approve", "Cancel", "Update", "SendToExecute", "Book"]:
+            expected = [(state, action) in TRANSITIONS for state in states]
+            self.assertEqual(is_legal_many(states, action), expected, action)
+            self.assertEqual([is_legal(state, action) for state in states], expected, action)
+        self.assertFalse(is_legal("Unknown", "Approve"))
+        self.assertFalse(is_legal("Draft", "Explode"))
+
+    def test_invalid_transition_messages_unchanged(self):
+        cases = [
+            (submit, (), "Approved", "Submit is only allowed from Draft."),
+            (approve, ("a",), "Approved", "Approve requires PendingApproval or NeedsReapproval."),
+            (cancel, ("req",), "Cancelled", "Cannot cancel a terminal trade."),
+            (update, ("a", {}), "Approved", "Update is only allowed from PendingApproval or NeedsReapproval."),
+            (send_to_execute, ("a",), "Draft", "SendToExecute is only allowed from Approved."),
+            (book, ("req", 1), "Approved", "Book is only allowed from SentToCounterparty."),
+        ]
+        for fn, args, state, message in cases:
+            with self.assertRaisesRegex(InvalidTransition, f"^{message}$"):
+                fn(make_dto(state=state, requester_id="req"), *args)
+
+    def test_cancel_allowed_from_draft(self):
+        out = cancel(make_dto(state="Draft", requester_id="req"), actor_id="req")
+        self.assertEqual(out.state, "Cancelled")
+
+    def test_allowed_actions(self):
+        pending = make_dto(state="PendingApproval", requester_id="req")
+        self.assertEqual(allowed_actions(pending), ["Approve", "Cancel", "Update"])
+        self.assertEqual(allowed_actions(pending, actor_id="req"), ["Cancel"])
+        self.assertEqual(allowed_actions(pending, actor_id="appr"), ["Approve", "Update"])
+
+        approved = make_dto(state="Approved", requester_id="req", approver_id="appr")
+        self.assertEqual(allowed_actions(approved, actor_id="appr"), ["Cancel", "SendToExecute"])
+        self.assertEqual(allowed_actions(make_dto(state="Executed")), [])
+
+    def test_allowed_actions_many_matches_per_trade(self):
+        dtos = [
+            make_dto(state=state, requester_id="req", approver_id=approver)
+            for state in ["Draft", "PendingApproval", "NeedsReapproval", "Approved", "SentToCounterparty", "Executed"]
+            for approver in (None, "appr")
+        ]
+        for actor_id in (None, "req", "appr", "other"):
+            self.assertEqual(allowed_actions_many(dtos, actor_id=actor_id),
+                             [allowed_actions(dto, actor_id=actor_id) for dto in dtos], actor_id)
+
+    def test_transition_notes(self):
+        self.assertEqual(transition_note("Approve", "PendingApproval"), "Approver confirms trade")
+        self.assertEqual(transition_note("Approve", "NeedsReapproval"), "Requester reapproves updated trade details")
+        self.assertEqual(transition_note("Book", "Draft"), "")
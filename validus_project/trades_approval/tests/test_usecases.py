@@ -2,7 +2,11 @@ import unittest
 from contextlib import contextmanager
 from datetime import date
 from decimal import Decimal
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError
 
 from trades_approval.dto import TradeDTO
 from trades_approval.services import use_cases
@@ -44,15 +48,24 @@ class FakeTrade:
         self.version = kwargs.get("version", 1)
         self.id = kwargs.get("id", 123)
 
+    _meta = SimpleNamespace(fields=[SimpleNamespace(name=n) for n in (
+        "id", "trading_entity", "counterparty", "direction", "style", "notional_currency",
+        "notional_amount", "underlying", "trade_date", "value_date", "delivery_date", "strike",
+        "requester_id", "approver_id", "state", "version", "created_at", "updated_at",
+    )])
+
     def full_clean(self): pass
+    def clean_fields(self, exclude=None): pass
     def save(self): pass
 
 
-def dto_to_model_copy(dto: TradeDTO, trade: FakeTrade) -> FakeTrade:
-    for name, value in dto.__dict__.items():
-        if hasattr(trade, name):
-            setattr(trade, name, value)
-    return trade
+def dto_to_model_copy(dto: TradeDTO, trade: FakeTrade) -> set:
+    changed = set()
+    for name in TradeDTO.__dataclass_fields__:
+        if name != "id" and hasattr(trade, name) and getattr(trade, name) != getattr(dto, name):
+            setattr(trade, name, getattr(dto, name))
+            changed.add(name)
+    return changed
 
 
 def dto_from_model_copy(trade: FakeTrade) -> TradeDTO:
@@ -83,13 +96,24 @@ def _noop_atomic():
 
 class TestUseCases(unittest.TestCase):
     def setUp(self):
+        self.trade_manager = MagicMock()
+        self.trade_manager.filter.return_value.update.return_value = 1
         self.patches = [
             patch("trades_approval.services.use_cases.Trade", FakeTrade),
+            patch.object(FakeTrade, "objects", self.trade_manager, create=True),
             patch("trades_approval.services.use_cases.create_snapshot"),
             patch("trades_approval.services.use_cases.log_action"),
+            patch("trades_approval.services.use_cases.record_event"),
+            patch("trades_approval.services.use_cases.refresh_trade_on_commit"),
             patch("trades_approval.services.use_cases.dto_to_model", side_effect=dto_to_model_copy),
             patch("trades_approval.services.use_cases.dto_from_model", side_effect=dto_from_model_copy),
             patch("trades_approval.services.use_cases.transaction.atomic", _noop_atomic),
+            patch("trades_approval.services.use_cases.TradeUnderlying"),
+            patch("trades_approval.services.use_cases.build_underlying_rows"),
+            patch("trades_approval.services.use_cases.sync_underlying"),
+            patch("trades_approval.services.use_cases.add_to_summary"),
+            patch("trades_approval.services.use_cases.update_summary"),
+            patch("trades_approval.services.use_cases.update_counters"),
         ]
         for p in self.patches:
             p.start()
@@ -101,6 +125,26 @@ class TestUseCases(unittest.TestCase):
         self.assertEqual(trade.requester_id, "user_req")
         self.assertEqual(trade.state, "PendingApproval")
         self.assertEqual(trade.version, 2)
+        use_cases.build_underlying_rows.assert_called_once_with(trade)
+        use_cases.TradeUnderlying.objects.bulk_create.assert_called_once_with(
+            use_cases.build_underlying_rows.return_value
+        )
+
+    def test_transitions_update_summary(self):
+        trade = use_cases.create_and_submit(make_details(), actor_id="user_req")
+        use_cases.add_to_summary.assert_called_once_with([trade])
+        before, after = use_cases.update_summary.call_args[0]
+        self.assertEqual((before.state, after.state), ("Draft", "PendingApproval"))
+        self.assertIs(after, trade)
+        use_cases.update_counters.assert_called_once_with(before, trade)
+
+    def test_update_resyncs_underlying_only_when_it_changes(self):
+        trade = FakeTrade(state="PendingApproval", requester_id="req", version=1)
+        use_cases.update_trade(trade, actor_id="appr", trade_detail={"counterparty": "Bank C"})
+        use_cases.sync_underlying.assert_not_called()
+
+        use_cases.update_trade(trade, actor_id="appr", trade_detail={"underlying": ["USD", "JPY"]})
+        use_cases.sync_underlying.assert_called_once_with([trade])
 
     def test_approve_trade(self):
         trade = FakeTrade(state="PendingApproval", version=1, requester_id="req", approver_id=None)
@@ -109,6 +153,18 @@ class TestUseCases(unittest.TestCase):
         self.assertEqual(trade.approver_id, "approver_1")
         self.assertEqual(trade.version, 2)
 
+    def test_transition_records_outbox_event(self):
+        trade = FakeTrade(state="Approved", version=3, requester_id="req", approver_id="appr")
+        use_cases.send_to_execute_trade(trade, actor_id="appr")
+        use_cases.record_event.assert_called_once_with(
+            trade=trade, action="SendToExecute", actor_user_id="appr", before_state="Approved",
+        )
+
+    def test_transition_refreshes_trade_cache_on_commit(self):
+        trade = FakeTrade(state="PendingApproval", version=1, requester_id="req")
+        use_cases.approve_trade(trade, actor_id="approver_1")
+        use_cases.refresh_trade_on_commit.assert_called_once_with(trade)
+
     def test_cancel_trade(self):
         trade = FakeTrade(state="PendingApproval", requester_id="req", version=2)
         trade = use_cases.cancel_trade(trade, actor_id="req")
@@ -148,3 +204,248 @@ class TestUseCases(unittest.TestCase):
         self.assertEqual(trade.state, "Executed")
         self.assertEqual(trade.version, 5)
         self.assertEqual(trade.strike, Decimal("1.2345"))
+
+    def test_transition_saves_with_version_check(self):
+        trade = FakeTrade(id=7, state="PendingApproval", requester_id="req", version=3)
+        use_cases.approve_trade(trade, actor_id="approver_1")
+
+        self.trade_manager.filter.assert_called_once_with(id=7, version=3)
+        written = self.trade_manager.filter.return_value.update.call_args[1]
+        self.assertEqual(set(written), {"state", "approver_id", "version", "updated_at"})
+        self.assertEqual(written["version"], 4)
+        self.assertEqual(written["state"], "Approved")
+
+    def test_changed_validation_cleans_only_changed_fields(self):
+        trade = FakeTrade(state="PendingApproval", requester_id="req", version=3)
+        with patch.object(FakeTrade, "full_clean") as full_clean, \
+                patch.object(FakeTrade, "clean_fields") as clean_fields:
+            use_cases.approve_trade(trade, actor_id="approver_1")
+
+        full_clean.assert_not_called()
+        excluded = clean_fields.call_args[1]["exclude"]
+        self.assertNotIn("state", excluded)
+        self.assertNotIn("approver_id", excluded)
+        self.assertIn("underlying", excluded)
+        self.assertIn("notional_amount", excluded)
+
+    def test_full_validation_mode_runs_full_clean(self):
+        trade = FakeTrade(state="PendingApproval", requester_id="req", version=3)
+        with patch.object(FakeTrade, "full_clean") as full_clean:
+            use_cases._run_transition(
+                trade=trade,
+                actor_id="approver_1",
+                wf_fn=use_cases.approve,
+                action_name="Approve",
+                validation="full",
+            )
+        full_clean.assert_called_once_with()
+
+    def test_transition_conflict_raises(self):
+        self.trade_manager.filter.return_value.update.return_value = 0
+        trade = FakeTrade(state="PendingApproval", requester_id="req", version=3)
+        with self.assertRaises(use_cases.ConcurrentUpdate):
+            use_cases.approve_trade(trade, actor_id="approver_1")
+        use_cases.log_action.assert_not_called()
+
+    def test_stale_expected_version_rejected_before_workflow(self):
+        trade = FakeTrade(state="PendingApproval", requester_id="req", version=3)
+        with self.assertRaises(use_cases.ConcurrentUpdate):
+            use_cases.approve_trade(trade, actor_id="approver_1", expected_version=2)
+        self.trade_manager.filter.assert_not_called()
+        self.assertEqual(trade.state, "PendingApproval")
+
+
+class TestBulkCreateAndSubmit(unittest.TestCase):
+    def setUp(self):
+        self.trade_manager = MagicMock()
+
+        def _assign_ids(trades):
+            for i, t in enumerate(trades, start=100):
+                t.id = i
+            return trades
+
+        self.trade_manager.bulk_create.side_effect = _assign_ids
+        self.patches = [
+            patch("trades_approval.services.use_cases.Trade", FakeTrade),
+            patch.object(FakeTrade, "objects", self.trade_manager, create=True),
+            patch("trades_approval.services.use_cases.TradeVersion"),
+            patch("trades_approval.services.use_cases.ActionLog"),
+            patch("trades_approval.services.use_cases.build_snapshot"),
+            patch("trades_approval.services.use_cases.build_action_log"),
+            patch("trades_approval.services.use_cases.dto_to_model", side_effect=dto_to_model_copy),
+            patch("trades_approval.services.use_cases.dto_from_model", side_effect=dto_from_model_copy),
+            patch("trades_approval.services.use_cases.transaction.atomic", _noop_atomic),
+            patch("trades_approval.services.use_cases.OutboxEvent"),
+            patch("trades_approval.services.use_cases.build_event"),
+            patch("trades_approval.services.use_cases.TradeUnderlying"),
+            patch("trades_approval.services.use_cases.build_underlying_rows", side_effect=lambda t: [t.id]),
+            patch("trades_approval.services.use_cases.add_to_counters"),
+        ]
+        self.mocks = [p.start() for p in self.patches]
+        self.addCleanup(lambda: [p.stop() for p in self.patches])
+        self.MockTradeVersion = self.mocks[2]
+        self.MockActionLog = self.mocks[3]
+
+    def test_bulk_submit_persists_valid_and_reports_invalid(self):
+        details = [
+            make_details(),
+            make_details(valueDate=date(2025, 10, 1)),
+            make_details(notionalCurrency="GBP"),
+            make_details(counterparty="Bank B"),
+        ]
+        outcomes = use_cases.bulk_create_and_submit(details, actor_id="user_req", chunk_size=1000)
+
+        self.assertEqual(len(outcomes), 4)
+        self.assertEqual(outcomes[0].state, "PendingApproval")
+        self.assertEqual(outcomes[0].trade_id, 100)
+        self.assertIsNotNone(outcomes[1].error)
+        self.assertIsNotNone(outcomes[2].error)
+        self.assertEqual(outcomes[3].trade_id, 101)
+        created = self.trade_manager.bulk_create.call_args[0][0]
+        self.assertEqual([t.version for t in created], [2, 2])
+        self.assertEqual(created[1].counterparty, "Bank B")
+
+        self.trade_manager.bulk_create.assert_called_once()
+        self.assertEqual(len(self.trade_manager.bulk_create.call_args[0][0]), 2)
+        self.assertEqual(len(self.MockTradeVersion.objects.bulk_create.call_args[0][0]), 2)
+        self.assertEqual(len(self.MockActionLog.objects.bulk_create.call_args[0][0]), 2)
+        self.assertEqual(len(self.mocks[-5].objects.bulk_create.call_args[0][0]), 2)
+        self.mocks[-3].objects.bulk_create.assert_called_once_with([100, 101])
+        self.assertEqual(len(self.mocks[-1].call_args[0][0]), 2)
+
+    def test_bulk_submit_chunks_and_isolates_failed_chunk(self):
+        calls = {"n": 0}
+
+        def _fail_second_chunk(trades):
+            calls["n"] += 1
+            if calls["n"] == 2:
+                raise DatabaseError("boom")
+            return trades
+
+        self.trade_manager.bulk_create.side_effect = _fail_second_chunk
+        details = [make_details() for _ in range(5)]
+        outcomes = use_cases.bulk_create_and_submit(details, actor_id="user_req", chunk_size=2)
+
+        self.assertEqual(self.trade_manager.bulk_create.call_count, 3)
+        self.assertEqual([o.error is None for o in outcomes], [True, True, False, False, True])
+        self.assertIn("boom", outcomes[2].error)
+
+
+class TestBulkTransition(unittest.TestCase):
+    def setUp(self):
+        self.trades = {
+            1: FakeTrade(id=1, state="PendingApproval", requester_id="req", version=2),
+            2: FakeTrade(id=2, state="PendingApproval", requester_id="req", version=2),
+        }
+        self.trade_manager = MagicMock()
+        self.locked = self.trade_manager.select_for_update.return_value.filter.return_value.order_by
+        self.locked.return_value = list(self.trades.values())
+        self.patches = [
+            patch("trades_approval.services.use_cases.Trade", FakeTrade),
+            patch.object(FakeTrade, "objects", self.trade_manager, create=True),
+            patch("trades_approval.services.use_cases.TradeVersion"),
+            patch("trades_approval.services.use_cases.ActionLog"),
+            patch("trades_approval.services.use_cases.build_snapshot"),
+            patch("trades_approval.services.use_cases.build_action_log"),
+            patch("trades_approval.services.use_cases.refresh_trade_on_commit"),
+            patch("trades_approval.services.use_cases.dto_to_model", side_effect=dto_to_model_copy),
+            patch("trades_approval.services.use_cases.dto_from_model", side_effect=dto_from_model_copy),
+            patch("trades_approval.services.use_cases.transaction.atomic", _noop_atomic),
+            patch("trades_approval.services.use_cases.OutboxEvent"),
+            patch("trades_approval.services.use_cases.build_event"),
+            patch("trades_approval.services.use_cases.sync_underlying"),
+            patch("trades_approval.services.use_cases.CounterDeltas"),
+        ]
+        self.mocks = [p.start() for p in self.patches]
+        self.addCleanup(lambda: [p.stop() for p in self.patches])
+
+    def test_bulk_transition_chains_and_reports_per_item(self):
+        items = [
+            use_cases.BulkTransition(trade_id=1, action="Approve", actor_id="appr", wf_kwargs={}),
+            use_cases.BulkTransition(trade_id=1, action="SendToExecute", actor_id="appr", wf_kwargs={}),
+            use_cases.BulkTransition(trade_id=2, action="Approve", actor_id="req", wf_kwargs={}),
+            use_cases.BulkTransition(trade_id=3, action="Cancel", actor_id="req", wf_kwargs={}),
+            use_cases.BulkTransition(trade_id=2, action="Cancel", actor_id="req", wf_kwargs={}, expected_version=1),
+        ]
+        outcomes = use_cases.bulk_transition(items)
+
+        self.assertEqual([(o.trade_id, o.state) for o in outcomes[:2]],
+                         [(1, "Approved"), (1, "SentToCounterparty")])
+        self.assertIn("Requester cannot approve", outcomes[2].error)
+        self.assertEqual(outcomes[3].error, "Trade not found.")
+        self.assertIn("modified concurrently", outcomes[4].error)
+        self.assertEqual(self.trades[1].version, 4)
+
+        self.trade_manager.select_for_update.return_value.filter.assert_called_once_with(id__in={1, 2, 3})
+        self.locked.assert_called_once_with("id")
+        updated, fields = self.trade_manager.bulk_update.call_args[0]
+        self.assertEqual([t.id for t in updated], [1])
+        self.assertEqual(fields, ["approver_id", "state", "updated_at", "version"])
+        self.assertEqual(self.mocks[4].call_count, 2)
+        self.assertEqual(self.mocks[5].call_count, 2)
+        self.mocks[6].assert_called_once_with(self.trades[1])
+        self.assertEqual(self.mocks[-3].call_count, 2)
+        self.mocks[-4].objects.bulk_create.assert_called_once()
+        self.assertEqual(list(self.mocks[-2].call_args[0][0]), [])
+        counters = self.mocks[-1].return_value
+        self.assertEqual(counters.move.call_count, 2)
+        counters.apply.assert_called_once_with()
+
+    def test_bulk_transition_rejects_illegal_actions_before_loading_dtos(self):
+        items = [
+            use_cases.BulkTransition(trade_id=1, action="Book", actor_id="req", wf_kwargs={"strike": 1}),
+            use_cases.BulkTransition(trade_id=2, action="SendToExecute", actor_id="appr", wf_kwargs={}),
+        ]
+        outcomes = use_cases.bulk_transition(items)
+
+        self.assertEqual([o.error for o in outcomes], [
+            "Book is only allowed from SentToCounterparty.", "SendToExecute is only allowed from Approved.",
+        ])
+        self.mocks[8].assert_not_called()
+        self.assertEqual(self.trades[1].version, 2)
+
+    def test_bulk_update_resyncs_changed_underlying(self):
+        items = [
+            use_cases.BulkTransition(trade_id=1, action="Update", actor_id="appr",
+                                     wf_kwargs={"trade_update_details": {"underlying": ["USD", "JPY"]}}),
+            use_cases.BulkTransition(trade_id=2, action="Update", actor_id="appr",
+                                     wf_kwargs={"trade_update_details": {"counterparty": "Bank C"}}),
+        ]
+        outcomes = use_cases.bulk_transition(items)
+
+        self.assertEqual([o.error for o in outcomes], [None, None])
+        self.assertEqual(list(self.mocks[-2].call_args[0][0]), [self.trades[1]])
+
+    def test_bulk_items_are_validated_like_single_transitions(self):
+        def clean_fields(trade, exclude=None):
+            if len(trade.counterparty) > 120:
+                raise DjangoValidationError({"counterparty": ["Ensure this value has at most 120 characters."]})
+
+        items = [
+            use_cases.BulkTransition(trade_id=1, action="Update", actor_id="appr",
+                                     wf_kwargs={"trade_update_details": {"counterparty": "B" * 121}}),
+            use_cases.BulkTransition(trade_id=1, action="Approve", actor_id="appr", wf_kwargs={}),
+            use_cases.BulkTransition(trade_id=2, action="Update", actor_id="appr",
+                                     wf_kwargs={"trade_update_details": {"counterparty": "Bank C"}}),
+        ]
+        with patch.object(FakeTrade, "clean_fields", autospec=True, side_effect=clean_fields) as mock_clean:
+            outcomes = use_cases.bulk_transition(items)
+
+        self.assertEqual(outcomes[0].error, "Ensure this value has at most 120 characters.")
+        self.assertEqual([(o.state, o.error) for o in outcomes[1:]],
+                         [("Approved", None), ("NeedsReapproval", None)])
+        self.assertEqual((self.trades[1].counterparty, self.trades[1].version), ("C", 3))
+        self.assertEqual(mock_clean.call_count, 3)
+
+    def test_bulk_transition_moves_summary_groups(self):
+        items = [
+            use_cases.BulkTransition(trade_id=1, action="Approve", actor_id="appr", wf_kwargs={}),
+            use_cases.BulkTransition(trade_id=2, action="Cancel", actor_id="req", wf_kwargs={}),
+        ]
+        with patch("trades_approval.services.use_cases.SummaryDeltas") as MockDeltas:
+            use_cases.bulk_transition(items)
+
+        deltas = MockDeltas.return_value
+        moves = [(before.state, after.state) for before, after in (c.args for c in deltas.move.call_args_list)]
+        self.assertEqual(moves, [("PendingApproval", "Approved"), ("PendingApproval", "Cancelled")])
+        deltas.apply.assert_called_once_with()
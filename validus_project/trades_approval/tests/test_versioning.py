@@ -1,7 +1,22 @@
 import unittest
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
 
-from trades_approval.services.versioning import create_snapshot, diff_snapshots
+from django.test import SimpleTestCase, override_settings
+
+from trades_approval.services.versioning import (
+    create_snapshot,
+    build_snapshot,
+    diff_snapshots,
+    load_versions,
+    load_version_range,
+    previous_snapshot,
+    reencode_trade_versions,
+)
+
+
+def version_row(n, snapshot, is_keyframe=True):
+    return SimpleNamespace(version_number=n, snapshot=snapshot, is_keyframe=is_keyframe)
 
 
 class TestVersioning(unittest.TestCase):
@@ -27,6 +42,7 @@ class TestVersioning(unittest.TestCase):
             version_number=3,
             state="PendingApproval",
             snapshot=mock_snap.return_value,
+            is_keyframe=True,
             actor_user_id="user_abc",
             action="Submit",
         )
@@ -42,3 +58,114 @@ class TestVersioning(unittest.TestCase):
         self.assertEqual(diff["only_a"], ("A", None))
         self.assertEqual(diff["only_b"], (None, "B"))
         self.assertNotIn("x", diff)
+
+
+@override_settings(TRADE_VERSION_STORAGE="delta", TRADE_VERSION_KEYFRAME_INTERVAL=4)
+class TestDeltaVersioning(SimpleTestCase):
+    def _trade(self, version, state="NeedsReapproval", amount="2000000.00"):
+        t = SimpleNamespace(version=version, state=state)
+        t.snapshot = {"notional_amount": amount, "state": state, "version": version}
+        return t
+
+    @patch("trades_approval.services.versioning.TradeVersion", side_effect=lambda **kw: SimpleNamespace(**kw))
+    @patch("trades_approval.services.versioning.snapshot_model_dict", side_effect=lambda t: t.snapshot)
+    def test_intermediate_versions_store_deltas(self, *_):
+        previous = {"notional_amount": "5000000.00", "state": "PendingApproval", "version": 2}
+        tv = build_snapshot(self._trade(3), actor_user_id="u", action="Update", previous=previous)
+        self.assertFalse(tv.is_keyframe)
+        self.assertEqual(tv.snapshot, {"notional_amount": "2000000.00", "state": "NeedsReapproval", "version": 3})
+
+        tv = build_snapshot(self._trade(3, state="PendingApproval", amount="5000000.00"),
+                            actor_user_id="u", action="Update", previous=previous)
+        self.assertEqual(tv.snapshot, {"version": 3})
+
+    @patch("trades_approval.services.versioning.TradeVersion", side_effect=lambda **kw: SimpleNamespace(**kw))
+    @patch("trades_approval.services.versioning.snapshot_model_dict", side_effect=lambda t: t.snapshot)
+    def test_keyframes_on_interval_and_without_previous(self, *_):
+        previous = {"notional_amount": "5000000.00", "state": "PendingApproval", "version": 3}
+        self.assertTrue(build_snapshot(self._trade(4), actor_user_id="u", action="Update", previous=previous).is_keyframe)
+        self.assertTrue(build_snapshot(self._trade(2), actor_user_id="u", action="Submit").is_keyframe)
+
+    @patch("trades_approval.services.versioning.snapshot_model_dict", return_value={"state": "Approved"})
+    def test_previous_snapshot_skips_draft(self, _):
+        self.assertIsNone(previous_snapshot(SimpleNamespace(state="Draft")))
+        self.assertEqual(previous_snapshot(SimpleNamespace(state="Approved")), {"state": "Approved"})
+
+    def test_load_versions_keyframes_need_one_query(self):
+        trade = MagicMock()
+        trade.versions.filter.return_value = [version_row(1, {"a": 1}), version_row(3, {"a": 2})]
+
+        out = load_versions(trade, [1, 3])
+
+        trade.versions.filter.assert_called_once_with(version_number__in={1, 3})
+        self.assertEqual(out[3].snapshot, {"a": 2})
+
+    def test_load_versions_folds_deltas_onto_keyframe(self):
+        rows = [
+            version_row(4, {"a": 1, "b": 1, "version": 4}),
+            version_row(5, {"b": 2, "version": 5}, is_keyframe=False),
+            version_row(6, {"a": 3, "version": 6}, is_keyframe=False),
+        ]
+        window = MagicMock()
+        window.order_by.return_value = rows
+        trade = MagicMock()
+        trade.versions.filter.side_effect = [[rows[0], version_row(6, {}, is_keyframe=False)], window]
+
+        out = load_versions(trade, [4, 6])
+
+        self.assertEqual(trade.versions.filter.call_count, 2)
+        self.assertEqual(out[4].snapshot, {"a": 1, "b": 1, "version": 4})
+        self.assertEqual(out[6].snapshot, {"a": 3, "b": 2, "version": 6})
+        self.assertNotIn(5, out)
+
+    def test_load_versions_missing_version_absent(self):
+        trade = MagicMock()
+        trade.versions.filter.return_value = [version_row(2, {"a": 1})]
+        self.assertEqual(set(load_versions(trade, [2, 9])), {2})
+
+    def test_resolve_does_not_fold_across_gaps(self):
+        rows = [
+            version_row(1, {"a": 1}),
+            version_row(2, {"a": 2}, is_keyframe=False),
+            version_row(7, {"b": 1}, is_keyframe=False),
+        ]
+        trade = MagicMock()
+        no_keyframe = MagicMock()
+        no_keyframe.values_list.return_value.first.return_value = None
+        trade.versions.filter.return_value.order_by.side_effect = [rows, no_keyframe]
+
+        self.assertEqual(set(load_version_range(trade, 1, 7)), {1, 2})
+
+    def test_load_version_range_resolves_every_version(self):
+        rows = [
+            version_row(4, {"a": 1, "version": 4}),
+            version_row(5, {"a": 2, "version": 5}, is_keyframe=False),
+            version_row(6, {"version": 6}, is_keyframe=False),
+        ]
+        trade = MagicMock()
+        trade.versions.filter.return_value.order_by.return_value = rows
+
+        out = load_version_range(trade, 5, 6)
+
+        trade.versions.filter.assert_called_once_with(version_number__lte=6, version_number__gt=1)
+        self.assertEqual(sorted(out), [5, 6])
+        self.assertEqual(out[6].snapshot, {"a": 2, "version": 6})
+
+    @patch("trades_approval.services.versioning.transaction.atomic", MagicMock())
+    @patch("trades_approval.services.versioning.TradeVersion")
+    def test_reencode_round_trips(self, MockTradeVersion):
+        rows = [version_row(n, {"a": n // 2, "b": 0, "version": n}) for n in range(2, 8)]
+        MockTradeVersion.objects.select_for_update.return_value.filter.return_value.order_by.return_value = rows
+
+        changed = reencode_trade_versions(7, interval=4)
+
+        self.assertEqual([tv.is_keyframe for tv in rows], [True, False, True, False, False, False])
+        self.assertEqual(rows[1].snapshot, {"version": 3})
+        self.assertEqual(rows[3].snapshot, {"version": 5})
+        self.assertEqual(rows[4].snapshot, {"a": 3, "version": 6})
+        self.assertEqual(changed, 4)
+
+        changed = reencode_trade_versions(7, interval=4, expand=True)
+        self.assertTrue(all(tv.is_keyframe for tv in rows))
+        self.assertEqual(rows[3].snapshot, {"a": 2, "b": 0, "version": 5})
+        self.assertEqual(changed, 4)
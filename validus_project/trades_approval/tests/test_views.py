@@ -1,13 +1,16 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from types import SimpleNamespace
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APISimpleTestCase
 from rest_framework import status
-from django.http import Http404
+from rest_framework.response import Response
 from trades_approval.services.trade_workflow import InvalidTransition, PermissionDenied
+from trades_approval.services.outbox import subscribers as event_subscribers
+from trades_approval.services.use_cases import ConcurrentUpdate, TradeLocked
 
 
 def fake_trade(
@@ -60,6 +63,190 @@ class TestTradeViewSet(APISimpleTestCase):
         self.assertEqual(kwargs["actor_id"], "user_001")
         self.assertIn("tradingEntity", kwargs["trade_detail"])
 
+    @patch("trades_approval.views.bulk_create_and_submit")
+    def test_bulk_submit_reports_per_item_results(self, mock_bulk):
+        mock_bulk.return_value = [
+            SimpleNamespace(trade_id=1, state="PendingApproval", error=None),
+            SimpleNamespace(trade_id=None, state=None, error="Notional currency must be included in the underlying."),
+        ]
+        details = {
+            "tradingEntity": "Validus Capital Ltd",
+            "counterparty": "Bank of England",
+            "direction": "BUY",
+            "style": "FORWARD",
+            "notionalCurrency": "USD",
+            "notionalAmount": 5000000.00,
+            "underlying": ["USD", "EUR"],
+            "tradeDate": "2025-11-01",
+            "valueDate": "2025-11-05",
+            "deliveryDate": "2025-11-10",
+        }
+        payload = {
+            "userId": "user_001",
+            "trades": [details, {"tradingEntity": "only"}, dict(details, notionalCurrency="GBP")],
+        }
+        res = self.client.post(reverse("trade-bulk-submit"), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["submitted"], 1)
+        self.assertEqual(res.data["failed"], 2)
+        self.assertEqual(res.data["results"][0], {"index": 0, "id": 1, "state": "PendingApproval"})
+        self.assertIn("counterparty", res.data["results"][1]["errors"])
+        self.assertIn("detail", res.data["results"][2]["errors"])
+        args, kwargs = mock_bulk.call_args
+        self.assertEqual(len(args[0]), 2)
+        self.assertEqual(kwargs["actor_id"], "user_001")
+
+    def test_bulk_submit_requires_trade_list_400(self):
+        res = self.client.post(reverse("trade-bulk-submit"), {"userId": "user_001", "trades": []}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch("trades_approval.views.bulk_transition")
+    def test_bulk_action_reports_per_item_results(self, mock_bulk):
+        mock_bulk.return_value = [
+            SimpleNamespace(trade_id=1, state="Approved", error=None),
+            SimpleNamespace(trade_id=None, state=None, error="Trade not found."),
+        ]
+        payload = {"actions": [
+            {"tradeId": 1, "action": "Approve", "userId": "user_002"},
+            {"tradeId": 2, "action": "Book", "userId": "user_001", "strike": "-1"},
+            {"tradeId": 3, "action": "Submit", "userId": "user_001"},
+            {"tradeId": 4, "action": "Update", "userId": "user_002",
+             "tradeUpdateDetails": {"notionalAmount": 2000000.00}},
+        ]}
+        res = self.client.post(reverse("trade-bulk-action"), payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["succeeded"], 1)
+        self.assertEqual(res.data["failed"], 3)
+        self.assertEqual(res.data["results"][0], {"index": 0, "id": 1, "state": "Approved"})
+        self.assertIn("strike", res.data["results"][1]["errors"])
+        self.assertIn("action", res.data["results"][2]["errors"])
+        self.assertEqual(res.data["results"][3]["errors"], {"detail": "Trade not found."})
+        transitions = mock_bulk.call_args[0][0]
+        self.assertEqual([t.trade_id for t in transitions], [1, 4])
+        self.assertIn("notionalAmount", transitions[1].wf_kwargs["trade_update_details"])
+
+    @patch("trades_approval.views.Trade.objects")
+    def test_allowed_actions_for_many_trades(self, mock_objects):
+        mock_objects.only.return_value.in_bulk.return_value = {
+            1: fake_trade(id=1, state="PendingApproval", version=2),
+            2: fake_trade(id=2, state="Approved", approver_id="user_002", version=3),
+        }
+
+        res = self.client.get(reverse("trade-allowed-actions"), {"tradeIds": "2,1,9", "userId": "user_002"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"], [
+            {"id": 2, "state": "Approved", "version": 3, "allowedActions": ["Cancel", "SendToExecute"]},
+            {"id": 1, "state": "PendingApproval", "version": 2, "allowedActions": ["Approve", "Update"]},
+            {"id": 9, "error": "Trade not found."},
+        ])
+        mock_objects.only.return_value.in_bulk.assert_called_once_with([2, 1, 9])
+
+        res = self.client.post(reverse("trade-allowed-actions"), {"tradeIds": [1]}, format="json")
+        self.assertEqual(res.data["results"][0]["allowedActions"], ["Approve", "Cancel", "Update"])
+
+    @patch("trades_approval.views.TradeViewSet.get_paginated_response")
+    @patch("trades_approval.views.TradeViewSet.paginate_queryset")
+    @patch("trades_approval.views.work_queue")
+    def test_work_queue(self, mock_queue, mock_paginate, mock_response):
+        trade = SimpleNamespace(
+            id=3, trading_entity="E", counterparty="C", direction="BUY", style="FORWARD",
+            notional_currency="USD", notional_amount=Decimal("1.00"), underlying=["USD"],
+            trade_date=date(2025, 11, 1), value_date=date(2025, 11, 2), delivery_date=date(2025, 11, 3),
+            strike=None, requester_id="user_001", approver_id=None, state="PendingApproval", version=2,
+            updated_at=datetime(2025, 11, 1, 9, 0), can_approve=True, can_update=True,
+        )
+        mock_paginate.return_value = [trade]
+        mock_response.side_effect = lambda rows: Response({"results": rows})
+
+        res = self.client.get(reverse("trade-work-queue"), {"userId": "user_002", "action": "Approve,Update"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_queue.assert_called_once_with("user_002", ["Approve", "Update"])
+        self.assertEqual(res.data["results"][0]["allowedActions"], ["Approve", "Update"])
+
+    @patch("trades_approval.views.work_queue", side_effect=ValueError("Unknown action: Submit."))
+    def test_work_queue_400(self, _):
+        self.assertEqual(self.client.get(reverse("trade-work-queue")).status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(reverse("trade-work-queue"), {"userId": "u", "action": "Submit"})
+        self.assertEqual(res.data, {"detail": "Unknown action: Submit."})
+
+    @patch("trades_approval.views.TradeViewSet.get_paginated_response")
+    @patch("trades_approval.views.TradeViewSet.paginate_queryset", return_value=[])
+    @patch("trades_approval.views.trades_by_currency")
+    def test_by_currency(self, mock_lookup, mock_paginate, mock_response):
+        mock_response.side_effect = lambda rows: Response({"results": rows})
+
+        res = self.client.get(reverse("trade-by-currency"), {"currency": "EUR", "state": "PendingApproval,Approved"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_lookup.assert_called_once_with("EUR", ["PendingApproval", "Approved"])
+        mock_paginate.assert_called_once_with(mock_lookup.return_value)
+
+    @patch("trades_approval.views.trades_by_currency", side_effect=ValueError("currency must be a 3-letter code."))
+    def test_by_currency_400(self, _):
+        self.assertEqual(self.client.get(reverse("trade-by-currency")).status_code, status.HTTP_400_BAD_REQUEST)
+        res = self.client.get(reverse("trade-by-currency"), {"currency": "EURO"})
+        self.assertEqual(res.data, {"detail": "currency must be a 3-letter code."})
+
+    @patch("trades_approval.views.trade_stats", return_value={"groups": []})
+    def test_stats(self, mock_stats):
+        res = self.client.get(reverse("trade-stats"), {"groupBy": "state,currency", "state": "Approved"})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_stats.assert_called_once_with(["state", "currency"], ["Approved"], None)
+
+        mock_stats.side_effect = ValueError("Unknown groupBy: desk.")
+        res = self.client.get(reverse("trade-stats"), {"groupBy": "desk"})
+        self.assertEqual((res.status_code, res.data), (status.HTTP_400_BAD_REQUEST, {"detail": "Unknown groupBy: desk."}))
+
+    @patch("trades_approval.views.user_counts", return_value={"PendingApproval": 2, "NeedsReapproval": 1})
+    def test_work_queue_counts(self, mock_counts):
+        res = self.client.get(reverse("trade-work-queue-counts"), {"userId": "user_002"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_counts.assert_called_once_with("user_002")
+        self.assertEqual(res.data, {
+            "userId": "user_002", "counts": {"PendingApproval": 2, "NeedsReapproval": 1}, "total": 3,
+        })
+        self.assertEqual(self.client.get(reverse("trade-work-queue-counts")).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_allowed_actions_requires_trade_ids_400(self):
+        for params in ({}, {"tradeIds": "1,x"}):
+            res = self.client.get(reverse("trade-allowed-actions"), params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+    @patch("trades_approval.views.TradeViewSet.get_paginated_response")
+    @patch("trades_approval.views.TradeViewSet.paginate_queryset")
+    @patch("trades_approval.views.filter_trades")
+    def test_list_paginates_filtered_trades(self, mock_filter, mock_paginate, mock_paginated_response):
+        t = SimpleNamespace(
+            id=5, trading_entity="E", counterparty="C", direction="BUY", style="FORWARD",
+            notional_currency="USD", notional_amount=Decimal("10.00"), underlying=["USD"],
+            trade_date=date(2025, 11, 1), value_date=date(2025, 11, 2), delivery_date=date(2025, 11, 3),
+            strike=None, requester_id="user_001", approver_id=None, state="PendingApproval",
+            version=2, updated_at=datetime(2025, 11, 11, 9, 0, 0),
+        )
+        mock_paginate.return_value = [t]
+        mock_paginated_response.side_effect = lambda data: Response({"next": None, "results": data})
+
+        res = self.client.get(reverse("trade-list"), {"state": "PendingApproval", "requesterId": "user_001"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["results"][0]["id"], 5)
+        self.assertEqual(res.data["results"][0]["requesterId"], "user_001")
+        self.assertIn("next", res.data)
+        mock_paginate.assert_called_once_with(mock_filter.return_value)
+        params = mock_filter.call_args[0][0]
+        self.assertEqual(params["state"], "PendingApproval")
+
+    @patch("trades_approval.views.filter_trades")
+    def test_list_bad_filter_400(self, mock_filter):
+        mock_filter.side_effect = ValueError("Unknown state: Foo.")
+        res = self.client.get(reverse("trade-list"), {"state": "Foo"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_submit_missing_userid_400(self):
         url = reverse("trade-submit")
         res = self.client.post(url, {"tradeDetails": {}}, format="json")
@@ -91,6 +278,92 @@ class TestTradeViewSet(APISimpleTestCase):
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertIn("detail", res.data)
 
+    @patch("trades_approval.views.approve_trade")
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_approve_concurrent_update_409(self, mock_get_object, mock_approve):
+        t = fake_trade(state="PendingApproval", id=11, version=2)
+        mock_get_object.return_value = t
+        mock_approve.side_effect = ConcurrentUpdate("modified concurrently")
+
+        url = reverse("trade-approve", kwargs={"pk": t.id})
+        res = self.client.post(url, {"userId": "user_002"}, format="json", HTTP_IF_MATCH='"2"')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        _, kwargs = mock_approve.call_args
+        self.assertEqual(kwargs["expected_version"], 2)
+
+    @patch("trades_approval.views.approve_trade")
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_approve_locked_trade_423(self, mock_get_object, mock_approve):
+        mock_get_object.return_value = fake_trade(state="PendingApproval", id=11)
+        mock_approve.side_effect = TradeLocked("locked")
+
+        url = reverse("trade-approve", kwargs={"pk": 11})
+        res = self.client.post(url, {"userId": "user_002"}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_423_LOCKED)
+
+    @patch("trades_approval.views.cancel_trade")
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_cancel_passes_body_expected_version(self, mock_get_object, mock_cancel):
+        t = fake_trade(state="Approved", id=12, version=3)
+        mock_get_object.return_value = t
+
+        url = reverse("trade-cancel", kwargs={"pk": t.id})
+        res = self.client.post(url, {"userId": "user_001", "expectedVersion": 3}, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_cancel.call_args[1]["expected_version"], 3)
+
+    @patch("trades_approval.views.approve_trade")
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_approve_accepts_history_etag_as_if_match(self, mock_get_object, mock_approve):
+        t = fake_trade(state="PendingApproval", id=11, version=4)
+        mock_get_object.return_value = t
+        mock_approve.return_value = t
+
+        url = reverse("trade-approve", kwargs={"pk": t.id})
+        self.client.post(url, {"userId": "user_002"}, format="json", HTTP_IF_MATCH='"t11-v4"')
+        self.assertEqual(mock_approve.call_args[1]["expected_version"], 4)
+
+        self.client.post(url, {"userId": "user_002"}, format="json", HTTP_IF_MATCH='W/"t11-v3-1a2b3c4d"')
+        self.assertEqual(mock_approve.call_args[1]["expected_version"], 3)
+
+    @patch("trades_approval.views.approve_trade")
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_if_match_etag_of_another_trade_412(self, mock_get_object, mock_approve):
+        mock_get_object.return_value = fake_trade(state="PendingApproval", id=1, version=3)
+
+        url = reverse("trade-approve", kwargs={"pk": 1})
+        for header in ('"t5-v3"', 'W/"t5-v3-1a2b3c4d"'):
+            res = self.client.post(url, {"userId": "user_002"}, format="json", HTTP_IF_MATCH=header)
+            self.assertEqual(res.status_code, status.HTTP_412_PRECONDITION_FAILED, header)
+        res = self.client.post(url, {"userId": "user_002"}, format="json", HTTP_IF_MATCH='"t1-vx"')
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        mock_approve.assert_not_called()
+
+    @patch("trades_approval.views.cancel_trade")
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_if_match_star_pins_no_version(self, mock_get_object, mock_cancel):
+        t = fake_trade(state="PendingApproval", id=1, version=3)
+        mock_get_object.return_value = t
+        mock_cancel.return_value = t
+
+        url = reverse("trade-cancel", kwargs={"pk": 1})
+        res = self.client.post(url, {"userId": "user_001"}, format="json", HTTP_IF_MATCH="*")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsNone(mock_cancel.call_args[1]["expected_version"])
+
+        self.client.post(url, {"userId": "user_001", "expectedVersion": 3}, format="json", HTTP_IF_MATCH="*")
+        self.assertEqual(mock_cancel.call_args[1]["expected_version"], 3)
+
+    @patch("trades_approval.views.TradeViewSet.get_object")
+    def test_approve_bad_expected_version_400(self, mock_get_object):
+        mock_get_object.return_value = fake_trade(id=1)
+        url = reverse("trade-approve", kwargs={"pk": 1})
+        res = self.client.post(url, {"userId": "user_002", "expectedVersion": "abc"}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
     @patch("trades_approval.views.TradeViewSet.get_object")
     def test_approve_missing_userid_400(self, mock_get_object):
         mock_get_object.return_value = fake_trade(id=1)  # avoid DB
@@ -196,7 +469,7 @@ class TestTradeViewSet(APISimpleTestCase):
     def test_book_success(self, mock_get_object, mock_book):
         t = fake_trade(state="SentToCounterparty", id=18, approver_id="user_002")
 
-        def _side_effect(trade, actor_id, strike):
+        def _side_effect(trade, actor_id, strike, expected_version=None):
             trade.state = "Executed"
             trade.strike = Decimal(str(strike))
             return trade
@@ -227,7 +500,7 @@ class TestTradeViewSet(APISimpleTestCase):
         self.assertIn("detail", res.data)
 
     @patch("trades_approval.views.get_trade_action_logs")
-    @patch("trades_approval.views.TradeViewSet.get_object")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
     def test_history_success(self, mock_get_object, mock_history):
         t = fake_trade(state="Approved", id=20, approver_id="user_002")
         mock_get_object.return_value = t
@@ -245,58 +518,158 @@ class TestTradeViewSet(APISimpleTestCase):
         self.assertEqual(res.data["tradeId"], 20)
         self.assertEqual(len(res.data["history"]), 2)
 
-    @patch("trades_approval.views.TradeViewSet.get_object")
-    def test_diff_success(self, mock_get_object):
-        t = fake_trade(state="Approved", id=21)
+    @patch("trades_approval.views.get_trade_action_logs", return_value=[])
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_history_etag_and_304(self, mock_get_object, mock_history):
+        mock_get_object.return_value = fake_trade(id=20, version=5)
+        url = reverse("trade-history", kwargs={"pk": 20})
+
+        res = self.client.get(url)
+        self.assertEqual(res["ETag"], '"t20-v5"')
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH='"t20-v4", "t20-v5"')
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], '"t20-v5"')
+        self.assertEqual(mock_history.call_count, 1)
+
+        mock_get_object.return_value = fake_trade(id=20, version=6)
+        res = self.client.get(url, HTTP_IF_NONE_MATCH='"t20-v5"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["ETag"], '"t20-v6"')
+
+        res = self.client.get(url, {"pageSize": 10}, HTTP_IF_NONE_MATCH='"t20-v6"')
+        self.assertNotEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @patch("trades_approval.views.iter_trade_action_logs")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_history_stream_ndjson(self, mock_get_object, mock_iter):
+        mock_get_object.return_value = fake_trade(id=20)
+        mock_iter.return_value = iter([{"action": "Submit"}, {"action": "Approve"}])
+
+        url = reverse("trade-history", kwargs={"pk": 20})
+        res = self.client.get(url, {"stream": "ndjson"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        body = b"".join(res.streaming_content).decode()
+        self.assertEqual(body, '{"action": "Submit"}\n{"action": "Approve"}\n')
 
-        ver1 = SimpleNamespace(snapshot={"notional_amount": "5000000.00"})
-        ver2 = SimpleNamespace(snapshot={"notional_amount": "2000000.00"})
+        res = self.client.get(url, {"stream": "csv"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch("trades_approval.views.history_queryset")
+    @patch("trades_approval.views.ActionLogCursorPagination")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_history_paginated(self, mock_get_object, MockPaginator, mock_qs):
+        mock_get_object.return_value = fake_trade(id=20)
+        paginator = MockPaginator.return_value
+        paginator.paginate_queryset.return_value = [{
+            "id": 1, "created_at": datetime(2025, 11, 11, 9, 30), "action": "Submit", "actor_user_id": "user_001",
+            "before_state": "Draft", "after_state": "PendingApproval", "note": "",
+        }]
+        paginator.get_next_link.return_value = "http://testserver/next"
+        paginator.get_previous_link.return_value = None
+
+        url = reverse("trade-history", kwargs={"pk": 20})
+        res = self.client.get(url, {"pageSize": 1})
 
-        versions_manager = MagicMock()
-        versions_manager.get.side_effect = [ver1, ver2]
-        t.versions = versions_manager
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["history"][0]["toState"], "PendingApproval")
+        self.assertEqual(res.data["next"], "http://testserver/next")
+        self.assertIs(paginator.paginate_queryset.call_args.args[0], mock_qs.return_value)
 
+    @patch("trades_approval.views.get_versions")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_diff_success(self, mock_get_object, mock_load_versions):
+        t = fake_trade(state="Approved", id=21)
         mock_get_object.return_value = t
+        mock_load_versions.return_value = {
+            1: SimpleNamespace(snapshot={"notional_amount": "5000000.00"}),
+            2: SimpleNamespace(snapshot={"notional_amount": "2000000.00"}),
+        }
 
         url = reverse("trade-diff", kwargs={"pk": t.id})
         payload = {"fromVersion": 1, "toVersion": 2}
         res = self.client.post(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn("diff", res.data)
-        versions_manager.get.assert_any_call(version_number=1)
-        versions_manager.get.assert_any_call(version_number=2)
+        self.assertEqual(res.data["diff"], {"notional_amount": ("5000000.00", "2000000.00")})
+        mock_load_versions.assert_called_once_with(t, [1, 2])
 
-    @patch("trades_approval.views.TradeViewSet.get_object")
-    def test_diff_missing_versions_404(self, mock_get_object):
+    @patch("trades_approval.views.get_versions")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_diff_missing_versions_404(self, mock_get_object, mock_load_versions):
         t = fake_trade(state="Approved", id=22)
+        mock_get_object.return_value = t
+        mock_load_versions.return_value = {1: SimpleNamespace(snapshot={})}
+
+        url = reverse("trade-diff", kwargs={"pk": t.id})
+        res = self.client.post(url, {"fromVersion": 1, "toVersion": 99}, format="json")
 
-        versions_manager = MagicMock()
-        class _DoesNotExist(Exception): ...
-        versions_manager.get.side_effect = _DoesNotExist("no row")
-        t.versions = versions_manager
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("trades_approval.views.get_version_range")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_diff_chain_returns_each_step(self, mock_get_object, mock_load_range):
+        t = fake_trade(state="Approved", id=23)
         mock_get_object.return_value = t
+        mock_load_range.return_value = {
+            1: SimpleNamespace(snapshot={"state": "PendingApproval", "version": 1}),
+            2: SimpleNamespace(snapshot={"state": "NeedsReapproval", "version": 2}),
+            3: SimpleNamespace(snapshot={"state": "Approved", "version": 3}),
+        }
 
-        with patch("trades_approval.views.TradeVersion") as MockTV:
-            MockTV.DoesNotExist = _DoesNotExist
+        url = reverse("trade-diff", kwargs={"pk": t.id})
+        res = self.client.post(url, {"fromVersion": 1, "toVersion": 3, "chain": True}, format="json")
 
-            url = reverse("trade-diff", kwargs={"pk": t.id})
-            res = self.client.post(url, {"fromVersion": 1, "toVersion": 99}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        mock_load_range.assert_called_once_with(t, 1, 3)
+        self.assertEqual([(s["fromVersion"], s["toVersion"]) for s in res.data["steps"]], [(1, 2), (2, 3)])
+        self.assertEqual(res.data["steps"][1]["diff"]["state"], ("NeedsReapproval", "Approved"))
+        self.assertEqual(res.data["diff"]["version"], (1, 3))
+
+    @patch("trades_approval.views.get_version_range")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_diff_chain_gap_404_and_bad_range_400(self, mock_get_object, mock_load_range):
+        mock_get_object.return_value = fake_trade(id=24)
+        mock_load_range.return_value = {1: SimpleNamespace(snapshot={}), 3: SimpleNamespace(snapshot={})}
+        url = reverse("trade-diff", kwargs={"pk": 24})
+
+        res = self.client.post(url, {"fromVersion": 1, "toVersion": 3, "chain": True}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
 
-            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        res = self.client.post(url, {"fromVersion": 3, "toVersion": 1, "chain": True}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
-    @patch("trades_approval.views.TradeViewSet.get_object")
+    @patch("trades_approval.views.get_versions")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_diff_get_etag_and_304(self, mock_get_object, mock_get_versions):
+        mock_get_object.return_value = fake_trade(id=21, version=3)
+        mock_get_versions.return_value = {1: SimpleNamespace(snapshot={"a": 1}), 2: SimpleNamespace(snapshot={"a": 2})}
+        url = reverse("trade-diff", kwargs={"pk": 21})
+
+        res = self.client.get(url, {"fromVersion": 1, "toVersion": 2})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["ETag"], '"t21-diff-1-2"')
+
+        res = self.client.get(url, {"fromVersion": 1, "toVersion": 2}, HTTP_IF_NONE_MATCH='"t21-diff-1-2"')
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(mock_get_versions.call_count, 1)
+
+        res = self.client.post(url, {"fromVersion": 1, "toVersion": 2}, format="json", HTTP_IF_NONE_MATCH='"t21-diff-1-2"')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
     def test_diff_missing_inputs_400(self, mock_get_object):
         mock_get_object.return_value = fake_trade(id=1)
         url = reverse("trade-diff", kwargs={"pk": 1})
         res = self.client.post(url, {}, format="json")
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
-    @patch("trades_approval.views.get_object_or_404")
-    @patch("trades_approval.views.TradeViewSet.get_object")
-    def test_version_snapshot_200(self, mock_get_object, mock_get_obj_or_404):
+    @patch("trades_approval.views.get_versions")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_version_snapshot_200(self, mock_get_object, mock_load_versions):
         t = fake_trade(state="Approved", id=23)
-        t.versions = MagicMock()
         tv = SimpleNamespace(
             version_number=1,
             state="PendingApproval",
@@ -306,22 +679,136 @@ class TestTradeViewSet(APISimpleTestCase):
             action="Submit",
         )
         mock_get_object.return_value = t
-        mock_get_obj_or_404.return_value = tv
+        mock_load_versions.return_value = {1: tv}
 
         url = reverse("trade-version-snapshot", kwargs={"pk": t.id, "version": 1})
         res = self.client.get(url)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["version"], 1)
         self.assertEqual(res.data["tradeId"], 23)
+        self.assertEqual(res.data["snapshot"], {"foo": "bar"})
+        mock_load_versions.assert_called_once_with(t, [1])
 
-    @patch("trades_approval.views.get_object_or_404")
-    @patch("trades_approval.views.TradeViewSet.get_object")
-    def test_version_snapshot_404(self, mock_get_object, mock_get_obj_or_404):
+    @patch("trades_approval.views.get_versions")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_version_snapshot_404(self, mock_get_object, mock_load_versions):
         t = fake_trade(state="Approved", id=24)
-        t.versions = MagicMock()
         mock_get_object.return_value = t
-        mock_get_obj_or_404.side_effect = Http404()
+        mock_load_versions.return_value = {}
 
         url = reverse("trade-version-snapshot", kwargs={"pk": t.id, "version": 99})
         res = self.client.get(url)
         self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("trades_approval.views.get_versions")
+    @patch("trades_approval.views.TradeViewSet.get_cached_object")
+    def test_version_snapshot_304_skips_version_lookup(self, mock_get_object, mock_get_versions):
+        mock_get_object.return_value = fake_trade(id=25, version=4)
+        url = reverse("trade-version-snapshot", kwargs={"pk": 25, "version": 2})
+
+        res = self.client.get(url, HTTP_IF_NONE_MATCH='"t25-v2"')
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res["ETag"], '"t25-v2"')
+        mock_get_versions.assert_not_called()
+
+
+class TestAuditExportViewSet(APISimpleTestCase):
+    @patch("trades_approval.views.iter_export_rows")
+    def test_export_streams_whole_window(self, mock_rows):
+        mock_rows.return_value = iter([{"id": 1, "created_at": datetime(2025, 11, 11, 9, 30)}])
+
+        url = reverse("audit-export-list")
+        res = self.client.get(url, {"from": "2025-11-11", "to": "2025-11-12", "kind": "versions"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], "application/x-ndjson")
+        self.assertTrue(res.streaming)
+        self.assertEqual(mock_rows.call_args.args[0], "versions")
+        self.assertIsNone(mock_rows.call_args.kwargs["limit"])
+
+    @patch("trades_approval.views.render_export", return_value=iter(["{}\n"]))
+    @patch("trades_approval.views.iter_export_rows")
+    def test_export_limit_sets_next_cursor(self, mock_rows, _):
+        mock_rows.return_value = iter([
+            {"id": 1, "created_at": datetime(2025, 11, 11, 9, 30)},
+            {"id": 2, "created_at": datetime(2025, 11, 11, 9, 31)},
+        ])
+
+        url = reverse("audit-export-list")
+        res = self.client.get(url, {"from": "2025-11-11", "to": "2025-11-12", "output": "columnar", "limit": 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn("X-Next-Cursor", res)
+        self.assertEqual(mock_rows.call_args.kwargs["limit"], 2)
+
+    def test_export_rejects_bad_params(self):
+        url = reverse("audit-export-list")
+        for params in (
+            {"from": "2025-11-11"},
+            {"from": "2025-11-11", "to": "2025-11-12", "output": "parquet"},
+            {"from": "2025-11-11", "to": "2025-11-12", "kind": "trades"},
+            {"from": "2025-11-11", "to": "2025-11-12", "limit": 0},
+            {"from": "2025-11-11", "to": "2025-11-12", "after": "garbage"},
+        ):
+            res = self.client.get(url, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
+
+
+class TestCacheStatsViewSet(APISimpleTestCase):
+    @patch("trades_approval.views.cache_stats", return_value={"local_hits": 3, "misses": 1})
+    def test_stats(self, _):
+        res = self.client.get(reverse("cache-stats-list"))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["local_hits"], 3)
+
+
+class TestTradeEventViewSet(APISimpleTestCase):
+    @patch("trades_approval.views.wait_for_events")
+    def test_long_poll(self, mock_wait):
+        mock_wait.return_value = [{"id": 3, "sequence": 8, "toState": "Executed"}]
+
+        res = self.client.get(reverse("trade-events-list"), {"after": 7, "toState": "Executed", "timeout": 90})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["lastEventId"], 8)
+        mock_wait.assert_called_once_with(7, to_states=["Executed"], timeout=25.0)
+
+    @patch("trades_approval.views.wait_for_events", return_value=[])
+    def test_long_poll_resumes_from_last_event_id(self, mock_wait):
+        res = self.client.get(reverse("trade-events-list"), {"timeout": 0}, HTTP_LAST_EVENT_ID="12")
+        self.assertEqual(res.data, {"events": [], "lastEventId": 12})
+        mock_wait.assert_called_once_with(12, to_states=[], timeout=0.0)
+
+    @patch("trades_approval.views.wait_for_events")
+    def test_sse_stream(self, mock_wait):
+        mock_wait.side_effect = [[{"id": 4, "sequence": 1, "toState": "Approved"}], []]
+
+        res = self.client.get(reverse("trade-events-list"), {"stream": "sse", "timeout": 0})
+
+        self.assertEqual(res["Content-Type"], "text/event-stream")
+        body = b"".join(res.streaming_content).decode()
+        self.assertIn('id: 1\nevent: trade\ndata: {"id": 4, "sequence": 1, "toState": "Approved"}\n\n', body)
+        self.assertEqual(event_subscribers.active, 0)
+
+    @override_settings(TRADE_EVENTS_MAX_SUBSCRIBERS=1)
+    @patch("trades_approval.views.wait_for_events", return_value=[])
+    def test_subscribers_over_the_cap_get_503(self, mock_wait):
+        self.assertTrue(event_subscribers.acquire())
+        try:
+            for params in ({"timeout": 0}, {"stream": "sse", "timeout": 0}):
+                res = self.client.get(reverse("trade-events-list"), params)
+                self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE, params)
+                self.assertEqual(res["Retry-After"], "1")
+            mock_wait.assert_not_called()
+        finally:
+            event_subscribers.release()
+
+        res = self.client.get(reverse("trade-events-list"), {"timeout": 0})
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(event_subscribers.active, 0)
+
+    def test_bad_params(self):
+        for params in ({"stream": "ws"}, {"after": "x"}, {"toState": "Booked"}):
+            res = self.client.get(reverse("trade-events-list"), params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -1,10 +1,15 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
-from .views import TradeViewSet
+from .views import TradeViewSet, AuditExportViewSet, CacheStatsViewSet, TradeEventViewSet
+from . import async_views
 
 router = DefaultRouter()
 router.register(r"trades", TradeViewSet, basename="trade")
+router.register(r"audit/export", AuditExportViewSet, basename="audit-export")
+router.register(r"cache/stats", CacheStatsViewSet, basename="cache-stats")
+router.register(r"events", TradeEventViewSet, basename="trade-events")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("async/trades/<int:pk>/<slug:action>/", async_views.transition, name="async-trade-transition"),
 ]
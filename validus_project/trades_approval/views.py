@@ -1,27 +1,181 @@
+import hashlib
+import json
+import re
+import time
+
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.http import Http404
-from .models import Trade, TradeVersion
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
+from .models import Trade
+from .enums import TradeState
 from .services.use_cases import (
     create_and_submit, approve_trade, cancel_trade, update_trade,
-    send_to_execute_trade, book_trade
+    send_to_execute_trade, book_trade, bulk_create_and_submit,
+    bulk_transition, BulkTransition, BULK_TRANSITIONS, ConcurrentUpdate,
+    TradeLocked
 )
-from .serializers import TradeDetailsSerializer, TradeUpdateSerializer, BookSerializer
-from .services.trade_workflow import InvalidTransition, PermissionDenied
-from .services.audit import get_trade_action_logs
+from .serializers import TradeSerializer
+from .schemas import TRADE_DETAILS_SCHEMA, TRADE_UPDATE_SCHEMA, BOOK_SCHEMA
+from .pagination import TradeCursorPagination, CurrencyCursorPagination, ActionLogCursorPagination
+from .services.trade_workflow import InvalidTransition, PermissionDenied, allowed_actions_many
+from .services.audit import get_trade_action_logs, history_queryset, history_row, iter_trade_action_logs
 from .services.versioning import diff_snapshots
-from django.shortcuts import get_object_or_404
+from .services.cache import get_trade, get_versions, get_version_range, stats as cache_stats
+from .services.queries import filter_trades, work_queue, allowed_actions_from_row, trades_by_currency
+from .services.outbox import subscribers as event_subscribers, wait_for_events
+from .services.stats import trade_stats
+from .services.counters import user_counts
+from .services.export import (
+    EXPORT_KINDS, EXPORT_OUTPUTS, decode_cursor, encode_cursor, iter_export_rows,
+    parse_instant, render_export
+)
+
+DIFF_CHAIN_MAX = 500
+ALLOWED_ACTIONS_MAX = 1000
+EXPORT_MAX_LIMIT = 10000
+EVENTS_MAX_WAIT = 25.0
+SSE_KEEPALIVE = 10.0
+
+
+_ETAG_VERSION = re.compile(r"t(\d+)-v(\d+)(?:-[0-9a-f]+)?")
+
+
+def _etag(trade_id, version, variant=""):
+    """Strong ETag "t<trade>-v<version>[-<variant>]"; a trade's version only ever grows."""
+    tag = f"t{trade_id}-v{version}"
+    return f'"{tag}-{variant}"' if variant else f'"{tag}"'
+
+
+def _not_modified(request, etag):
+    """304 response if If-None-Match already holds etag, else None."""
+    header = request.headers.get("If-None-Match")
+    if header and request.method in ("GET", "HEAD"):
+        tags = [t.removeprefix("W/") for t in parse_etags(header)]
+        if "*" in tags or etag in tags:
+            return Response(status=304, headers={"ETag": etag})
+    return None
+
+
+def _flag(value):
+    return value is True or str(value).lower() in ("true", "1")
+
+
+class _PreconditionFailed(ValueError):
+    """If-Match names another trade's ETag; answered with 412."""
+
+
+def _parse_expected_version(if_match, body_value, trade_id):
+    """
+    Version the client last saw, from an If-Match header or a body expectedVersion; raises ValueError.
+
+    If-Match takes a bare version or an ETag returned by history/versions
+    ("t<trade>-v<version>"); an ETag of another trade raises _PreconditionFailed.
+    If-Match: * matches any current version (RFC 9110), so it pins none and
+    only a body expectedVersion applies.
+    """
+    raw = if_match.strip() if if_match else None
+    if raw == "*":
+        raw = None
+    if raw:
+        raw = raw.removeprefix("W/").strip('"')
+        match = _ETAG_VERSION.fullmatch(raw)
+        if match:
+            if int(match.group(1)) != trade_id:
+                raise _PreconditionFailed(f"If-Match names trade {match.group(1)}, not trade {trade_id}.")
+            raw = match.group(2)
+    else:
+        raw = body_value
+    if raw is None or raw == "":
+        return None
+    if isinstance(raw, bool):
+        raise ValueError
+    return int(raw)
+
+
+def _expected_version(request, trade_id):
+    return _parse_expected_version(request.headers.get("If-Match"), request.data.get("expectedVersion"), trade_id)
+
 
 class TradeViewSet(viewsets.GenericViewSet):
     queryset = Trade.objects.all()
+    pagination_class = TradeCursorPagination
+
+    def get_cached_object(self):
+        """get_object() for read-only actions, served through the trade cache."""
+        try:
+            trade = get_trade(int(self.kwargs[self.lookup_field]))
+        except (Trade.DoesNotExist, ValueError):
+            raise Http404
+        self.check_object_permissions(self.request, trade)
+        return trade
+
+    def list(self, request):
+        try:
+            qs = filter_trades(request.query_params)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(TradeSerializer(page, many=True).data)
+
+    @action(detail=False, methods=["get"], url_path="work-queue")
+    def work_queue(self, request):
+        """Trades userId can act on now, with allowedActions per row; optional action=Approve,Book filter."""
+        user_id = request.query_params.get("userId")
+        if not user_id:
+            return Response({"error": "userId is required."}, status=400)
+        actions = [a for a in request.query_params.get("action", "").split(",") if a]
+        try:
+            qs = work_queue(user_id, actions)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        page = self.paginate_queryset(qs)
+        rows = TradeSerializer(page, many=True).data
+        for row, trade in zip(rows, page):
+            row["allowedActions"] = allowed_actions_from_row(trade)
+        return self.get_paginated_response(rows)
+
+    @action(detail=False, methods=["get"], url_path="work-queue/counts", url_name="work-queue-counts")
+    def work_queue_counts(self, request):
+        """Badge counts: open trades userId is requester or approver on, per state."""
+        user_id = request.query_params.get("userId")
+        if not user_id:
+            return Response({"error": "userId is required."}, status=400)
+        counts = user_counts(user_id)
+        return Response({"userId": user_id, "counts": counts, "total": sum(counts.values())}, status=200)
+
+    @action(detail=False, methods=["get"], url_path="by-currency", pagination_class=CurrencyCursorPagination)
+    def by_currency(self, request):
+        """Trades whose underlying includes currency; optional state=PendingApproval,Approved filter."""
+        currency = request.query_params.get("currency")
+        if not currency:
+            return Response({"error": "currency is required."}, status=400)
+        states = [s for s in request.query_params.get("state", "").split(",") if s]
+        try:
+            qs = trades_by_currency(currency, states)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(TradeSerializer(page, many=True).data)
+
+    @action(detail=False, methods=["get"])
+    def stats(self, request):
+        """Counts and notional totals, e.g. groupBy=state,currency; optional state filter and source=live|summary."""
+        params = request.query_params
+        group_by = [d for d in params.get("groupBy", "").split(",") if d]
+        states = [s for s in params.get("state", "").split(",") if s]
+        try:
+            return Response(trade_stats(group_by, states, params.get("source")), status=200)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
 
     @action(detail=False, methods=["post"])
     def submit(self, request):
         user_id = request.data.get("userId")
         if not user_id:
             return Response({"error": "userId is required."}, status=400)
-        s = TradeDetailsSerializer(data=request.data.get("tradeDetails") or {})
+        s = TRADE_DETAILS_SCHEMA(request.data.get("tradeDetails") or {})
         s.is_valid(raise_exception=True)
         try:
             trade = create_and_submit(trade_detail=s.validated_data, actor_id=user_id)
@@ -29,6 +183,153 @@ class TradeViewSet(viewsets.GenericViewSet):
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
 
+    @action(detail=False, methods=["post"], url_path="bulk-submit")
+    def bulk_submit(self, request):
+        user_id = request.data.get("userId")
+        if not user_id:
+            return Response({"error": "userId is required."}, status=400)
+        items = request.data.get("trades")
+        if not isinstance(items, list) or not items:
+            return Response({"error": "trades must be a non-empty list."}, status=400)
+
+        results = [None] * len(items)
+        valid_idx, valid_details = [], []
+        for idx, item in enumerate(items):
+            s = TRADE_DETAILS_SCHEMA(item)
+            if s.is_valid():
+                valid_idx.append(idx)
+                valid_details.append(s.validated_data)
+            else:
+                results[idx] = {"index": idx, "errors": s.errors}
+
+        try:
+            outcomes = bulk_create_and_submit(valid_details, actor_id=user_id)
+        except Exception as e:
+            return Response({"detail": f"Internal error: {str(e)}"}, status=500)
+
+        for idx, outcome in zip(valid_idx, outcomes):
+            if outcome.error is not None:
+                results[idx] = {"index": idx, "errors": {"detail": outcome.error}}
+            else:
+                results[idx] = {"index": idx, "id": outcome.trade_id, "state": outcome.state}
+
+        failed = sum(1 for r in results if "errors" in r)
+        return Response({
+            "submitted": len(results) - failed,
+            "failed": failed,
+            "results": results,
+        }, status=200)
+
+    def _parse_bulk_action(self, item):
+        if not isinstance(item, dict):
+            return None, {"detail": "Each action must be an object."}
+        try:
+            trade_id = int(item["tradeId"])
+        except Exception:
+            return None, {"tradeId": "tradeId is a required integer."}
+        action_name = item.get("action")
+        if action_name not in BULK_TRANSITIONS:
+            return None, {"action": f"action must be one of {', '.join(BULK_TRANSITIONS)}."}
+        actor_id = item.get("userId")
+        if not actor_id:
+            return None, {"userId": "userId is required."}
+        expected_version = item.get("expectedVersion")
+        if expected_version is not None:
+            try:
+                expected_version = int(expected_version)
+            except (TypeError, ValueError):
+                return None, {"expectedVersion": "expectedVersion must be an integer."}
+
+        wf_kwargs = {}
+        if action_name == "Update":
+            s = TRADE_UPDATE_SCHEMA(item.get("tradeUpdateDetails") or {})
+            if not s.is_valid():
+                return None, s.errors
+            wf_kwargs["trade_update_details"] = s.validated_data
+        elif action_name == "Book":
+            s = BOOK_SCHEMA({"userId": actor_id, "strike": item.get("strike")})
+            if not s.is_valid():
+                return None, s.errors
+            wf_kwargs["strike"] = s.validated_data["strike"]
+        return BulkTransition(
+            trade_id=trade_id,
+            action=action_name,
+            actor_id=actor_id,
+            wf_kwargs=wf_kwargs,
+            expected_version=expected_version,
+        ), None
+
+    @action(detail=False, methods=["post"], url_path="bulk-action")
+    def bulk_action(self, request):
+        items = request.data.get("actions")
+        if not isinstance(items, list) or not items:
+            return Response({"error": "actions must be a non-empty list."}, status=400)
+
+        results = [None] * len(items)
+        valid_idx, transitions = [], []
+        for idx, item in enumerate(items):
+            transition, errors = self._parse_bulk_action(item)
+            if errors is not None:
+                results[idx] = {"index": idx, "errors": errors}
+            else:
+                valid_idx.append(idx)
+                transitions.append(transition)
+
+        try:
+            outcomes = bulk_transition(transitions)
+        except Exception as e:
+            return Response({"detail": f"Internal error: {str(e)}"}, status=500)
+
+        for idx, outcome in zip(valid_idx, outcomes):
+            if outcome.error is not None:
+                results[idx] = {"index": idx, "errors": {"detail": outcome.error}}
+            else:
+                results[idx] = {"index": idx, "id": outcome.trade_id, "state": outcome.state}
+
+        failed = sum(1 for r in results if "errors" in r)
+        return Response({
+            "succeeded": len(results) - failed,
+            "failed": failed,
+            "results": results,
+        }, status=200)
+
+    @action(detail=False, methods=["get", "post"], url_path="allowed-actions")
+    def allowed_actions(self, request):
+        """
+        Actions each listed trade currently allows, from one query.
+
+        GET ?tradeIds=1,2,3[&userId=u] or POST {"tradeIds": [...], "userId": "u"}.
+        With userId, actions that user is not permitted to take are left out.
+        """
+        if request.method == "GET":
+            raw = [i for i in request.query_params.get("tradeIds", "").split(",") if i]
+        else:
+            raw = request.data.get("tradeIds")
+        if not isinstance(raw, list) or not raw or len(raw) > ALLOWED_ACTIONS_MAX:
+            return Response({"error": f"tradeIds must list 1 to {ALLOWED_ACTIONS_MAX} trade ids."}, status=400)
+        try:
+            trade_ids = [int(i) for i in raw]
+        except (TypeError, ValueError):
+            return Response({"error": "tradeIds must be integers."}, status=400)
+        user_id = (request.query_params if request.method == "GET" else request.data).get("userId") or None
+
+        trades = Trade.objects.only("id", "state", "version", "requester_id", "approver_id").in_bulk(trade_ids)
+        found = list(trades.values())
+        actions = dict(zip((t.id for t in found), allowed_actions_many(found, actor_id=user_id)))
+        results = []
+        for trade_id in trade_ids:
+            trade = trades.get(trade_id)
+            if trade is None:
+                results.append({"id": trade_id, "error": "Trade not found."})
+            else:
+                results.append({
+                    "id": trade.id,
+                    "state": trade.state,
+                    "version": trade.version,
+                    "allowedActions": actions[trade.id],
+                })
+        return Response({"results": results}, status=200)
+
     @action(detail=True, methods=["post"])
     def approve(self, request, pk=None):
         trade = self.get_object()
@@ -36,10 +337,20 @@ class TradeViewSet(viewsets.GenericViewSet):
         if not actor_id:
             return Response({"error": "userId is required."}, status=400)
         try:
-            approve_trade(trade, actor_id=actor_id)
+            expected_version = _expected_version(request, trade.id)
+        except _PreconditionFailed as e:
+            return Response({"detail": str(e)}, status=412)
+        except ValueError:
+            return Response({"error": "expectedVersion must be an integer."}, status=400)
+        try:
+            approve_trade(trade, actor_id=actor_id, expected_version=expected_version)
             return Response({"id": trade.id, "state": trade.state}, status=200)
         except (InvalidTransition, PermissionDenied) as e:
             return Response({"detail": str(e)}, status=400)
+        except ConcurrentUpdate as e:
+            return Response({"detail": str(e)}, status=409)
+        except TradeLocked as e:
+            return Response({"detail": str(e)}, status=423)
 
     @action(detail=True, methods=["post"])
     def cancel(self, request, pk=None):
@@ -48,10 +359,20 @@ class TradeViewSet(viewsets.GenericViewSet):
         if not actor_id:
             return Response({"error": "userId is required."}, status=400)
         try:
-            cancel_trade(trade, actor_id=actor_id)
+            expected_version = _expected_version(request, trade.id)
+        except _PreconditionFailed as e:
+            return Response({"detail": str(e)}, status=412)
+        except ValueError:
+            return Response({"error": "expectedVersion must be an integer."}, status=400)
+        try:
+            cancel_trade(trade, actor_id=actor_id, expected_version=expected_version)
             return Response({"id": trade.id, "state": trade.state}, status=200)
         except (InvalidTransition, PermissionDenied) as e:
             return Response({"detail": str(e)}, status=400)
+        except ConcurrentUpdate as e:
+            return Response({"detail": str(e)}, status=409)
+        except TradeLocked as e:
+            return Response({"detail": str(e)}, status=423)
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
 
@@ -61,13 +382,23 @@ class TradeViewSet(viewsets.GenericViewSet):
         actor_id = request.data.get("userId")
         if not actor_id:
             return Response({"error": "userId is required."}, status=400)
-        s = TradeUpdateSerializer(data=request.data.get("tradeUpdateDetails") or {}, context={"trade": trade})
+        try:
+            expected_version = _expected_version(request, trade.id)
+        except _PreconditionFailed as e:
+            return Response({"detail": str(e)}, status=412)
+        except ValueError:
+            return Response({"error": "expectedVersion must be an integer."}, status=400)
+        s = TRADE_UPDATE_SCHEMA(request.data.get("tradeUpdateDetails") or {}, context={"trade": trade})
         s.is_valid(raise_exception=True)
         try:
-            update_trade(trade, actor_id=actor_id, trade_detail=s.validated_data)
+            update_trade(trade, actor_id=actor_id, trade_detail=s.validated_data, expected_version=expected_version)
             return Response({"id": trade.id, "state": trade.state}, status=200)
         except (InvalidTransition, PermissionDenied) as e:
             return Response({"detail": str(e)}, status=400)
+        except ConcurrentUpdate as e:
+            return Response({"detail": str(e)}, status=409)
+        except TradeLocked as e:
+            return Response({"detail": str(e)}, status=423)
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
 
@@ -78,61 +409,142 @@ class TradeViewSet(viewsets.GenericViewSet):
         if not actor_id:
             return Response({"error": "userId is required."}, status=400)
         try:
-            send_to_execute_trade(trade, actor_id=actor_id)
+            expected_version = _expected_version(request, trade.id)
+        except _PreconditionFailed as e:
+            return Response({"detail": str(e)}, status=412)
+        except ValueError:
+            return Response({"error": "expectedVersion must be an integer."}, status=400)
+        try:
+            send_to_execute_trade(trade, actor_id=actor_id, expected_version=expected_version)
             return Response({"id": trade.id, "state": trade.state}, status=200)
         except (InvalidTransition, PermissionDenied) as e:
             return Response({"detail": str(e)}, status=400)
+        except ConcurrentUpdate as e:
+            return Response({"detail": str(e)}, status=409)
+        except TradeLocked as e:
+            return Response({"detail": str(e)}, status=423)
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
 
     @action(detail=True, methods=["post"])
     def book(self, request, pk=None):
         trade = self.get_object()
-        s = BookSerializer(data=request.data)
+        s = BOOK_SCHEMA(request.data)
         s.is_valid(raise_exception=True)
         try:
-            book_trade(trade, actor_id=s.validated_data["userId"], strike=s.validated_data["strike"])
+            expected_version = _expected_version(request, trade.id)
+        except _PreconditionFailed as e:
+            return Response({"detail": str(e)}, status=412)
+        except ValueError:
+            return Response({"error": "expectedVersion must be an integer."}, status=400)
+        try:
+            book_trade(trade, actor_id=s.validated_data["userId"], strike=s.validated_data["strike"], expected_version=expected_version)
             return Response({"id": trade.id, "state": trade.state, "strike": str(trade.strike)}, status=200)
         except (InvalidTransition, PermissionDenied) as e:
             return Response({"detail": str(e)}, status=400)
+        except ConcurrentUpdate as e:
+            return Response({"detail": str(e)}, status=409)
+        except TradeLocked as e:
+            return Response({"detail": str(e)}, status=423)
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
     
     @action(detail=True, methods=["get"])
     def history(self, request, pk=None):
-        trade = self.get_object()
+        trade = self.get_cached_object()
+        params = request.query_params
+        stream = params.get("stream")
+        if stream is not None and stream != "ndjson":
+            return Response({"detail": "stream must be 'ndjson'."}, status=400)
+        # Every action bumps trade.version, so (trade, version) pins the whole trail.
+        query = request.META.get("QUERY_STRING", "")
+        etag = _etag(trade.id, trade.version, hashlib.sha1(query.encode()).hexdigest()[:8] if query else "")
+        not_modified = _not_modified(request, etag)
+        if not_modified:
+            return not_modified
         try:
-            trade_action_logs = get_trade_action_logs(trade)
-            return Response({"tradeId": trade.id, "history": trade_action_logs}, status=200)
+            if stream:
+                lines = (json.dumps(row) + "\n" for row in iter_trade_action_logs(trade))
+                response = StreamingHttpResponse(lines, content_type="application/x-ndjson")
+            elif "cursor" in params or "pageSize" in params:
+                paginator = ActionLogCursorPagination()
+                page = paginator.paginate_queryset(history_queryset(trade), request, view=self)
+                response = Response({
+                    "tradeId": trade.id,
+                    "history": [history_row(values) for values in page],
+                    "next": paginator.get_next_link(),
+                    "previous": paginator.get_previous_link(),
+                }, status=200)
+            else:
+                trade_action_logs = get_trade_action_logs(trade)
+                response = Response({"tradeId": trade.id, "history": trade_action_logs}, status=200)
+            response["ETag"] = etag
+            return response
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
 
     
-    @action(detail=True, methods=["post"])
+    @action(detail=True, methods=["get", "post"])
     def diff(self, request, pk=None):
-        trade = self.get_object()
-        body = request.data or {}
+        trade = self.get_cached_object()
+        body = (request.query_params if request.method == "GET" else request.data) or {}
         try:
             v_from = int(body["fromVersion"]); v_to = int(body["toVersion"])
         except Exception:
             return Response({"detail": "fromVersion and toVersion are required integers."}, status=400)
 
+        chain = _flag(body.get("chain", False))
+        if chain and not 0 < v_to - v_from <= DIFF_CHAIN_MAX:
+            return Response(
+                {"detail": f"A chained diff needs fromVersion < toVersion, spanning at most {DIFF_CHAIN_MAX} versions."},
+                status=400,
+            )
+
+        # Versions are immutable, so the diff between two existing versions never changes.
+        suffix = "-chain" if chain else ""
+        etag = f'"t{trade.id}-diff-{v_from}-{v_to}{suffix}"'
+        if max(v_from, v_to) <= trade.version:
+            not_modified = _not_modified(request, etag)
+            if not_modified:
+                return not_modified
+
         try:
-            a = trade.versions.get(version_number=v_from).snapshot
-            b = trade.versions.get(version_number=v_to).snapshot
-            diffs = diff_snapshots(a, b)
-            return Response({"diff": diffs}, status=200)
-        except TradeVersion.DoesNotExist:
-            return Response({"detail": "One or both specified versions do not exist."}, status=404)
+            if not chain:
+                versions = get_versions(trade, [v_from, v_to])
+                if v_from not in versions or v_to not in versions:
+                    return Response({"detail": "One or both specified versions do not exist."}, status=404)
+                diffs = diff_snapshots(versions[v_from].snapshot, versions[v_to].snapshot)
+                return Response({"diff": diffs}, status=200, headers={"ETag": etag})
+
+            versions = get_version_range(trade, v_from, v_to)
+            if len(versions) != v_to - v_from + 1:
+                return Response({"detail": "One or more versions in the range do not exist."}, status=404)
+            steps = [
+                {
+                    "fromVersion": v,
+                    "toVersion": v + 1,
+                    "diff": diff_snapshots(versions[v].snapshot, versions[v + 1].snapshot),
+                }
+                for v in range(v_from, v_to)
+            ]
+            diffs = diff_snapshots(versions[v_from].snapshot, versions[v_to].snapshot)
+            return Response({"diff": diffs, "steps": steps}, status=200, headers={"ETag": etag})
         except Exception as e:
             return Response({"detail": f"Internal error: {str(e)}"}, status=500)
         
     
     @action(detail=True, methods=["get"], url_path=r"versions/(?P<version>\d+)")
     def version_snapshot(self, request, pk=None, version=None):
-        trade = self.get_object()
+        trade = self.get_cached_object()
+        etag = _etag(trade.id, int(version))
+        if int(version) <= trade.version:
+            not_modified = _not_modified(request, etag)
+            if not_modified:
+                return not_modified
         try:
-            tv = get_object_or_404(trade.versions, version_number=version)
+            tv = get_versions(trade, [int(version)]).get(int(version))
+            if tv is None:
+                raise Http404
             return Response({
                 "tradeId": trade.id,
                 "version": tv.version_number,
@@ -141,8 +553,136 @@ class TradeViewSet(viewsets.GenericViewSet):
                 "createdAt": tv.created_at.isoformat(),
                 "actorUserId": tv.actor_user_id,
                 "action": tv.action,
-            }, status=200)
+            }, status=200, headers={"ETag": etag})
         except Http404:
             return Response({"detail": "Specified version does not exist."}, status=404)
         except Exception as e:
-            return Response({"detail": f"Internal error: {str(e)}"}, status=500)
\ No newline at end of file
+            return Response({"detail": f"Internal error: {str(e)}"}, status=500)
+
+
+class AuditExportViewSet(viewsets.ViewSet):
+    """
+    GET /api/audit/export/?kind=actions|versions&from=...&to=...&output=ndjson|csv|columnar
+
+    Streams the whole window by default. With limit=N, returns at most N rows
+    and an X-Next-Cursor header to pass back as after=... for the next page.
+    """
+
+    def list(self, request):
+        params = request.query_params
+        kind = params.get("kind", "actions")
+        output = params.get("output", "ndjson")
+        if kind not in EXPORT_KINDS:
+            return Response({"detail": f"kind must be one of {', '.join(sorted(EXPORT_KINDS))}."}, status=400)
+        if output not in EXPORT_OUTPUTS:
+            return Response({"detail": f"output must be one of {', '.join(sorted(EXPORT_OUTPUTS))}."}, status=400)
+        if not params.get("from") or not params.get("to"):
+            return Response({"detail": "from and to are required."}, status=400)
+        try:
+            start = parse_instant("from", params["from"])
+            end = parse_instant("to", params["to"])
+            after = decode_cursor(params["after"]) if params.get("after") else None
+            limit = int(params["limit"]) if params.get("limit") else None
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=400)
+        if limit is not None and not 0 < limit <= EXPORT_MAX_LIMIT:
+            return Response({"detail": f"limit must be between 1 and {EXPORT_MAX_LIMIT}."}, status=400)
+
+        rows = iter_export_rows(kind, start, end, after=after, limit=limit)
+        content_type = EXPORT_OUTPUTS[output]
+        if limit is None:
+            return StreamingHttpResponse(render_export(kind, output, rows), content_type=content_type)
+
+        rows = list(rows)
+        response = HttpResponse("".join(render_export(kind, output, rows)), content_type=content_type)
+        if len(rows) == limit:
+            response["X-Next-Cursor"] = encode_cursor((rows[-1]["created_at"], rows[-1]["id"]))
+        return response
+
+
+class CacheStatsViewSet(viewsets.ViewSet):
+    """GET /api/cache/stats/: this worker's trade cache hit/miss counters."""
+
+    def list(self, request):
+        return Response(cache_stats(), status=200)
+
+
+class _SubscriberStream:
+    """SSE body that frees its subscriber slot when the response is closed, even if never iterated."""
+
+    def __init__(self, events):
+        self._events = events
+        self._open = True
+
+    def __iter__(self):
+        return self._events
+
+    def close(self):
+        self._events.close()
+        if self._open:
+            self._open = False
+            event_subscribers.release()
+
+
+class TradeEventViewSet(viewsets.ViewSet):
+    """
+    GET /api/events/: trade state changes, in the order the outbox relay published them.
+
+    Long-poll by default: answers as soon as there are events with a sequence
+    after `after` (or Last-Event-ID), or with an empty list after `timeout` seconds.
+    With stream=sse, streams them as Server-Sent Events for up to `timeout`
+    seconds; EventSource clients reconnect and resume from Last-Event-ID.
+    toState=SentToCounterparty,Executed narrows the feed.
+
+    Each subscriber holds this worker while it waits, so at most
+    TRADE_EVENTS_MAX_SUBSCRIBERS are served per process; the rest get 503.
+    """
+
+    def list(self, request):
+        params = request.query_params
+        stream = params.get("stream")
+        if stream is not None and stream != "sse":
+            return Response({"detail": "stream must be 'sse'."}, status=400)
+        try:
+            after = int(request.headers.get("Last-Event-ID") or params.get("after") or 0)
+            timeout = min(max(float(params.get("timeout", EVENTS_MAX_WAIT)), 0.0), EVENTS_MAX_WAIT)
+        except ValueError:
+            return Response({"detail": "after must be an integer and timeout a number."}, status=400)
+        to_states = [st for st in params.get("toState", "").split(",") if st]
+        invalid = sorted(set(to_states) - set(TradeState.values))
+        if invalid:
+            return Response({"detail": f"Unknown state: {', '.join(invalid)}."}, status=400)
+
+        if not event_subscribers.acquire():
+            return Response(
+                {"detail": "Too many event subscribers on this worker; retry shortly."},
+                status=503, headers={"Retry-After": "1"},
+            )
+        if stream:
+            response = StreamingHttpResponse(
+                _SubscriberStream(self._sse(after, to_states, timeout)), content_type="text/event-stream",
+            )
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            return response
+
+        try:
+            events = wait_for_events(after, to_states=to_states, timeout=timeout)
+        finally:
+            event_subscribers.release()
+        return Response({"events": events, "lastEventId": events[-1]["sequence"] if events else after}, status=200)
+
+    @staticmethod
+    def _sse(after, to_states, duration):
+        deadline = time.monotonic() + duration
+        yield "retry: 1000\n\n"
+        while True:
+            remaining = max(0.0, deadline - time.monotonic())
+            events = wait_for_events(after, to_states=to_states, timeout=min(remaining, SSE_KEEPALIVE))
+            for event in events:
+                after = event["sequence"]
+                yield f"id: {after}\nevent: trade\ndata: {json.dumps(event)}\n\n"
+            if time.monotonic() >= deadline:
+                return
+            if not events:
+                yield ": keepalive\n\n"
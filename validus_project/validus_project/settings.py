@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
@@ -67,12 +70,128 @@ WSGI_APPLICATION = 'validus_project.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite profile, applied by init_command whenever a connection is opened.
+# WAL lets readers run alongside the single writer; synchronous=NORMAL syncs the
+# WAL at checkpoints rather than on every commit (a power cut may lose the last
+# commits but never corrupts the file); busy_timeout (ms) makes a writer wait for
+# the lock instead of failing with "database is locked"; IMMEDIATE takes the write
+# lock at BEGIN, so two transitions cannot deadlock upgrading from a read lock.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+}
+SQLITE_OPTIONS = {
+    'init_command': '; '.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+    'transaction_mode': 'IMMEDIATE',
+}
+
+# DB_ENGINE picks the backend: "sqlite" (default, db.sqlite3 with the profile above)
+# or "postgresql" (pip install "psycopg[binary,pool]"), configured from DB_NAME,
+# DB_USER, DB_PASSWORD, DB_HOST and DB_PORT. Connections are kept for
+# DB_CONN_MAX_AGE seconds and health-checked before reuse. On PostgreSQL, DB_POOL=1
+# switches to Django's psycopg pool (DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections
+# per process); a pool replaces persistent connections, so CONN_MAX_AGE is 0 then.
+# Size the pool for the sync workers plus TRADE_ASYNC_WORKERS.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+
+if DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': SQLITE_OPTIONS,
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+elif DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'validus'),
+            'USER': os.environ.get('DB_USER', 'validus'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'OPTIONS': {},
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
+    if os.environ.get('DB_POOL') == '1':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '20')),
+            'timeout': 10,
+        }
+else:
+    raise ImproperlyConfigured(f"DB_ENGINE must be 'sqlite' or 'postgresql'; got {DB_ENGINE!r}.")
+
+# Trade workflow
+# "optimistic": transitions compare-and-swap on Trade.version and answer 409 on conflict.
+# "nowait" / "skip_locked": additionally re-read the trade with SELECT ... FOR UPDATE
+# NOWAIT / SKIP LOCKED inside the transition and answer 423 when the row is already
+# locked. Row locks need PostgreSQL (or another backend with SELECT ... FOR UPDATE);
+# SQLite ignores them and relies on the version check alone.
+TRADE_TRANSITION_LOCKING = 'optimistic'
+
+# "changed": transitions only clean the fields the workflow changed (the workflow
+# already checked the cross-field rules and the DB enforces the CheckConstraints).
+# "full": run Trade.full_clean() on every transition.
+TRADE_TRANSITION_VALIDATION = 'changed'
+
+# "full": every TradeVersion stores a complete snapshot.
+# "delta": a full keyframe every TRADE_VERSION_KEYFRAME_INTERVAL versions and
+# field-level deltas in between; reads reconstruct full snapshots transparently.
+# Existing rows can be converted with `manage.py compact_trade_versions`.
+TRADE_VERSION_STORAGE = 'full'
+TRADE_VERSION_KEYFRAME_INTERVAL = 10
+
+# Read-through cache for trade state and version snapshots. Immutable version
+# snapshots use a per-process LRU of TRADE_CACHE_LOCAL_SIZE entries in front of
+# the TRADE_CACHE_ALIAS backend. Current trade state is cached only when that alias
+# is shared across processes (Redis, Memcached, ...): it is keyed by a per-trade
+# generation that each commit increments, and expires after TRADE_CACHE_STATE_TTL seconds. With the
+# local-memory backend below, only version snapshots are cached and state is read
+# from the database, e.g.
+#     CACHES['default'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#                          'LOCATION': 'redis://127.0.0.1:6379'}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'validus-trades',
+    },
 }
+TRADE_CACHE_ENABLED = True
+TRADE_CACHE_ALIAS = 'default'
+TRADE_CACHE_LOCAL_SIZE = 1024
+TRADE_CACHE_STATE_TTL = 300
+
+# Threads that run blocking transition work for the async endpoints
+# (/api/async/...). Keep at or below the database's comfortable concurrent writers.
+TRADE_ASYNC_WORKERS = 8
+
+# Outbox relay (`manage.py relay_outbox`): dotted path of the sink class and its
+# constructor kwargs. FileSink appends NDJSON; QueueSink is an in-process stand-in
+# for a broker. /api/events/ subscribers poll the outbox every TRADE_EVENTS_POLL_INTERVAL seconds.
+TRADE_OUTBOX_SINK = 'trades_approval.services.outbox.FileSink'
+TRADE_OUTBOX_SINK_OPTIONS = {'path': str(BASE_DIR / 'outbox-events.ndjson')}
+TRADE_EVENTS_POLL_INTERVAL = 0.5
+# A long-poll or SSE subscriber holds a sync worker thread for up to 25 s. Each
+# process serves at most this many at once and answers 503 + Retry-After to the
+# rest. Size it to the server's threads per process minus those needed for normal
+# requests (e.g. gunicorn --threads 16 leaves room for 8).
+TRADE_EVENTS_MAX_SUBSCRIBERS = 8
+
+# /api/trades/stats/ aggregates the trade table on each request unless
+# TRADE_STATS_SUMMARY is on: then every write path also keeps a TradeSummary row per
+# (state, counterparty, currency, direction) current and the endpoint reads those.
+# Run `manage.py rebuild_trade_summary` right after turning it on.
+TRADE_STATS_SUMMARY = False
 
 
 # Password validation